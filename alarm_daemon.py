@@ -0,0 +1,194 @@
+"""
+Demonio de alarmas sin interfaz gráfica
+Ejecuta AlarmManager sin cargar Kivy/KivyMD, con backends intercambiables de
+notificación, audio y navegador
+
+Uso:
+    python -m alarm_daemon [--notifier log] [--audio system] [--browser system] [--api 127.0.0.1:8765]
+
+Cada backend acepta un nombre integrado o "módulo:fábrica", donde la fábrica
+recibe el ConfigManager y devuelve el backend
+"""
+
+import sys
+import signal
+import logging
+import argparse
+import importlib
+import threading
+from typing import Any, Callable, Dict
+
+from config_manager import ConfigManager
+from alarm_manager import AlarmManager
+from control_api import ControlServer
+
+logger = logging.getLogger(__name__)
+
+class NullBrowser:
+    """
+    Backend de navegador que solo registra las aperturas (equipos sin escritorio)
+    """
+
+    def prepare_launch(self, browser: str, video_url: str = None) -> Dict[str, Any]:
+        return {'url': video_url or "", 'browser': browser, 'fullscreen': False}
+
+    def submit_launch(self, launch: Dict[str, Any], alarm_id: str = None, specific: bool = False) -> bool:
+        logger.info(f"Navegador desactivado; no se abre {launch['url'] or 'video aleatorio'}")
+        return True
+
+def log_notifier(config_manager) -> Callable[[str, str], None]:
+    """Notificaciones escritas en el log"""
+    return lambda title, message: logger.info(f"🔔 {title}: {message}")
+
+def plyer_notifier(config_manager) -> Callable[[str, str], None]:
+    """Notificaciones del sistema mediante plyer"""
+    from plyer import notification
+    return lambda title, message: notification.notify(title=title, message=message, timeout=10)
+
+def system_audio(config_manager):
+    """Reproducción con AudioManager (reproductores externos o motor en proceso)"""
+    from browser_integration import AudioManager
+    return AudioManager(config_manager)
+
+def system_browser(config_manager):
+    """Apertura de videos con la integración de navegadores compartida"""
+    from browser_integration import get_browser_integration
+    return get_browser_integration(config_manager)
+
+NOTIFIERS = {
+    "log": log_notifier,
+    "plyer": plyer_notifier,
+    "none": lambda config_manager: (lambda title, message: None)
+}
+
+AUDIO_BACKENDS = {
+    "system": system_audio,
+    "none": lambda config_manager: None
+}
+
+BROWSER_BACKENDS = {
+    "system": system_browser,
+    "none": lambda config_manager: NullBrowser()
+}
+
+def load_backend(spec: str, registry: Dict[str, Callable], config_manager) -> Any:
+    """
+    Crea un backend por nombre integrado o por "módulo:fábrica"
+
+    Args:
+        spec: Nombre del backend
+        registry: Backends integrados
+        config_manager: Gestor de configuraciones para la fábrica
+
+    Returns:
+        Backend creado
+
+    Raises:
+        ValueError: Si el nombre no es integrado ni tiene forma "módulo:fábrica"
+    """
+    factory = registry.get(spec)
+    if factory is None:
+        module_name, _, attribute = spec.partition(":")
+        if not module_name or not attribute:
+            raise ValueError(f"Backend desconocido: {spec} (use {', '.join(registry)} o módulo:fábrica)")
+        factory = getattr(importlib.import_module(module_name), attribute)
+    return factory(config_manager)
+
+class AlarmDaemon:
+    """
+    Planificador de alarmas en segundo plano, sin interfaz gráfica
+    """
+
+    def __init__(self, config_manager: ConfigManager = None, notifier: str = "log",
+                 audio: str = "system", browser: str = "system", api_address: str = None):
+        """
+        Inicializa el demonio
+
+        Args:
+            config_manager: Gestor de configuraciones (por defecto el de la aplicación)
+            notifier: Backend de notificaciones
+            audio: Backend de audio
+            browser: Backend de navegador
+            api_address: Dirección de la API de control ("host:puerto" o "unix:/ruta");
+                por defecto la de la sección api si está habilitada
+        """
+        self.config_manager = config_manager or ConfigManager()
+        self.alarm_manager = AlarmManager(self.config_manager)
+        self._stop_event = threading.Event()
+
+        if api_address is None and self.config_manager.get('api', 'enabled', False):
+            api_address = self.config_manager.get('api', 'address', "127.0.0.1:8765")
+        self.control_server = None
+        if api_address:
+            self.control_server = ControlServer(self.alarm_manager, api_address,
+                                                self.config_manager.get('api', 'token'))
+
+        self.alarm_manager.set_notifier(load_backend(notifier, NOTIFIERS, self.config_manager))
+        self.alarm_manager.set_browser(load_backend(browser, BROWSER_BACKENDS, self.config_manager))
+
+        audio_manager = load_backend(audio, AUDIO_BACKENDS, self.config_manager)
+        if audio_manager:
+            self.alarm_manager.set_audio_manager(audio_manager)
+
+    def start(self):
+        """
+        Carga las alarmas e inicia la verificación y los backups de configuración
+        """
+        self.alarm_manager.load_alarms()
+        self.alarm_manager.start()
+        self.config_manager.start_backup_scheduler()
+        if self.control_server:
+            self.control_server.start()
+        logger.info("Demonio de alarmas iniciado")
+
+    def stop(self):
+        """
+        Detiene el demonio
+        """
+        if self.control_server:
+            self.control_server.stop()
+        self.config_manager.stop_backup_scheduler()
+        self.alarm_manager.stop()
+        self._stop_event.set()
+
+    def run_forever(self):
+        """
+        Ejecuta el demonio hasta recibir SIGINT o SIGTERM
+        """
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: self._stop_event.set())
+
+        self.start()
+        try:
+            while not self._stop_event.wait(1):
+                pass
+        finally:
+            self.stop()
+            logger.info("Demonio de alarmas detenido")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Planificador de alarmas sin interfaz gráfica")
+    parser.add_argument("--config", default="alarm_config.json", help="Archivo de configuración en config/")
+    parser.add_argument("--notifier", default="log", help=f"Notificaciones: {', '.join(NOTIFIERS)} o módulo:fábrica")
+    parser.add_argument("--audio", default="system", help=f"Audio: {', '.join(AUDIO_BACKENDS)} o módulo:fábrica")
+    parser.add_argument("--browser", default="system", help=f"Navegador: {', '.join(BROWSER_BACKENDS)} o módulo:fábrica")
+    parser.add_argument("--api", help="API de control en host:puerto o unix:/ruta (por defecto, sección api)")
+    parser.add_argument("--log-level", default="INFO", help="Nivel de log")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper(), logging.INFO),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        daemon = AlarmDaemon(ConfigManager(args.config), args.notifier, args.audio, args.browser, args.api)
+    except (ValueError, ImportError, AttributeError) as e:
+        logger.error(f"Error creando el demonio: {e}")
+        return 2
+
+    daemon.run_forever()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
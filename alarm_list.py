@@ -0,0 +1,163 @@
+"""
+Módulo de lista de alarmas virtualizada
+Muestra las alarmas con un RecycleView: solo se instancian las filas visibles,
+que se reciclan al desplazarse, y los cambios se aplican fila a fila sobre sus datos
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List
+
+from kivy.metrics import dp
+from kivy.properties import StringProperty
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivymd.uix.list import ThreeLineAvatarIconListItem, IconLeftWidget, IconRightWidget
+
+logger = logging.getLogger(__name__)
+
+# Altura fija de ThreeLineAvatarIconListItem en Material Design
+ROW_HEIGHT = dp(88)
+
+# Icono y texto por tipo de recurrencia
+RECURRENCE_LABELS = {
+    "daily": ("🔁", "Diaria"),
+    "weekly": ("📅", "Semanal")
+}
+DEFAULT_RECURRENCE_LABEL = ("⏰", "Una vez")
+
+def alarm_row_data(alarm) -> Dict[str, Any]:
+    """
+    Convierte una alarma en los datos de una fila de la lista
+
+    Args:
+        alarm: Instancia de Alarm
+
+    Returns:
+        Diccionario con las propiedades de AlarmListItem
+    """
+    recurrence_icon, recurrence_text = RECURRENCE_LABELS.get(alarm.recurrence, DEFAULT_RECURRENCE_LABEL)
+    return {
+        'alarm_id': alarm.id,
+        'alarm_icon': "alarm" if alarm.enabled else "alarm-off",
+        'text': f"⏰ {alarm.title or 'Sin título'}",
+        'secondary_text': f"🕐 Hora: {alarm.get_formatted_time()}",
+        'tertiary_text': f"{recurrence_icon} {recurrence_text} | Volumen: {alarm.volume}%"
+    }
+
+class AlarmListItem(RecycleDataViewBehavior, ThreeLineAvatarIconListItem):
+    """
+    Fila reciclable de la lista de alarmas; sus iconos se crean una sola vez
+    y se actualizan al asignarle los datos de otra alarma
+    """
+
+    alarm_id = StringProperty("")
+    alarm_icon = StringProperty("alarm")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.list_view = None
+
+        icon_widget = IconLeftWidget(icon=self.alarm_icon)
+        self.bind(alarm_icon=icon_widget.setter('icon'))
+        self.add_widget(icon_widget)
+
+        self.add_widget(IconRightWidget(
+            icon="delete",
+            theme_text_color="Custom",
+            text_color=(0.8, 0.2, 0.2, 1),
+            on_release=lambda x: self._notify('delete_callback')
+        ))
+
+    def refresh_view_attrs(self, rv, index, data):
+        """
+        Asigna los datos de una fila al reciclar la vista
+        """
+        self.list_view = rv
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_release(self):
+        self._notify('edit_callback')
+
+    def _notify(self, callback_name: str):
+        callback = getattr(self.list_view, callback_name, None)
+        if callback and self.alarm_id:
+            callback(self.alarm_id)
+
+class AlarmRecycleView(RecycleView):
+    """
+    Lista de alarmas respaldada por un modelo de datos
+    """
+
+    def __init__(self, edit_callback: Callable[[str], None] = None,
+                 delete_callback: Callable[[str], None] = None, **kwargs):
+        """
+        Inicializa la lista
+
+        Args:
+            edit_callback: Recibe el ID de la alarma tocada
+            delete_callback: Recibe el ID de la alarma a eliminar
+        """
+        super().__init__(**kwargs)
+        self.edit_callback = edit_callback
+        self.delete_callback = delete_callback
+        self._positions: Dict[str, int] = {}  # ID de alarma -> índice en data
+
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, ROW_HEIGHT),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        # viewclass se guarda en el layout manager, así que se asigna después de añadirlo
+        self.viewclass = AlarmListItem
+
+    def set_alarms(self, alarms: List[Any]):
+        """
+        Reemplaza las alarmas mostradas; las filas visibles se reciclan
+
+        Args:
+            alarms: Alarmas en el orden en que se muestran
+        """
+        self.data = [alarm_row_data(alarm) for alarm in alarms]
+        self._positions = {row['alarm_id']: index for index, row in enumerate(self.data)}
+
+    def apply_changes(self, upserted: Iterable[Any], removed: Iterable[str]) -> int:
+        """
+        Aplica cambios sueltos al modelo de datos: cada baja, modificación o alta
+        es una operación sobre la lista observable, así que el RecycleView solo
+        vuelve a enlazar las filas afectadas
+
+        Args:
+            upserted: Alarmas a mostrar (se modifican si ya están, si no se añaden al final)
+            removed: IDs de alarmas a quitar
+
+        Returns:
+            Número de filas modificadas
+        """
+        data = self.data
+        changed = 0
+
+        positions = sorted((self._positions[alarm_id] for alarm_id in removed if alarm_id in self._positions),
+                           reverse=True)
+        for position in positions:
+            del data[position]
+            changed += 1
+        if positions:
+            # Las bajas desplazan las posiciones posteriores
+            self._positions = {row['alarm_id']: index for index, row in enumerate(data)}
+
+        for alarm in upserted:
+            row = alarm_row_data(alarm)
+            position = self._positions.get(alarm.id)
+            if position is None:
+                self._positions[alarm.id] = len(data)
+                data.append(row)
+                changed += 1
+            elif data[position] != row:
+                data[position] = row
+                changed += 1
+
+        return changed
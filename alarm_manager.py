@@ -7,15 +7,75 @@ import json
 import os
 import logging
 from datetime import datetime, timedelta, time
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 from croniter import croniter
-from kivy.clock import Clock
-from plyer import notification
 import threading
 import uuid
+from collections import Counter, deque
+from time import perf_counter
+
+from file_watcher import FileWatcher
+from file_store import FileStore
 
 logger = logging.getLogger(__name__)
 
+# Tipos de evento de cambio emitidos por AlarmManager
+CHANGE_TYPES = ("added", "updated", "removed", "fired", "snoozed")
+
+RECURRENCE_TYPES = ("none", "daily", "weekly", "custom")
+
+# Tipos admitidos por campo en apply_batch (datos que llegan por la API de control)
+ALARM_FIELD_TYPES = {
+    'title': (str,),
+    'description': (str,),
+    'time': (str,),
+    'recurrence': (str,),
+    'recurrence_data': (dict,),
+    'enabled': (bool,),
+    'video_url': (str, type(None)),
+    'browser_preference': (str,),
+    'sound_file': (str, type(None)),
+    'volume': (int, float),
+    'vibrate': (bool,),
+    'snooze_interval': (int, float),
+    'max_snoozes': (int,),
+    'days_of_week': (list,),
+    'custom_schedule': (str, list),
+    'is_active': (bool,)
+}
+
+# Rangos admitidos de los campos numéricos (ambos extremos incluidos)
+ALARM_FIELD_RANGES = {
+    'volume': (0, 100),
+    'snooze_interval': (1, 60),
+    'max_snoozes': (1, 20)
+}
+
+def coalesce_changes(events: List[Dict[str, Any]]) -> Tuple[Dict[str, "Alarm"], List[str]]:
+    """
+    Reduce una secuencia de eventos de cambio al estado final por alarma
+    
+    Args:
+        events: Eventos en el orden en que se emitieron
+        
+    Returns:
+        Tupla (alarmas añadidas o modificadas por ID, IDs eliminados)
+    """
+    upserted: Dict[str, Alarm] = {}
+    removed: Dict[str, None] = {}
+    
+    for event in events:
+        if event['type'] == "removed":
+            for alarm_id in event['ids']:
+                upserted.pop(alarm_id, None)
+                removed[alarm_id] = None
+        else:
+            for alarm_id, alarm in event['alarms'].items():
+                removed.pop(alarm_id, None)
+                upserted[alarm_id] = alarm
+    
+    return upserted, list(removed)
+
 class Alarm:
     """
     Clase que representa una alarma individual
@@ -49,6 +109,7 @@ class Alarm:
         self.days_of_week = []  # Para recurrencia semanal
         self.custom_schedule = []  # Para recurrencia personalizada
         self.is_active = False
+        self.version = 0  # Contador de versión para fusión entre procesos
         
         # Validación de datos
         self._validate_time_format()
@@ -134,6 +195,54 @@ class Alarm:
             logger.error(f"Error calculando próxima activación para alarma {self.id}: {e}")
             return None
     
+    def iter_occurrences(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """
+        Genera en orden las activaciones programadas en el intervalo [start, end)
+        
+        Args:
+            start: Inicio del intervalo
+            end: Fin del intervalo (excluido)
+            
+        Returns:
+            Iterador de fechas de activación
+        """
+        if not self.enabled or not self.is_active:
+            return
+        
+        if self.recurrence == "custom":
+            if not self.custom_schedule:
+                return
+            cron = croniter(self.custom_schedule, start - timedelta(microseconds=1))
+            while True:
+                occurrence = cron.get_next(datetime)
+                if occurrence >= end:
+                    return
+                yield occurrence
+        
+        if self.recurrence == "none":
+            try:
+                occurrence = datetime.fromisoformat(self.next_trigger) if self.next_trigger else None
+            except ValueError:
+                occurrence = None
+            if occurrence and start <= occurrence < end:
+                yield occurrence
+            return
+        
+        try:
+            alarm_time = datetime.strptime(self.time, "%H:%M").time()
+        except ValueError:
+            return
+        
+        days = {int(d) for d in self.days_of_week} if self.recurrence == "weekly" else None
+        day = start.date()
+        while True:
+            occurrence = datetime.combine(day, alarm_time)
+            if occurrence >= end:
+                return
+            if occurrence >= start and (days is None or occurrence.weekday() in days):
+                yield occurrence
+            day += timedelta(days=1)
+    
     def should_trigger(self, current_time: datetime) -> bool:
         """
         Determina si la alarma debe activarse en el tiempo dado
@@ -186,16 +295,21 @@ class Alarm:
         
         return False
     
-    def trigger(self) -> Dict[str, Any]:
+    def trigger(self, snoozed: bool = False) -> Dict[str, Any]:
         """
         Activa la alarma
         
+        Args:
+            snoozed: La activación es el fin de una posposición; el contador de
+                posposiciones se conserva para que max_snoozes se cumpla
+        
         Returns:
             Diccionario con información del trigger
         """
         trigger_time = datetime.now()
         self.last_triggered = trigger_time.isoformat()
-        self.snooze_count = 0  # Resetear contador de snooze
+        if not snoozed:
+            self.snooze_count = 0  # Activación normal: nuevo ciclo de posposiciones
         
         return {
             'id': self.id,
@@ -222,6 +336,23 @@ class Alarm:
             return True
         return False
     
+    def snooze_due(self, current_time: datetime) -> bool:
+        """
+        Determina si una posposición pendiente debe sonar ya
+        
+        Args:
+            current_time: Tiempo actual a verificar
+            
+        Returns:
+            True si la alarma está pospuesta y su nueva hora ya llegó
+        """
+        if not self.enabled or not self.is_active or not self.snooze_count or not self.next_trigger:
+            return False
+        try:
+            return datetime.fromisoformat(self.next_trigger) <= current_time
+        except ValueError:
+            return False
+    
     def disable(self):
         """
         Desactiva la alarma
@@ -264,7 +395,8 @@ class Alarm:
             'next_trigger': self.next_trigger,
             'days_of_week': self.days_of_week,
             'custom_schedule': self.custom_schedule,
-            'is_active': self.is_active
+            'is_active': self.is_active,
+            'version': self.version
         }
     
     @classmethod
@@ -300,6 +432,7 @@ class Alarm:
         alarm.days_of_week = data.get('days_of_week', [])
         alarm.custom_schedule = data.get('custom_schedule', [])
         alarm.is_active = data.get('is_active', False)
+        alarm.version = data.get('version', 0)
         
         alarm._validate_time_format()
         return alarm
@@ -323,6 +456,18 @@ class AlarmManager:
         self.check_event = None
         self.notification_callback = None
         self.audio_callback = None
+        self.callback_dispatcher = None  # Entrega de callbacks fuera del hilo del planificador
+        self.change_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.file_watcher = None
+        self._store = None
+        self._lock = threading.RLock()
+        self._disk_versions: Dict[str, int] = {}  # Versiones vistas en disco por ID
+        self.audio_manager = None
+        self.browser = None  # Por defecto, la integración de navegadores compartida
+        self.notifier = None  # Por defecto, notificaciones de plyer
+        self._prepared: Dict[str, Dict[str, Any]] = {}  # Disparos pre-armados por ID
+        self._fire_times: Dict[str, Tuple[int, Optional[datetime]]] = {}  # (versión, próxima activación) por ID
+        self._trigger_stats = deque(maxlen=100)
         
         # Directorio de almacenamiento
         self.storage_dir = os.path.join(os.getcwd(), "data")
@@ -343,6 +488,9 @@ class AlarmManager:
         self.check_thread = threading.Thread(target=self._alarm_check_loop, daemon=True)
         self.check_thread.start()
         
+        # Vigilar cambios externos en alarmas y configuración
+        self._start_file_watcher()
+        
         logger.info("✅ Sistema de alarmas iniciado - Verificación continua activa")
         logger.info(f"📊 Alarmas cargadas: {len(self.alarms)} total, {len(self.get_active_alarms())} activas")
     
@@ -354,8 +502,24 @@ class AlarmManager:
         if self.check_event:
             self.check_event.set()
         
+        if self.file_watcher:
+            self.file_watcher.stop()
+            self.file_watcher = None
+        
         logger.info("Sistema de alarmas detenido")
     
+    def _start_file_watcher(self):
+        """
+        Inicia la vigilancia de alarms.json y del archivo de configuración
+        """
+        try:
+            self.file_watcher = FileWatcher()
+            self.file_watcher.watch(self.alarms_file, lambda path: self.reload_alarms())
+            self.config_manager.attach_watcher(self.file_watcher)
+            self.file_watcher.start()
+        except Exception as e:
+            logger.error(f"Error iniciando vigilancia de archivos: {e}")
+    
     def _alarm_check_loop(self):
         """
         Bucle principal para verificar alarmas continuamente
@@ -386,18 +550,133 @@ class AlarmManager:
         current_time = datetime.now()
         triggered_alarms = []
         
-        # Verificar cada alarma
-        for alarm in self.alarms:
-            if alarm.should_trigger(current_time):
-                triggered_alarms.append(alarm)
-                logger.info(f"⏰ Alarma detectada para activar: {alarm.title} - {alarm.time}")
+        # Preparar las alarmas que se dispararán en breve
+        self._prearm_upcoming(current_time)
+        
+        # Copia bajo el bloqueo: la lista puede reemplazarse mientras se recorre
+        with self._lock:
+            alarms = list(self.alarms)
+        
+        # Verificar cada alarma; la activación normal tiene prioridad sobre la posposición
+        for alarm in alarms:
+            try:
+                if alarm.should_trigger(current_time):
+                    triggered_alarms.append((alarm, False))
+                elif alarm.snooze_due(current_time):
+                    triggered_alarms.append((alarm, True))
+                else:
+                    continue
+            except Exception as e:
+                # Datos corruptos en una alarma no deben impedir comprobar las demás
+                logger.error(f"Error comprobando alarma {alarm.id}: {e}")
+                continue
+            logger.info(f"⏰ Alarma detectada para activar: {alarm.title} - {alarm.time}")
         
         # Procesar alarmas activadas
-        for alarm in triggered_alarms:
+        for alarm, snoozed in triggered_alarms:
             logger.info(f"🔔 Activando alarma: {alarm.title}")
-            self._trigger_alarm(alarm)
+            self._trigger_alarm(alarm, snoozed)
+    
+    def _prearm_upcoming(self, current_time: datetime):
+        """
+        Pre-arma las alarmas cuyo disparo cae dentro de la ventana configurada
+        (scheduler.prearm_seconds), para que el disparo no tenga que resolver nada
+        Los candidatos se eligen bajo el bloqueo y se preparan fuera de él, ya
+        que preparar resuelve el navegador y lee el archivo de sonido
+        
+        Args:
+            current_time: Tiempo actual
+        """
+        window = self.config_manager.get('scheduler', 'prearm_seconds', 30)
+        candidates = []
+        
+        with self._lock:
+            alarm_ids = {alarm.id for alarm in self.alarms}
+            for cache in (self._prepared, self._fire_times):
+                for alarm_id in list(cache):
+                    if alarm_id not in alarm_ids:
+                        del cache[alarm_id]
+            
+            if not window:
+                return
+            
+            for alarm in self.alarms:
+                if not alarm.enabled or not alarm.is_active:
+                    continue
+                
+                prepared = self._prepared.get(alarm.id)
+                if prepared and prepared['version'] == alarm.version:
+                    continue
+                
+                fire_at = self._next_fire_time(alarm, current_time)
+                if fire_at and (fire_at - current_time).total_seconds() <= window:
+                    candidates.append((alarm, fire_at))
+        
+        for alarm, fire_at in candidates:
+            prepared = self._prepare_trigger(alarm, warm=True)
+            with self._lock:
+                # Si la alarma cambió mientras se preparaba, el disparo la resuelve de nuevo
+                self._prepared[alarm.id] = prepared
+            logger.info(f"🧰 Alarma pre-armada: {alarm.title} ({fire_at.strftime('%H:%M:%S')})")
     
-    def _trigger_alarm(self, alarm: Alarm):
+    def _next_fire_time(self, alarm: Alarm, current_time: datetime) -> Optional[datetime]:
+        """
+        Obtiene la próxima activación de una alarma (llamar con el bloqueo tomado)
+        Se guarda por versión y solo se recalcula si la alarma cambió o la
+        activación guardada ya pasó, para no evaluar cron en cada vuelta
+        
+        Args:
+            alarm: Alarma
+            current_time: Tiempo actual
+            
+        Returns:
+            Próxima fecha y hora de activación o None
+        """
+        cached = self._fire_times.get(alarm.id)
+        if cached and cached[0] == alarm.version and (cached[1] is None or cached[1] > current_time):
+            return cached[1]
+        
+        fire_at = alarm.get_next_trigger_time()
+        self._fire_times[alarm.id] = (alarm.version, fire_at)
+        return fire_at
+    
+    def _prepare_trigger(self, alarm: Alarm, warm: bool = False) -> Dict[str, Any]:
+        """
+        Resuelve todo lo que necesita el disparo de una alarma: configuración,
+        URL del video con autoplay, navegador y archivo de sonido. El video
+        aleatorio solo se sortea al abrirse, así que descartar una preparación
+        obsoleta no gasta una extracción de la bolsa
+        
+        Args:
+            alarm: Alarma a preparar
+            warm: Precargar el archivo de sonido en la caché de páginas
+            
+        Returns:
+            Diccionario con el disparo preparado
+        """
+        prepared = {
+            'version': alarm.version,
+            'prearmed': warm,
+            'play_sound': bool(self.config_manager.get('audio', 'alarm_sound')),
+            'notify': self.config_manager.get('notifications', 'enabled', True),
+            'vibrate': alarm.vibrate and self.config_manager.get('notifications', 'vibrate', True),
+            'volume': alarm.volume,
+            'sound_file': None,
+            'launch': None
+        }
+        
+        try:
+            browser = self._get_browser()
+            prepared['launch'] = browser.prepare_launch(alarm.browser_preference or "brave", alarm.video_url)
+        except Exception as e:
+            logger.error(f"Error preparando navegador para alarma {alarm.id}: {e}")
+        
+        if self.audio_manager and prepared['play_sound']:
+            prepared['sound_file'] = self.audio_manager.prepare_sound(alarm.sound_file or None, warm=warm)
+        
+        return prepared
+    
+    def _trigger_alarm(self, alarm: Alarm, snoozed: bool = False):
         """
         Activa una alarma específica y ejecuta la secuencia completa:
         1. Sonido de alarma
@@ -406,45 +685,79 @@ class AlarmManager:
         4. Abrir navegador Brave
         5. Reproducir video motivacional aleatorio
         
+        Si la alarma fue pre-armada se usan los recursos ya resueltos. El cambio
+        de estado (activación, versión y próxima activación) se hace bajo el
+        bloqueo; sonido, notificación y navegador quedan fuera de él
+        
         Args:
             alarm: Alarma a activar
+            snoozed: La activación es el fin de una posposición
         """
+        fired_at = perf_counter()
+        
         try:
-            # Activar la alarma
-            trigger_info = alarm.trigger()
+            with self._lock:
+                prepared = self._prepared.pop(alarm.id, None)
+                # Una fusión desde disco puede haber reemplazado o eliminado la alarma
+                alarm = self.get_alarm_by_id(alarm.id)
+                if alarm is None:
+                    return
+                stale = not prepared or prepared['version'] != alarm.version
+            if stale:
+                prepared = self._prepare_trigger(alarm)
+            
+            stats = {
+                'alarm_id': alarm.id,
+                'prearmed': prepared['prearmed'],
+                'sound_latency_ms': None,
+                'dispatch_ms': None
+            }
+            self._trigger_stats.append(stats)
+            
+            with self._lock:
+                # Activar la alarma (solo una activación normal reinicia las posposiciones)
+                snooze_count = alarm.snooze_count
+                trigger_info = alarm.trigger(snoozed)
+                alarm.version += 1
+                
+                # Calcular y actualizar próxima activación
+                next_trigger = alarm.get_next_trigger_time()
+                if next_trigger:
+                    alarm.next_trigger = next_trigger.isoformat()
+                elif alarm.recurrence == "none":
+                    # Si es alarma única, desactivarla
+                    alarm.enabled = False
             
             logger.info(f"🔔 Iniciando secuencia de alarma: {alarm.title} ({alarm.id})")
             
             # 1. Reproducir sonido de alarma
-            if self.config_manager.get('audio', 'alarm_sound'):
+            if prepared['play_sound']:
                 logger.info("🔊 Reproduciendo sonido de alarma...")
-                if self.audio_callback:
-                    self.audio_callback(trigger_info)
+                if self.audio_manager and prepared['sound_file']:
+                    self._play_prepared_sound(alarm, prepared, fired_at, stats, snooze_count)
+                elif self.audio_callback:
+                    self._run_callback(self.audio_callback, trigger_info, "audio")
             
             # 2. Enviar notificación del sistema
-            if self.config_manager.get('notifications', 'enabled', True):
+            if prepared['notify']:
                 logger.info("📬 Enviando notificación...")
                 self._send_notification(trigger_info)
             
             # 3. Vibrar si está habilitado
-            if alarm.vibrate and self.config_manager.get('notifications', 'vibrate', True):
+            if prepared['vibrate']:
                 logger.info("📳 Activando vibración...")
                 self._vibrate()
             
             # 4. Abrir navegador Brave con video motivacional
             logger.info("🌐 Abriendo navegador Brave con video motivacional...")
-            self._open_motivational_video(alarm)
+            self._open_motivational_video(alarm, prepared['launch'])
+            
+            stats['dispatch_ms'] = (perf_counter() - fired_at) * 1000
             
-            # 5. Calcular y actualizar próxima activación
-            next_trigger = alarm.get_next_trigger_time()
             if next_trigger:
-                alarm.next_trigger = next_trigger.isoformat()
                 logger.info(f"⏰ Próxima activación programada: {next_trigger.strftime('%Y-%m-%d %H:%M:%S')}")
-            else:
-                # Si es alarma única, desactivarla
-                if alarm.recurrence == "none":
-                    alarm.enabled = False
-                    logger.info(f"✅ Alarma única completada, desactivada")
+            elif alarm.recurrence == "none":
+                logger.info(f"✅ Alarma única completada, desactivada")
             
             # Guardar cambios
             self.save_alarms()
@@ -453,39 +766,150 @@ class AlarmManager:
             
             # Notificar callback si existe
             if self.notification_callback:
-                self.notification_callback(trigger_info)
+                self._run_callback(self.notification_callback, trigger_info, "notification")
+            
+            self._emit_change("fired", [alarm], trigger=trigger_info)
                 
         except Exception as e:
             logger.error(f"❌ Error activando alarma {alarm.id}: {e}")
             logger.exception("Stack trace completo:")
     
-    def _open_motivational_video(self, alarm: Alarm):
+    def _play_prepared_sound(self, alarm: Alarm, prepared: Dict[str, Any], fired_at: float,
+                             stats: Dict[str, Any], snooze_count: int = 0):
+        """
+        Reproduce el sonido preparado sin bloquear y registra la latencia desde el disparo
+        La sesión queda etiquetada con el ID de la alarma para poder detenerla sola
+        
+        Args:
+            alarm: Alarma disparada
+            prepared: Disparo preparado
+            fired_at: Instante del disparo (perf_counter)
+            stats: Registro de estadísticas del disparo
+            snooze_count: Posposiciones previas al disparo (acortan la rampa de volumen)
+        """
+        handle = self.audio_manager.play_prepared(prepared['sound_file'], prepared['volume'],
+                                                  tag=alarm.id, snooze_count=snooze_count)
+        if handle:
+            stats['sound_latency_ms'] = (perf_counter() - fired_at) * 1000
+    
+    def dismiss_alarm(self, alarm_id: str) -> bool:
+        """
+        Descarta una alarma: detiene su sonido sin afectar a las demás y cierra
+        su ciclo de posposiciones (una posposición pendiente se cancela)
+        
+        Args:
+            alarm_id: ID de la alarma
+            
+        Returns:
+            True si había un sonido activo para la alarma
+        """
+        alarm = self.get_alarm_by_id(alarm_id)
+        if alarm is not None and alarm.snooze_count:
+            with self._lock:
+                alarm.snooze_count = 0
+                alarm.version += 1
+                self._reschedule_alarm(alarm)
+            self.save_alarms()
+            self._emit_change("updated", [alarm])
+        
+        return self._stop_alarm_sound(alarm_id)
+    
+    def _stop_alarm_sound(self, alarm_id: str) -> bool:
+        """
+        Detiene el sonido de una alarma sin afectar a las demás
+        
+        Args:
+            alarm_id: ID de la alarma
+            
+        Returns:
+            True si había un sonido activo para la alarma
+        """
+        if not self.audio_manager:
+            return False
+        return self.audio_manager.stop_session(alarm_id)
+    
+    def snooze_alarm(self, alarm_id: str) -> bool:
+        """
+        Pospone una alarma: detiene su sonido y la vuelve a hacer sonar tras
+        su intervalo de snooze (también las alarmas únicas ya desactivadas)
+        
+        Args:
+            alarm_id: ID de la alarma
+            
+        Returns:
+            True si se pospuso; False si no existe o agotó sus posposiciones
+        """
+        alarm = self.get_alarm_by_id(alarm_id)
+        if alarm is None:
+            logger.warning(f"Alarma no encontrada para posponer: {alarm_id}")
+            return False
+        
+        with self._lock:
+            if not alarm.snooze():
+                logger.info(f"Alarma sin posposiciones disponibles: {alarm.title}")
+                return False
+            alarm.enabled = True
+            alarm.version += 1
+        
+        self._stop_alarm_sound(alarm_id)
+        self.save_alarms()
+        
+        logger.info(f"😴 Alarma pospuesta {alarm.snooze_interval} min: {alarm.title} "
+                    f"({alarm.snooze_count}/{alarm.max_snoozes})")
+        self._emit_change("snoozed", [alarm])
+        return True
+    
+    def get_trigger_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las latencias de los últimos disparos, separando los pre-armados
+        de los resueltos en el momento del disparo
+        
+        Returns:
+            Diccionario con resúmenes 'prearmed' y 'cold' y los últimos registros
+        """
+        records = list(self._trigger_stats)
+        
+        def summarize(subset):
+            sound = [r['sound_latency_ms'] for r in subset if r['sound_latency_ms'] is not None]
+            dispatch = [r['dispatch_ms'] for r in subset if r['dispatch_ms'] is not None]
+            return {
+                'count': len(subset),
+                'avg_sound_latency_ms': sum(sound) / len(sound) if sound else None,
+                'max_sound_latency_ms': max(sound) if sound else None,
+                'avg_dispatch_ms': sum(dispatch) / len(dispatch) if dispatch else None
+            }
+        
+        return {
+            'prearmed': summarize([r for r in records if r['prearmed']]),
+            'cold': summarize([r for r in records if not r['prearmed']]),
+            'recent': records[-10:]
+        }
+    
+    def _open_motivational_video(self, alarm: Alarm, launch: Dict[str, Any] = None):
         """
         Abre un video motivacional en el navegador Brave
         
         Args:
             alarm: Alarma que dispara el video
+            launch: Apertura ya resuelta (ver BrowserIntegration.prepare_launch)
         """
         try:
-            from browser_integration import BrowserIntegration
+            browser = self._get_browser()
             
-            # Crear instancia de browser_integration
-            browser = BrowserIntegration(self.config_manager)
+            if launch is None:
+                launch = browser.prepare_launch(alarm.browser_preference or "brave", alarm.video_url)
             
-            # Determinar navegador a usar
-            preferred_browser = alarm.browser_preference or "brave"
+            if not launch:
+                logger.error("No se pudo obtener video motivacional")
+                return
             
-            # Si la alarma tiene video_url específico, usarlo
-            if alarm.video_url and alarm.video_url.strip():
-                logger.info(f"🎥 Abriendo video específico: {alarm.video_url}")
-                success = browser.open_url(alarm.video_url, preferred_browser, fullscreen=False)
-            else:
-                # Usar video motivacional aleatorio
-                logger.info(f"🎲 Seleccionando video motivacional aleatorio...")
-                success = browser.open_motivational_video(preferred_browser)
+            # Las aperturas de alarmas simultáneas se agrupan en una sola invocación
+            logger.info(f"🎥 Abriendo video: {launch['url'] or 'aleatorio'}")
+            specific = bool(alarm.video_url and alarm.video_url.strip())
+            success = browser.submit_launch(launch, alarm_id=alarm.id, specific=specific)
             
             if success:
-                logger.info(f"✅ Video motivacional abierto correctamente en {preferred_browser}")
+                logger.info(f"✅ Video motivacional encolado para {launch['browser']}")
             else:
                 logger.warning(f"⚠️ No se pudo abrir el video motivacional")
                 
@@ -504,6 +928,11 @@ class AlarmManager:
             title = trigger_info.get('title', 'Alarma')
             message = trigger_info.get('description', 'Es hora de tu alarma')
             
+            if self.notifier:
+                self.notifier(title, message)
+                return
+            
+            from plyer import notification
             notification.notify(
                 title=title,
                 message=message,
@@ -544,22 +973,27 @@ class AlarmManager:
             alarm = Alarm()
             self._update_alarm_from_data(alarm, alarm_data)
             
-            # Verificar duplicados
-            if self._is_duplicate_alarm(alarm):
-                logger.warning(f"Alarma duplicada detectada: {alarm.title}")
-                return None
-            
             # Calcular próxima activación
-            alarm.next_trigger = alarm.get_next_trigger_time()
-            if alarm.next_trigger is None:
+            next_trigger = alarm.get_next_trigger_time()
+            if next_trigger is None:
                 logger.error("No se puede calcular próxima activación")
                 return None
+            alarm.next_trigger = next_trigger.isoformat()
+            alarm.version += 1
             
-            # Agregar a la lista
-            self.alarms.append(alarm)
-            self.save_alarms()
+            # Bajo el bloqueo, para que una fusión desde disco no descarte la nueva alarma
+            with self._lock:
+                # Verificar duplicados
+                if self._is_duplicate_alarm(alarm):
+                    logger.warning(f"Alarma duplicada detectada: {alarm.title}")
+                    return None
+                
+                # Agregar a la lista
+                self.alarms.append(alarm)
+                self.save_alarms()
             
             logger.info(f"Alarma agregada: {alarm.title} ({alarm.id})")
+            self._emit_change("added", [alarm])
             return alarm.id
             
         except Exception as e:
@@ -578,28 +1012,29 @@ class AlarmManager:
             True si se actualizó correctamente
         """
         try:
-            # Buscar alarma
-            alarm = self.get_alarm_by_id(alarm_id)
-            if alarm is None:
-                logger.error(f"Alarma no encontrada: {alarm_id}")
-                return False
-            
             # Validar datos
             if not self._validate_alarm_data(alarm_data):
                 logger.error("Datos de alarma inválidos")
                 return False
             
-            # Actualizar datos
-            old_enabled = alarm.enabled
-            self._update_alarm_from_data(alarm, alarm_data)
-            
-            # Recalcular próxima activación si es necesario
-            if alarm.enabled:
-                alarm.next_trigger = alarm.get_next_trigger_time()
-            
-            self.save_alarms()
+            with self._lock:
+                # Buscar alarma
+                alarm = self.get_alarm_by_id(alarm_id)
+                if alarm is None:
+                    logger.error(f"Alarma no encontrada: {alarm_id}")
+                    return False
+                
+                # Actualizar datos
+                self._update_alarm_from_data(alarm, alarm_data)
+                
+                # Recalcular próxima activación si es necesario
+                self._reschedule_alarm(alarm)
+                alarm.version += 1
+                
+                self.save_alarms()
             
             logger.info(f"Alarma actualizada: {alarm.title} ({alarm_id})")
+            self._emit_change("updated", [alarm])
             return True
             
         except Exception as e:
@@ -617,12 +1052,19 @@ class AlarmManager:
             True si se eliminó correctamente
         """
         try:
-            for i, alarm in enumerate(self.alarms):
-                if alarm.id == alarm_id:
-                    deleted_alarm = self.alarms.pop(i)
-                    self.save_alarms()
-                    logger.info(f"Alarma eliminada: {deleted_alarm.title} ({alarm_id})")
-                    return True
+            with self._lock:
+                for i, alarm in enumerate(self.alarms):
+                    if alarm.id == alarm_id:
+                        deleted_alarm = self.alarms.pop(i)
+                        self.save_alarms()
+                        break
+                else:
+                    deleted_alarm = None
+            
+            if deleted_alarm is not None:
+                logger.info(f"Alarma eliminada: {deleted_alarm.title} ({alarm_id})")
+                self._emit_change("removed", ids=[alarm_id])
+                return True
             
             logger.warning(f"Alarma no encontrada para eliminar: {alarm_id}")
             return False
@@ -631,6 +1073,119 @@ class AlarmManager:
             logger.error(f"Error eliminando alarma: {e}")
             return False
     
+    def apply_batch(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Aplica varias altas, modificaciones y bajas guardando el archivo una sola vez
+        Las búsquedas por ID y la detección de duplicados usan índices en memoria,
+        así que el coste es lineal en el número de alarmas y operaciones
+        
+        Args:
+            operations: Lista de {'op': 'add' | 'update' | 'delete', 'id': ..., 'data': {...}}
+            
+        Returns:
+            Resultado por operación: {'ok': bool, 'id': ..., 'error': ...}
+        """
+        results = []
+        
+        with self._lock:
+            by_id = {alarm.id: alarm for alarm in self.alarms}
+            prevent_duplicates = self.config_manager.get('validation', 'prevent_duplicates', True)
+            keys = Counter((alarm.title, alarm.time, alarm.recurrence) for alarm in self.alarms)
+            deleted = set()
+            added: Dict[str, Alarm] = {}
+            updated: Dict[str, Alarm] = {}
+            removed: List[str] = []
+            
+            for operation in operations:
+                op = operation.get('op')
+                alarm_id = operation.get('id')
+                data = operation.get('data') or {}
+                error = None
+                
+                try:
+                    if op == 'add':
+                        alarm = Alarm()
+                        error = self._alarm_data_error(data)
+                        if error is None:
+                            self._update_alarm_from_data(alarm, data)
+                            key = (alarm.title, alarm.time, alarm.recurrence)
+                            next_trigger = alarm.get_next_trigger_time()
+                            if prevent_duplicates and keys[key]:
+                                error = "alarma duplicada"
+                            elif next_trigger is None:
+                                error = "no se puede calcular próxima activación"
+                            else:
+                                alarm.next_trigger = next_trigger.isoformat()
+                                alarm.version += 1
+                                self.alarms.append(alarm)
+                                by_id[alarm.id] = alarm
+                                keys[key] += 1
+                                alarm_id = alarm.id
+                                added[alarm_id] = alarm
+                    
+                    elif op == 'update':
+                        alarm = by_id.get(alarm_id)
+                        if alarm is None:
+                            error = "alarma no encontrada"
+                        else:
+                            error = self._alarm_data_error(data) or self._update_schedule_error(alarm, data)
+                        if error is None:
+                            keys[(alarm.title, alarm.time, alarm.recurrence)] -= 1
+                            self._update_alarm_from_data(alarm, data)
+                            keys[(alarm.title, alarm.time, alarm.recurrence)] += 1
+                            self._reschedule_alarm(alarm)
+                            alarm.version += 1
+                            if alarm_id not in added:
+                                updated[alarm_id] = alarm
+                    
+                    elif op == 'delete':
+                        alarm = by_id.pop(alarm_id, None)
+                        if alarm is None:
+                            error = "alarma no encontrada"
+                        else:
+                            keys[(alarm.title, alarm.time, alarm.recurrence)] -= 1
+                            deleted.add(alarm_id)
+                            updated.pop(alarm_id, None)
+                            removed.append(alarm_id)
+                    
+                    else:
+                        error = f"operación desconocida: {op}"
+                
+                except Exception as e:
+                    error = str(e)
+                
+                results.append({'ok': error is None, 'id': alarm_id, 'error': error})
+            
+            if deleted:
+                self.alarms = [alarm for alarm in self.alarms if alarm.id not in deleted]
+        
+        if any(result['ok'] for result in results):
+            self.save_alarms()
+            logger.info(f"Lote aplicado: {sum(r['ok'] for r in results)}/{len(results)} operaciones")
+            self._emit_change("added", list(added.values()))
+            self._emit_change("updated", list(updated.values()))
+            self._emit_change("removed", ids=removed)
+        
+        return results
+    
+    def _update_schedule_error(self, alarm: Alarm, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Comprueba sobre una copia que una alarma activada seguirá teniendo
+        próxima activación tras aplicarle los datos
+        
+        Args:
+            alarm: Alarma a modificar
+            data: Nuevos datos (ya validados)
+            
+        Returns:
+            Descripción del error o None
+        """
+        candidate = Alarm.from_dict(alarm.to_dict())
+        self._update_alarm_from_data(candidate, data)
+        if candidate.enabled and candidate.get_next_trigger_time() is None:
+            return "no se puede calcular próxima activación"
+        return None
+    
     def get_alarm_by_id(self, alarm_id: str) -> Optional[Alarm]:
         """
         Obtiene una alarma por su ID
@@ -737,6 +1292,54 @@ class AlarmManager:
         except Exception:
             return False
     
+    def _alarm_data_error(self, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Valida tipo y valor de cada campo conocido de unos datos de alarma
+        (los campos desconocidos se ignoran, como en _update_alarm_from_data)
+        
+        Args:
+            data: Datos completos o parciales de una alarma
+            
+        Returns:
+            Descripción del primer error o None si los datos son válidos
+        """
+        if not isinstance(data, dict):
+            return "se esperaba un objeto con los datos de la alarma"
+        
+        for field, value in data.items():
+            expected = ALARM_FIELD_TYPES.get(field)
+            if expected is None:
+                continue
+            # bool es subclase de int, pero no es un número válido aquí
+            if not isinstance(value, expected) or (isinstance(value, bool) and bool not in expected):
+                return f"tipo inválido para {field}"
+            
+            if field in ALARM_FIELD_RANGES:
+                low, high = ALARM_FIELD_RANGES[field]
+                if not low <= value <= high:
+                    return f"{field} fuera de rango ({low}-{high})"
+        
+        if 'time' in data:
+            try:
+                datetime.strptime(data['time'], "%H:%M")
+            except ValueError:
+                return "time debe tener formato HH:MM"
+        
+        if data.get('recurrence', RECURRENCE_TYPES[0]) not in RECURRENCE_TYPES:
+            return f"recurrence debe ser uno de: {', '.join(RECURRENCE_TYPES)}"
+        
+        for day in data.get('days_of_week', []):
+            if isinstance(day, bool) or not isinstance(day, int) or not 0 <= day <= 6:
+                return "days_of_week debe contener enteros de 0 (lunes) a 6 (domingo)"
+        
+        schedule = data.get('custom_schedule')
+        if isinstance(schedule, list) and schedule:
+            return "custom_schedule debe ser una expresión cron"
+        if isinstance(schedule, str) and schedule and not croniter.is_valid(schedule):
+            return "custom_schedule no es una expresión cron válida"
+        
+        return None
+    
     def _is_duplicate_alarm(self, alarm: Alarm) -> bool:
         """
         Verifica si una alarma es duplicada
@@ -761,12 +1364,37 @@ class AlarmManager:
     def save_alarms(self):
         """
         Guarda las alarmas al archivo
+        Si otro proceso escribió desde la última lectura o escritura propia, su
+        contenido se fusiona por ID (gana la versión más alta) antes de escribir
         """
+        merges = []
+        
+        def merge(content: str) -> str:
+            try:
+                alarms_data = json.loads(content)
+            except ValueError as e:
+                logger.warning(f"Archivo de alarmas ilegible, se sobrescribe: {e}")
+            else:
+                known = {alarm.id for alarm in self.alarms}
+                merges.append((known, self._merge_alarms(alarms_data)))
+            return json.dumps([alarm.to_dict() for alarm in self.alarms], indent=2, ensure_ascii=False)
+        
         try:
-            alarms_data = [alarm.to_dict() for alarm in self.alarms]
+            with self._lock:
+                alarms_data = [alarm.to_dict() for alarm in self.alarms]
+                
+                # Escritura atómica bajo bloqueo compartido con otros procesos
+                self._get_store().write(json.dumps(alarms_data, indent=2, ensure_ascii=False), merge=merge)
+                
+                self._disk_versions = {alarm.id: alarm.version for alarm in self.alarms}
             
-            with open(self.alarms_file, 'w', encoding='utf-8') as f:
-                json.dump(alarms_data, f, indent=2, ensure_ascii=False)
+            for known, affected in merges:
+                if affected:
+                    logger.info(f"Cambios externos fusionados al guardar: {len(affected)}")
+                    self._emit_merge(known, affected)
+            
+            if self.file_watcher:
+                self.file_watcher.acknowledge(self.alarms_file)
                 
             logger.info("Alarmas guardadas correctamente")
             
@@ -778,17 +1406,160 @@ class AlarmManager:
         Carga las alarmas desde el archivo
         """
         try:
-            if os.path.exists(self.alarms_file):
-                with open(self.alarms_file, 'r', encoding='utf-8') as f:
-                    alarms_data = json.load(f)
+            content, _ = self._get_store().read(force=True)
+            if content is not None:
+                alarms_data = json.loads(content)
                 
-                self.alarms = [Alarm.from_dict(data) for data in alarms_data]
+                with self._lock:
+                    self.alarms = [Alarm.from_dict(data) for data in alarms_data]
+                    self._disk_versions = {alarm.id: alarm.version for alarm in self.alarms}
                 logger.info(f"Cargadas {len(self.alarms)} alarmas")
                 
         except Exception as e:
             logger.error(f"Error cargando alarmas: {e}")
             self.alarms = []
     
+    def _get_store(self) -> FileStore:
+        """
+        Obtiene el almacén del archivo de alarmas actual
+        
+        Returns:
+            Instancia de FileStore para alarms_file
+        """
+        if self._store is None or self._store.path != self.alarms_file:
+            self._store = FileStore(self.alarms_file)
+        return self._store
+    
+    def reload_alarms(self) -> List[str]:
+        """
+        Recarga alarms.json tras un cambio externo y lo fusiona con la memoria
+        
+        Returns:
+            Lista de IDs de alarmas afectadas
+        """
+        # Lectura y fusión bajo el bloqueo: una escritura propia intermedia haría
+        # que la copia leída pareciera haber eliminado las alarmas recién guardadas
+        with self._lock:
+            try:
+                content, changed = self._get_store().read()
+                if not changed or content is None:
+                    # Misma generación y firma: no hace falta volver a parsear
+                    return []
+                alarms_data = json.loads(content)
+            except Exception as e:
+                logger.error(f"Error recargando alarmas: {e}")
+                return []
+            
+            known = {alarm.id for alarm in self.alarms}
+            affected = self._merge_alarms(alarms_data)
+        
+        if affected:
+            logger.info(f"Alarmas recargadas desde disco: {len(affected)} cambios")
+            self._emit_merge(known, affected)
+        return affected
+    
+    def _emit_merge(self, known: Set[str], affected: List[str]):
+        """
+        Emite los eventos de cambio de una fusión desde disco
+        
+        Args:
+            known: IDs en memoria antes de la fusión
+            affected: IDs añadidos, actualizados o eliminados por la fusión
+        """
+        with self._lock:
+            current = {alarm.id: alarm for alarm in self.alarms if alarm.id in affected}
+        
+        self._emit_change("added", [alarm for alarm_id, alarm in current.items() if alarm_id not in known])
+        self._emit_change("updated", [alarm for alarm_id, alarm in current.items() if alarm_id in known])
+        self._emit_change("removed", ids=[alarm_id for alarm_id in affected if alarm_id not in current])
+    
+    def _merge_alarms(self, alarms_data: List[Dict[str, Any]]) -> List[str]:
+        """
+        Fusiona alarmas leídas de disco por ID (gana la versión más alta)
+        
+        Args:
+            alarms_data: Alarmas serializadas leídas del archivo
+            
+        Returns:
+            Lista de IDs de alarmas añadidas, actualizadas o eliminadas
+        """
+        with self._lock:
+            current = {alarm.id: alarm for alarm in self.alarms}
+            disk_versions = {}
+            affected = []
+            merged = []
+            
+            for data in alarms_data:
+                disk_alarm = Alarm.from_dict(data)
+                disk_versions[disk_alarm.id] = disk_alarm.version
+                local = current.pop(disk_alarm.id, None)
+                
+                if local is None and disk_alarm.id in self._disk_versions:
+                    # Eliminada aquí y aún no guardada: la baja local se conserva
+                    continue
+                elif local is None:
+                    merged.append(disk_alarm)
+                    affected.append(disk_alarm.id)
+                elif self._disk_copy_wins(local, disk_alarm):
+                    merged.append(disk_alarm)
+                    affected.append(disk_alarm.id)
+                else:
+                    merged.append(local)
+            
+            # Alarmas que ya no están en disco
+            for alarm_id, local in current.items():
+                known_version = self._disk_versions.get(alarm_id)
+                if known_version is not None and local.version <= known_version:
+                    # Otro proceso la eliminó y no hay cambios locales pendientes
+                    affected.append(alarm_id)
+                else:
+                    # Alarma local aún no guardada
+                    merged.append(local)
+            
+            self.alarms = merged
+            self._disk_versions = disk_versions
+            
+            # Reprogramar solo las alarmas afectadas
+            for alarm in merged:
+                if alarm.id in affected:
+                    self._reschedule_alarm(alarm)
+            
+            return affected
+    
+    def _disk_copy_wins(self, local: Alarm, disk_alarm: Alarm) -> bool:
+        """
+        Determina si la copia de disco debe reemplazar a la local
+        
+        Args:
+            local: Alarma en memoria
+            disk_alarm: Alarma leída de disco
+            
+        Returns:
+            True si gana la copia de disco
+        """
+        if disk_alarm.version > local.version:
+            return True
+        
+        if disk_alarm.version < local.version:
+            return False
+        
+        # Misma versión: editada a mano sin subir versión; gana disco si no hay cambios locales
+        unchanged_locally = self._disk_versions.get(local.id) == local.version
+        return unchanged_locally and disk_alarm.to_dict() != local.to_dict()
+    
+    def _reschedule_alarm(self, alarm: Alarm):
+        """
+        Recalcula la próxima activación de una alarma
+        
+        Args:
+            alarm: Alarma a reprogramar
+        """
+        if not alarm.enabled:
+            return
+        
+        next_trigger = alarm.get_next_trigger_time()
+        alarm.next_trigger = next_trigger.isoformat() if next_trigger else None
+    
     def set_notification_callback(self, callback):
         """
         Establece el callback para notificaciones
@@ -798,6 +1569,130 @@ class AlarmManager:
         """
         self.notification_callback = callback
     
+    def set_callback_dispatcher(self, dispatcher):
+        """
+        Establece cómo se entregan notification_callback y audio_callback
+        
+        Con un dispatcher el planificador solo encola el callback y sigue; sin él
+        se llama directamente desde el hilo del planificador
+        
+        Args:
+            dispatcher: Función (callback, *args, key=...) como MainThreadDispatcher.submit,
+                o None para llamar directamente
+        """
+        self.callback_dispatcher = dispatcher
+    
+    def _run_callback(self, callback, trigger_info: Dict[str, Any], kind: str):
+        """
+        Entrega un callback de disparo a través del dispatcher, si lo hay
+        
+        Args:
+            callback: Callback de notificación o de audio
+            trigger_info: Información del disparo
+            kind: Tipo de callback; junto con el ID de la alarma forma la clave de
+                fusión, así que dos disparos pendientes de la misma alarma se entregan una vez
+        """
+        try:
+            if self.callback_dispatcher:
+                self.callback_dispatcher(callback, trigger_info, key=f"{kind}:{trigger_info.get('id')}")
+            else:
+                callback(trigger_info)
+        except Exception as e:
+            logger.error(f"Error entregando callback de {kind}: {e}")
+    
+    def add_change_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Registra un oyente de cambios en las alarmas
+        
+        Cada evento es {'type', 'ids', 'alarms', 'timestamp'}, donde type es uno de
+        CHANGE_TYPES y alarms las instancias afectadas por ID (vacío en "removed");
+        los disparos incluyen además 'trigger' con la información del disparo.
+        El oyente se llama desde el hilo que hizo el cambio
+        
+        Args:
+            listener: Función que recibe el evento
+        """
+        self.change_listeners.append(listener)
+    
+    def remove_change_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Elimina un oyente de cambios
+        
+        Args:
+            listener: Función registrada con add_change_listener
+        """
+        if listener in self.change_listeners:
+            self.change_listeners.remove(listener)
+    
+    def _emit_change(self, change_type: str, alarms: List[Alarm] = None, ids: List[str] = None, **extra):
+        """
+        Notifica un cambio a los oyentes (no hace nada si no hay alarmas afectadas)
+        
+        Args:
+            change_type: Uno de CHANGE_TYPES
+            alarms: Alarmas afectadas
+            ids: IDs afectados, para las bajas
+            **extra: Campos adicionales del evento
+        """
+        alarms = alarms or []
+        ids = ids if ids is not None else [alarm.id for alarm in alarms]
+        if not ids or not self.change_listeners:
+            return
+        
+        event = {
+            'type': change_type,
+            'ids': ids,
+            'alarms': {alarm.id: alarm for alarm in alarms},
+            'timestamp': datetime.now().isoformat()
+        }
+        event.update(extra)
+        
+        for listener in list(self.change_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Error notificando cambio a un oyente: {e}")
+    
+    def set_browser(self, browser):
+        """
+        Establece el backend de navegador usado para abrir los videos
+        
+        Args:
+            browser: Objeto con prepare_launch y submit_launch (como BrowserIntegration)
+        """
+        self.browser = browser
+    
+    def _get_browser(self):
+        """
+        Obtiene el backend de navegador; sin uno explícito se usa la instancia
+        compartida, cuya detección de navegadores ya está hecha
+        
+        Returns:
+            Backend de navegador
+        """
+        if self.browser is None:
+            from browser_integration import get_browser_integration
+            return get_browser_integration(self.config_manager)
+        return self.browser
+    
+    def set_notifier(self, notifier):
+        """
+        Establece el backend de notificaciones
+        
+        Args:
+            notifier: Función (título, mensaje); None usa plyer
+        """
+        self.notifier = notifier
+    
+    def set_audio_manager(self, audio_manager):
+        """
+        Establece el gestor de audio usado para reproducir los sonidos de alarma
+        
+        Args:
+            audio_manager: Instancia de AudioManager
+        """
+        self.audio_manager = audio_manager
+    
     def set_audio_callback(self, callback):
         """
         Establece el callback para audio
@@ -815,9 +1710,12 @@ class AlarmManager:
             True si se eliminaron correctamente
         """
         try:
-            self.alarms.clear()
-            self.save_alarms()
+            with self._lock:
+                removed = [alarm.id for alarm in self.alarms]
+                self.alarms.clear()
+                self.save_alarms()
             logger.info("Todas las alarmas han sido eliminadas")
+            self._emit_change("removed", ids=removed)
             return True
         except Exception as e:
             logger.error(f"Error eliminando todas las alarmas: {e}")
@@ -884,13 +1782,25 @@ class AlarmManager:
             
             imported_alarms = [Alarm.from_dict(data) for data in import_data.get('alarms', [])]
             
-            if merge:
-                self.alarms.extend(imported_alarms)
-            else:
-                self.alarms = imported_alarms
-            
-            self.save_alarms()
+            with self._lock:
+                # Subir la versión por encima de cualquier copia conocida para que
+                # la fusión con disco no revierta la importación
+                known_versions = dict(self._disk_versions)
+                for alarm in self.alarms:
+                    known_versions[alarm.id] = max(alarm.version, known_versions.get(alarm.id, 0))
+                for alarm in imported_alarms:
+                    alarm.version = max(alarm.version, known_versions.get(alarm.id, 0)) + 1
+                
+                removed = [] if merge else [alarm.id for alarm in self.alarms]
+                if merge:
+                    self.alarms.extend(imported_alarms)
+                else:
+                    self.alarms = imported_alarms
+                
+                self.save_alarms()
             logger.info(f"Importadas {len(imported_alarms)} alarmas")
+            self._emit_change("removed", ids=removed)
+            self._emit_change("added", imported_alarms)
             return True
             
         except Exception as e:
@@ -0,0 +1,860 @@
+"""
+Módulo de motor de audio en proceso
+Decodifica WAV una sola vez con el módulo wave, mantiene los PCM en una caché
+LRU limitada por tamaño y reproduce bloques hacia una salida intercambiable
+"""
+
+import os
+import time
+import uuid
+import wave
+import array
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # El motor trabaja con PCM de 16 bits con signo
+DEFAULT_BLOCK_FRAMES = 1024
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+PIPE_DRAIN_TIMEOUT = 2.0  # Segundos para que el reproductor vacíe tubería y búfer de ALSA
+
+class PcmBuffer:
+    """
+    Sonido decodificado en memoria (PCM de 16 bits intercalado)
+    """
+
+    def __init__(self, frames: bytes, channels: int, framerate: int):
+        """
+        Inicializa el búfer
+
+        Args:
+            frames: Muestras PCM intercaladas
+            channels: Número de canales
+            framerate: Frecuencia de muestreo en Hz
+        """
+        self.data = memoryview(frames)
+        self.channels = channels
+        self.framerate = framerate
+        self.frame_bytes = channels * SAMPLE_WIDTH
+        self.nframes = len(frames) // self.frame_bytes
+
+    @property
+    def nbytes(self) -> int:
+        """Tamaño en bytes de las muestras"""
+        return self.data.nbytes
+
+    @property
+    def duration(self) -> float:
+        """Duración en segundos"""
+        return self.nframes / self.framerate if self.framerate else 0.0
+
+    def chunk(self, start_frame: int, nframes: int) -> memoryview:
+        """
+        Devuelve un tramo de muestras sin copiarlas
+
+        Args:
+            start_frame: Primer frame
+            nframes: Número de frames
+
+        Returns:
+            Vista sobre las muestras del tramo
+        """
+        start = start_frame * self.frame_bytes
+        return self.data[start:start + nframes * self.frame_bytes]
+
+def decode_wav(file_path: str) -> PcmBuffer:
+    """
+    Decodifica un archivo WAV PCM de 16 bits
+
+    Args:
+        file_path: Ruta del archivo
+
+    Returns:
+        Búfer PCM decodificado
+
+    Raises:
+        ValueError: Si el formato no es PCM de 16 bits
+    """
+    with wave.open(file_path, 'rb') as wav:
+        if wav.getsampwidth() != SAMPLE_WIDTH or wav.getcomptype() != 'NONE':
+            raise ValueError(f"Formato WAV no soportado (se requiere PCM de 16 bits): {file_path}")
+        frames = wav.readframes(wav.getnframes())
+        return PcmBuffer(frames, wav.getnchannels(), wav.getframerate())
+
+class PcmCache:
+    """
+    Caché LRU de sonidos decodificados, limitada por bytes
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Inicializa la caché
+
+        Args:
+            max_bytes: Tamaño máximo total de las muestras en caché
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], PcmBuffer]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> PcmBuffer:
+        """
+        Obtiene el sonido decodificado, decodificándolo si no está en caché
+        o si el archivo cambió (mtime o tamaño)
+
+        Args:
+            file_path: Ruta del archivo WAV
+
+        Returns:
+            Búfer PCM
+        """
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry and entry[0] == signature:
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return entry[1]
+
+        buffer = decode_wav(file_path)
+
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(file_path, None)
+            if old:
+                self.total_bytes -= old[1].nbytes
+
+            if buffer.nbytes <= self.max_bytes:
+                self._entries[file_path] = (signature, buffer)
+                self.total_bytes += buffer.nbytes
+                while self.total_bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.total_bytes -= evicted.nbytes
+
+        return buffer
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de la caché
+
+        Returns:
+            Diccionario con entradas, bytes, aciertos y fallos
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+def apply_gain(block, gain: float):
+    """
+    Aplica una ganancia constante a un bloque PCM de 16 bits
+
+    Args:
+        block: Muestras (bytes, memoryview o arreglo NumPy int16)
+        gain: Factor de ganancia (1.0 deja el bloque intacto)
+
+    Returns:
+        Bloque con la ganancia aplicada (el mismo objeto si gain es 1.0)
+    """
+    if gain == 1.0:
+        return block
+
+    if np is not None:
+        samples = np.frombuffer(block, dtype=np.int16) if not isinstance(block, np.ndarray) else block
+        scaled = samples.astype(np.float32) * gain
+        return np.clip(scaled, -32768, 32767).astype(np.int16)
+
+    samples = array.array('h', bytes(block))
+    return array.array('h', (max(-32768, min(32767, int(s * gain))) for s in samples))
+
+RAMP_CURVES = ("linear", "exponential")
+MIN_EXPONENTIAL_GAIN = 0.001  # -60 dB: punto de partida de la rampa exponencial
+
+class GainEnvelope:
+    """
+    Etapa de ganancia progresiva: lleva la ganancia de start_gain a end_gain
+    en ramp_frames frames y la mantiene después. Procesa bloque a bloque, así
+    que la memoria usada no depende de la duración del sonido
+    """
+
+    def __init__(self, start_gain: float, end_gain: float, ramp_frames: int, curve: str = "linear"):
+        """
+        Inicializa la envolvente
+
+        Args:
+            start_gain: Ganancia inicial (0-1)
+            end_gain: Ganancia final (0-1)
+            ramp_frames: Duración de la rampa en frames
+            curve: 'linear' o 'exponential' (lineal en decibelios)
+        """
+        if curve not in RAMP_CURVES:
+            raise ValueError(f"Curva de rampa no soportada: {curve}")
+
+        self.start_gain = start_gain
+        self.end_gain = end_gain
+        self.ramp_frames = max(0, int(ramp_frames))
+        self.curve = curve
+        self.position = 0  # Frames ya procesados
+
+    @property
+    def finished(self) -> bool:
+        """Indica si la rampa ya terminó"""
+        return self.position >= self.ramp_frames
+
+    def gain_at(self, frame: int) -> float:
+        """
+        Calcula la ganancia en un frame
+
+        Args:
+            frame: Posición en frames desde el inicio
+
+        Returns:
+            Ganancia en ese frame
+        """
+        if frame >= self.ramp_frames:
+            return self.end_gain
+
+        t = frame / self.ramp_frames
+        if self.curve == "linear":
+            return self.start_gain + (self.end_gain - self.start_gain) * t
+
+        start = max(self.start_gain, MIN_EXPONENTIAL_GAIN)
+        end = max(self.end_gain, MIN_EXPONENTIAL_GAIN)
+        return start * (end / start) ** t
+
+    def process(self, block, channels: int):
+        """
+        Aplica la envolvente al siguiente bloque
+
+        Args:
+            block: Muestras PCM de 16 bits intercaladas
+            channels: Número de canales
+
+        Returns:
+            Bloque con la ganancia aplicada
+        """
+        if self.finished:
+            return apply_gain(block, self.end_gain)
+
+        if np is not None:
+            samples = np.frombuffer(block, dtype=np.int16) if not isinstance(block, np.ndarray) else block
+            nframes = len(samples) // channels
+            t = np.minimum((self.position + np.arange(nframes, dtype=np.float32)) / self.ramp_frames, 1.0)
+
+            if self.curve == "linear":
+                gains = self.start_gain + (self.end_gain - self.start_gain) * t
+            else:
+                start = max(self.start_gain, MIN_EXPONENTIAL_GAIN)
+                end = max(self.end_gain, MIN_EXPONENTIAL_GAIN)
+                gains = start * np.power(end / start, t, dtype=np.float32)
+                gains[t >= 1.0] = self.end_gain
+
+            self.position += nframes
+            scaled = samples.reshape(nframes, channels).astype(np.float32) * gains[:, None]
+            return np.clip(scaled, -32768, 32767).astype(np.int16).reshape(-1)
+
+        samples = array.array('h', bytes(block))
+        nframes = len(samples) // channels
+        for frame in range(nframes):
+            gain = self.gain_at(self.position + frame)
+            for index in range(frame * channels, (frame + 1) * channels):
+                samples[index] = max(-32768, min(32767, int(samples[index] * gain)))
+        self.position += nframes
+        return samples
+
+class AudioSink:
+    """
+    Salida de audio: recibe bloques PCM de 16 bits intercalados
+    """
+
+    def open(self, framerate: int, channels: int):
+        """
+        Prepara la salida para un formato
+
+        Args:
+            framerate: Frecuencia de muestreo en Hz
+            channels: Número de canales
+        """
+
+    def write(self, block):
+        """
+        Escribe un bloque de muestras
+
+        Args:
+            block: Muestras (objeto compatible con el protocolo de búfer)
+        """
+        raise NotImplementedError
+
+    def close(self, drain: bool = True):
+        """
+        Cierra la salida
+
+        Args:
+            drain: Dejar que suene lo ya escrito (fin natural); False corta en seco
+        """
+
+class NullSink(AudioSink):
+    """
+    Salida que descarta el audio; cuenta los frames para pruebas sin sonido
+    """
+
+    def __init__(self, realtime: bool = False):
+        """
+        Inicializa la salida
+
+        Args:
+            realtime: Esperar la duración de cada bloque como una tarjeta real
+        """
+        self.realtime = realtime
+        self.frames_written = 0
+        self.framerate = 0
+        self.channels = 0
+        self.closed = False
+        self.drained = None
+
+    def open(self, framerate: int, channels: int):
+        self.framerate = framerate
+        self.channels = channels
+
+    def write(self, block):
+        frames = memoryview(block).nbytes // (SAMPLE_WIDTH * max(self.channels, 1))
+        self.frames_written += frames
+        if self.realtime and self.framerate:
+            time.sleep(frames / self.framerate)
+
+    def close(self, drain: bool = True):
+        self.closed = True
+        self.drained = drain
+
+class WaveFileSink(AudioSink):
+    """
+    Salida a un archivo WAV; útil para pruebas sin tarjeta de sonido
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Inicializa la salida
+
+        Args:
+            file_path: Archivo WAV a escribir
+        """
+        self.file_path = file_path
+        self._wav = None
+
+    def open(self, framerate: int, channels: int):
+        self._wav = wave.open(self.file_path, 'wb')
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(SAMPLE_WIDTH)
+        self._wav.setframerate(framerate)
+
+    def write(self, block):
+        self._wav.writeframes(memoryview(block).cast('B'))
+
+    def close(self, drain: bool = True):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+class PipeSink(AudioSink):
+    """
+    Salida hacia un reproductor que lee PCM crudo por stdin (por ejemplo aplay)
+    """
+
+    def __init__(self, command_factory: Callable[[int, int], List[str]]):
+        """
+        Inicializa la salida
+
+        Args:
+            command_factory: Función (framerate, canales) -> argv del reproductor
+        """
+        self.command_factory = command_factory
+        self.process = None
+
+    def open(self, framerate: int, channels: int):
+        self.process = subprocess.Popen(
+            self.command_factory(framerate, channels),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+    def write(self, block):
+        self.process.stdin.write(memoryview(block).cast('B'))
+
+    def close(self, drain: bool = True):
+        """
+        Cierra stdin del reproductor; al terminar de forma natural espera a que
+        reproduzca lo que queda en la tubería y en su búfer antes de cortarlo
+
+        Args:
+            drain: Esperar hasta PIPE_DRAIN_TIMEOUT segundos; False termina el proceso ya
+        """
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except Exception:
+            pass
+
+        if drain:
+            try:
+                process.wait(timeout=PIPE_DRAIN_TIMEOUT)
+                return
+            except subprocess.TimeoutExpired:
+                logger.warning("El reproductor no terminó de vaciar su búfer; se detiene")
+
+        process.terminate()
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def aplay_command(aplay_path: str) -> Callable[[int, int], List[str]]:
+    """
+    Construye la fábrica de argv de aplay para PCM crudo de 16 bits
+
+    Args:
+        aplay_path: Ruta del ejecutable aplay
+
+    Returns:
+        Función (framerate, canales) -> argv
+    """
+    def factory(framerate: int, channels: int) -> List[str]:
+        return [aplay_path, "-q", "-t", "raw", "-f", "S16_LE", "-r", str(framerate), "-c", str(channels)]
+    return factory
+
+class EnginePlayback:
+    """
+    Sesión de reproducción del motor en proceso (una voz del mezclador)
+    Mismo interfaz que browser_integration.PlaybackHandle, con volumen en caché
+    """
+
+    def __init__(self, engine: 'AudioEngine', buffer: PcmBuffer, file_path: str,
+                 volume: int, tag: str = None, envelope: GainEnvelope = None):
+        """
+        Inicializa la sesión
+
+        Args:
+            engine: Motor que la reproduce
+            buffer: Sonido decodificado
+            file_path: Archivo de origen
+            volume: Volumen final (0-100)
+            tag: Etiqueta de la sesión (por ejemplo, el ID de la alarma)
+            envelope: Rampa de volumen progresivo hasta 'volume'
+        """
+        self.id = uuid.uuid4().hex
+        self.engine = engine
+        self.buffer = buffer
+        self.file_path = file_path
+        self.volume = max(0, min(100, int(volume)))
+        self.player = "engine"
+        self.tag = tag
+        self.position = 0  # Frame siguiente a reproducir
+        self.envelope = envelope
+        self.started_at = time.time()
+        self._stop_event = threading.Event()
+        self._done = threading.Event()
+        self._failed = False
+
+    @property
+    def status(self) -> str:
+        """Estado de la sesión: playing, finished, failed o stopped"""
+        if self._failed:
+            return "failed"
+        if self._stop_event.is_set():
+            return "stopped"
+        return "finished" if self._done.is_set() else "playing"
+
+    @property
+    def is_active(self) -> bool:
+        """Indica si la sesión sigue sonando"""
+        return self.status == "playing"
+
+    @property
+    def is_pending(self) -> bool:
+        """Indica si la sesión no ha terminado (el motor siempre conoce el estado)"""
+        return self.is_active
+
+    def read_block(self, nframes: int):
+        """
+        Lee el siguiente bloque del sonido con el volumen aplicado
+
+        Args:
+            nframes: Frames por bloque
+
+        Returns:
+            Bloque de muestras o None al terminar
+        """
+        if self.position >= self.buffer.nframes:
+            return None
+        block = self.buffer.chunk(self.position, nframes)
+        self.position += len(block) // self.buffer.frame_bytes
+        if self.envelope is not None:
+            return self.envelope.process(block, self.buffer.channels)
+        return apply_gain(block, self.volume / 100)
+
+    def stop(self) -> bool:
+        """
+        Detiene solo esta sesión
+
+        Returns:
+            True si estaba sonando
+        """
+        if not self.is_active:
+            return False
+        self._stop_event.set()
+        self.engine.mixer.remove(self)
+        return True
+
+    def wait(self, timeout: float = None) -> Optional[int]:
+        """
+        Espera a que termine la reproducción
+
+        Args:
+            timeout: Segundos máximos de espera
+
+        Returns:
+            0 si terminó (o se detuvo), 1 si falló, None si sigue sonando
+        """
+        if not self._done.wait(timeout):
+            return None
+        return 1 if self._failed else 0
+
+    def set_volume(self, volume: int) -> bool:
+        """
+        Cambia el volumen; se aplica desde el siguiente bloque
+
+        Args:
+            volume: Volumen (se limita a 0-100)
+
+        Returns:
+            True (el cambio se aplica en caliente)
+        """
+        self.volume = max(0, min(100, int(volume)))
+        if self.envelope is not None:
+            self.envelope.end_gain = self.volume / 100
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte la sesión a diccionario
+
+        Returns:
+            Diccionario con el estado de la sesión
+        """
+        return {
+            'id': self.id,
+            'tag': self.tag,
+            'file_path': self.file_path,
+            'player': self.player,
+            'volume': self.volume,
+            'started_at': self.started_at,
+            'status': self.status,
+            'position': self.position
+        }
+
+def _as_samples(block, channels: int, out_channels: int):
+    """
+    Convierte un bloque a muestras int16 con los canales de salida
+    (mono se duplica; varios canales a mono se promedian)
+    """
+    samples = np.frombuffer(block, dtype=np.int16) if not isinstance(block, np.ndarray) else block
+    if channels == out_channels:
+        return samples
+    if channels == 1:
+        return np.repeat(samples, out_channels)
+    return samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+
+class Mixer:
+    """
+    Mezclador por software: suma las voces activas bloque a bloque, con
+    protección contra saturación, y escribe el resultado en una sola salida.
+    La salida se abre con la primera voz y se cierra al quedar en silencio
+    """
+
+    def __init__(self, sink_factory: Callable[[], AudioSink],
+                 block_frames: int = DEFAULT_BLOCK_FRAMES):
+        """
+        Inicializa el mezclador
+
+        Args:
+            sink_factory: Función que crea la salida compartida
+            block_frames: Frames por bloque mezclado
+        """
+        self.sink_factory = sink_factory
+        self.block_frames = block_frames
+        self.framerate = None
+        self.channels = None
+        self.streams: Dict[str, EnginePlayback] = {}
+        self.blocks_mixed = 0
+        self.clipped_blocks = 0
+        self.max_streams = 0
+        self.sink_opens = 0
+        self._cut_on_close = False  # La última voz se detuvo: cortar en vez de vaciar
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, playback: EnginePlayback):
+        """
+        Añade una voz; empieza a sonar en el siguiente bloque
+
+        Args:
+            playback: Sesión a mezclar
+
+        Raises:
+            ValueError: Si la frecuencia o los canales no encajan con la salida abierta
+        """
+        buffer = playback.buffer
+        with self._lock:
+            if not self.streams and self._thread is None:
+                self.framerate = buffer.framerate
+                self.channels = buffer.channels
+            elif buffer.framerate != self.framerate:
+                raise ValueError(f"Frecuencia {buffer.framerate} Hz distinta de la mezcla ({self.framerate} Hz)")
+            elif buffer.channels not in (1, self.channels) and self.channels != 1:
+                raise ValueError(f"No se pueden mezclar {buffer.channels} canales en {self.channels}")
+
+            self.streams[playback.id] = playback
+            self._cut_on_close = False
+            self.max_streams = max(self.max_streams, len(self.streams))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def remove(self, playback: EnginePlayback) -> bool:
+        """
+        Quita una voz sin afectar a las demás
+
+        Args:
+            playback: Sesión a quitar
+
+        Returns:
+            True si estaba en la mezcla
+        """
+        with self._lock:
+            removed = self.streams.pop(playback.id, None) is not None
+            if removed and not self.streams:
+                self._cut_on_close = True
+        if removed:
+            playback._done.set()
+        return removed
+
+    def _mix(self, streams: List[EnginePlayback]):
+        """
+        Mezcla el siguiente bloque de cada voz
+
+        Args:
+            streams: Voces activas
+
+        Returns:
+            Tupla (bloque mezclado o None, voces terminadas)
+        """
+        ended = []
+        blocks = []
+        for playback in streams:
+            block = playback.read_block(self.block_frames)
+            if block is None:
+                ended.append(playback)
+            else:
+                blocks.append((block, playback.buffer.channels))
+
+        if not blocks:
+            return None, ended
+
+        if np is not None:
+            if len(blocks) == 1:
+                return _as_samples(blocks[0][0], blocks[0][1], self.channels), ended
+            mixed = np.zeros(self.block_frames * self.channels, dtype=np.int32)
+            used = 0
+            for block, channels in blocks:
+                samples = _as_samples(block, channels, self.channels)
+                mixed[:len(samples)] += samples
+                used = max(used, len(samples))
+            mixed = mixed[:used]
+            if mixed.max() > 32767 or mixed.min() < -32768:
+                self.clipped_blocks += 1
+                np.clip(mixed, -32768, 32767, out=mixed)
+            return mixed.astype(np.int16), ended
+
+        mixed = []
+        for block, channels in blocks:
+            samples = array.array('h', bytes(block))
+            if channels != self.channels:
+                samples = [samples[i // self.channels] for i in range(len(samples) * self.channels)] \
+                    if channels == 1 else [sum(samples[i:i + channels]) // channels
+                                           for i in range(0, len(samples), channels)]
+            if len(samples) > len(mixed):
+                mixed.extend([0] * (len(samples) - len(mixed)))
+            for index, sample in enumerate(samples):
+                mixed[index] += sample
+        if any(sample > 32767 or sample < -32768 for sample in mixed):
+            self.clipped_blocks += 1
+        return array.array('h', (max(-32768, min(32767, sample)) for sample in mixed)), ended
+
+    def _run(self):
+        """
+        Mezcla y escribe bloques mientras queden voces; al quedar vacío
+        cierra la salida antes de dar por terminadas las últimas voces.
+        Si las voces acabaron solas se deja sonar lo ya escrito; si la última
+        se detuvo, se corta
+        """
+        sink = None
+        ended = []
+        streams = []
+        try:
+            while True:
+                with self._lock:
+                    for playback in ended:
+                        self.streams.pop(playback.id, None)
+                    streams = list(self.streams.values())
+                    if not streams:
+                        self._thread = None
+                        drain = not self._cut_on_close
+                        break
+
+                for playback in ended:
+                    playback._done.set()
+
+                if sink is None:
+                    sink = self.sink_factory()
+                    sink.open(self.framerate, self.channels)
+                    self.sink_opens += 1
+
+                block, ended = self._mix(streams)
+                if block is not None:
+                    sink.write(block)
+                    self.blocks_mixed += 1
+
+            # Fuera del bloqueo: vaciar la salida puede tardar
+            if sink is not None:
+                sink.close(drain=drain)
+                sink = None
+        except Exception as e:
+            logger.error(f"Error en el mezclador de audio: {e}")
+            with self._lock:
+                streams = list(self.streams.values())
+                self.streams.clear()
+                self._thread = None
+            for playback in streams:
+                playback._failed = True
+            if sink is not None:
+                try:
+                    sink.close(drain=False)
+                except Exception:
+                    pass
+        finally:
+            for playback in ended:
+                playback._done.set()
+            for playback in streams:
+                if not playback.is_active:
+                    playback._done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del mezclador
+
+        Returns:
+            Diccionario con voces activas, bloques y aperturas de la salida
+        """
+        with self._lock:
+            return {
+                'streams': len(self.streams),
+                'max_streams': self.max_streams,
+                'blocks_mixed': self.blocks_mixed,
+                'clipped_blocks': self.clipped_blocks,
+                'sink_opens': self.sink_opens,
+                'framerate': self.framerate,
+                'channels': self.channels
+            }
+
+class AudioEngine:
+    """
+    Motor de reproducción en proceso: las sesiones leen el PCM en caché y un
+    mezclador las suma hacia una única salida
+    """
+
+    def __init__(self, sink_factory: Callable[[], AudioSink], cache: PcmCache = None,
+                 block_frames: int = DEFAULT_BLOCK_FRAMES):
+        """
+        Inicializa el motor
+
+        Args:
+            sink_factory: Función que crea la salida del mezclador
+            cache: Caché de sonidos decodificados
+            block_frames: Frames por bloque mezclado
+        """
+        self.sink_factory = sink_factory
+        self.cache = cache or PcmCache()
+        self.block_frames = block_frames
+        self.mixer = Mixer(sink_factory, block_frames)
+
+    def preload(self, file_path: str) -> bool:
+        """
+        Decodifica un sonido y lo deja en caché
+
+        Args:
+            file_path: Ruta del archivo WAV
+
+        Returns:
+            True si se decodificó correctamente
+        """
+        try:
+            self.cache.get(file_path)
+            return True
+        except Exception as e:
+            logger.error(f"Error decodificando {file_path}: {e}")
+            return False
+
+    def play(self, file_path: str, volume: int = 100, tag: str = None,
+             ramp: Dict[str, Any] = None) -> EnginePlayback:
+        """
+        Reproduce un sonido sin bloquear
+
+        Args:
+            file_path: Ruta del archivo WAV
+            volume: Volumen (0-100)
+            tag: Etiqueta de la sesión
+            ramp: Volumen progresivo: {'start_volume', 'seconds', 'curve'}
+
+        Returns:
+            Sesión de reproducción
+
+        Raises:
+            ValueError: Si el archivo no es PCM de 16 bits, la curva no existe
+                o el formato no se puede mezclar con las voces activas
+        """
+        buffer = self.cache.get(file_path)
+        envelope = None
+        if ramp and ramp.get('seconds', 0) > 0:
+            volume = max(0, min(100, volume))
+            envelope = GainEnvelope(
+                max(0, min(volume, ramp.get('start_volume', 0))) / 100,  # La rampa nunca baja
+                volume / 100,
+                ramp['seconds'] * buffer.framerate,
+                ramp.get('curve', 'linear')
+            )
+        playback = EnginePlayback(self, buffer, file_path, volume, tag, envelope)
+        self.mixer.add(playback)
+        return playback
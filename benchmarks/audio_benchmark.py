@@ -0,0 +1,289 @@
+"""
+Benchmark de reproducción de alarmas
+Mide, para cada estrategia de AudioManager, la latencia desde play_alarm_sound
+hasta la primera muestra entregada, la latencia de parada hasta el silencio y
+el CPU consumido por minuto sonando.
+
+Las estrategias usan reproductores falsos para no depender de una tarjeta de sonido:
+    subprocess     Un proceso por reproducción; un script sh que avisa por una FIFO
+                   al arrancar (cuando un reproductor real entregaría la primera muestra)
+    engine-cold    Motor en proceso decodificando el WAV en cada reproducción
+    engine-cached  Motor en proceso con el PCM ya en caché
+
+El reproductor falso no decodifica audio, así que el CPU de "subprocess" solo
+incluye el coste de lanzar y supervisar el proceso, no el del decodificador.
+
+Uso:
+    python benchmarks/audio_benchmark.py [--iterations 50] [--ring-seconds 5] [--json salida.json]
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_engine import AudioEngine, AudioSink, PcmCache, SAMPLE_WIDTH
+from browser_integration import AudioManager
+
+STRATEGIES = ("subprocess", "engine-cold", "engine-cached")
+
+FAKE_PLAYER = """#!/bin/sh
+echo started > "$FAKE_PLAYER_FIFO"
+exec sleep 3600
+"""
+
+class BenchmarkConfig:
+    """
+    Configuración mínima con la interfaz get(sección, clave, defecto) de ConfigManager
+    """
+
+    def __init__(self, values: Dict[tuple, Any]):
+        self.values = values
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        return self.values.get((section, key), default)
+
+class TimestampSink(AudioSink):
+    """
+    Salida falsa que marca la entrega de la primera muestra y el cierre,
+    consumiendo los bloques al ritmo de una tarjeta real
+    """
+
+    def __init__(self):
+        self.first_write_at = None
+        self.closed = threading.Event()
+        self.closed_at = None
+        self.framerate = 0
+        self.channels = 0
+
+    def open(self, framerate: int, channels: int):
+        self.framerate = framerate
+        self.channels = channels
+
+    def write(self, block):
+        if self.first_write_at is None:
+            self.first_write_at = time.perf_counter()
+        frames = memoryview(block).nbytes // (SAMPLE_WIDTH * max(self.channels, 1))
+        time.sleep(frames / self.framerate)
+
+    def close(self, drain: bool = True):
+        self.closed_at = time.perf_counter()
+        self.closed.set()
+
+def write_tone(path: str, seconds: float = 30, framerate: int = 44100):
+    """
+    Escribe un WAV mono de 16 bits lo bastante largo para no terminar durante la medida
+    """
+    import wave
+    import array
+    block = array.array('h', [1000, -1000] * 2205).tobytes()
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(framerate)
+        for _ in range(int(seconds * framerate / 4410)):
+            wav.writeframes(block)
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Percentil por el método del rango más cercano
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+class AudioBenchmark:
+    """
+    Ejecuta las mediciones sobre un directorio temporal
+    """
+
+    def __init__(self, work_dir: str, tone_seconds: float = 30):
+        """
+        Prepara el sonido de prueba y el reproductor falso
+
+        Args:
+            work_dir: Directorio temporal de trabajo
+            tone_seconds: Duración del sonido de alarma (la decodificación en frío escala con ella)
+        """
+        self.work_dir = work_dir
+        self.sound_dir = os.path.join(work_dir, "sounds")
+        os.makedirs(self.sound_dir)
+        write_tone(os.path.join(self.sound_dir, "default_alarm.wav"), tone_seconds)
+
+        self.fake_player = os.path.join(work_dir, "fake_player")
+        with open(self.fake_player, 'w') as f:
+            f.write(FAKE_PLAYER)
+        os.chmod(self.fake_player, os.stat(self.fake_player).st_mode | stat.S_IXUSR)
+
+        self.sink = None  # Salida creada por el mezclador en la reproducción en curso
+        self.fifo = os.path.join(work_dir, "started.fifo")
+        os.mkfifo(self.fifo)
+        os.environ["FAKE_PLAYER_FIFO"] = self.fifo
+
+    def make_manager(self, strategy: str) -> AudioManager:
+        """
+        Crea un AudioManager configurado para una estrategia
+
+        Args:
+            strategy: Una de STRATEGIES
+
+        Returns:
+            Gestor de audio listo para reproducir
+        """
+        engine = 'external' if strategy == 'subprocess' else 'internal'
+        config = BenchmarkConfig({
+            ('audio', 'engine'): engine,
+            ('snooze', 'progressive_volume'): False
+        })
+
+        # Con el directorio de trabajo en work_dir, la caché de capacidades y el
+        # índice de sonidos van a work_dir/data y la biblioteca usa work_dir/sounds
+        manager = AudioManager(config)
+        # Se registra como ffplay: aplay no controla el volumen y se desviaría al motor
+        manager.capabilities = {"players": {"ffplay": self.fake_player}}
+
+        if engine == 'internal':
+            cache = PcmCache(max_bytes=0 if strategy == 'engine-cold' else 256 * 1024 * 1024)
+            manager.engine = AudioEngine(self._new_sink, cache)
+        return manager
+
+    def _new_sink(self) -> TimestampSink:
+        self.sink = TimestampSink()
+        return self.sink
+
+    def play(self, manager: AudioManager, strategy: str):
+        """
+        Reproduce el sonido de alarma y espera la primera muestra
+
+        Returns:
+            Tupla (sesión, latencia de arranque en segundos)
+        """
+        self.sink = None
+        start = time.perf_counter()
+        handle = manager.play_alarm_sound('default', 80, tag='benchmark')
+        if handle is None:
+            raise RuntimeError(f"La estrategia {strategy} no pudo reproducir")
+
+        if strategy == 'subprocess':
+            with open(self.fifo, 'rb') as fifo:
+                fifo.read()
+            return handle, time.perf_counter() - start
+
+        while self.sink is None or self.sink.first_write_at is None:
+            time.sleep(0.0001)
+        return handle, self.sink.first_write_at - start
+
+    def stop(self, handle, strategy: str) -> float:
+        """
+        Detiene la sesión y espera al silencio
+
+        Returns:
+            Latencia de parada en segundos
+        """
+        start = time.perf_counter()
+        handle.stop()
+        if strategy == 'subprocess':
+            handle.process.wait()
+            return time.perf_counter() - start
+
+        self.sink.closed.wait()
+        return self.sink.closed_at - start
+
+    def run_strategy(self, strategy: str, iterations: int, ring_seconds: float) -> Dict[str, Any]:
+        """
+        Mide una estrategia
+
+        Args:
+            strategy: Una de STRATEGIES
+            iterations: Repeticiones de arranque y parada
+            ring_seconds: Segundos sonando para medir el CPU
+
+        Returns:
+            Diccionario con latencias en milisegundos y CPU por minuto
+        """
+        manager = self.make_manager(strategy)
+        if strategy == 'engine-cached':
+            manager._warm_page_cache(manager.sound_library.resolve('default'))
+
+        start_latencies = []
+        stop_latencies = []
+        for _ in range(iterations):
+            handle, start_latency = self.play(manager, strategy)
+            start_latencies.append(start_latency)
+            stop_latencies.append(self.stop(handle, strategy))
+
+        cpu_before = time.process_time() + sum(os.times()[2:4])
+        handle, _ = self.play(manager, strategy)
+        time.sleep(ring_seconds)
+        self.stop(handle, strategy)
+        cpu_used = time.process_time() + sum(os.times()[2:4]) - cpu_before
+
+        return {
+            'strategy': strategy,
+            'iterations': iterations,
+            'start_p50_ms': percentile(start_latencies, 0.50) * 1000,
+            'start_p99_ms': percentile(start_latencies, 0.99) * 1000,
+            'stop_p50_ms': percentile(stop_latencies, 0.50) * 1000,
+            'stop_p99_ms': percentile(stop_latencies, 0.99) * 1000,
+            'cpu_seconds_per_minute': cpu_used / ring_seconds * 60
+        }
+
+def run_benchmark(strategies=STRATEGIES, iterations: int = 50, ring_seconds: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    Ejecuta el benchmark con un directorio temporal como directorio de trabajo,
+    para que AudioManager no escriba en data/ del repositorio
+
+    Args:
+        strategies: Estrategias a medir
+        iterations: Repeticiones de arranque y parada por estrategia
+        ring_seconds: Segundos sonando para medir el CPU
+
+    Returns:
+        Resultados por estrategia
+    """
+    work_dir = tempfile.mkdtemp(prefix="audio_benchmark_")
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        benchmark = AudioBenchmark(work_dir, tone_seconds=max(30, ring_seconds + 5))
+        return [benchmark.run_strategy(strategy, iterations, ring_seconds) for strategy in strategies]
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def print_results(results: List[Dict[str, Any]]):
+    """
+    Muestra los resultados como tabla
+    """
+    print(f"{'estrategia':<15}{'arranque p50':>14}{'arranque p99':>14}"
+          f"{'parada p50':>12}{'parada p99':>12}{'CPU s/min':>11}")
+    for r in results:
+        print(f"{r['strategy']:<15}{r['start_p50_ms']:>11.2f} ms{r['start_p99_ms']:>11.2f} ms"
+              f"{r['stop_p50_ms']:>9.2f} ms{r['stop_p99_ms']:>9.2f} ms{r['cpu_seconds_per_minute']:>11.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de estrategias de reproducción de alarmas")
+    parser.add_argument("--strategy", choices=STRATEGIES, action="append",
+                        help="Estrategia a medir (se puede repetir; por defecto todas)")
+    parser.add_argument("--iterations", type=int, default=50, help="Arranques y paradas por estrategia")
+    parser.add_argument("--ring-seconds", type=float, default=5.0, help="Segundos sonando para medir el CPU")
+    parser.add_argument("--json", help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.strategy or STRATEGIES, args.iterations, args.ring_seconds)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
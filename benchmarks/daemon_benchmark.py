@@ -0,0 +1,133 @@
+"""
+Benchmark de memoria y arranque del planificador de alarmas
+Compara el planificador cargado junto a la pila de la aplicación (main.py con
+Kivy/KivyMD) con el demonio sin interfaz (alarm_daemon).
+
+Cada muestra es un intérprete nuevo en un directorio temporal: se mide el tiempo
+hasta que el planificador está en marcha y la memoria residente máxima (ru_maxrss).
+
+Uso:
+    python benchmarks/daemon_benchmark.py [--runs 5] [--json salida.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Any, Dict, List
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_PREAMBLE = """
+import sys, json, resource
+"""
+
+CHILD_REPORT = """
+print(json.dumps({
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+    'kivy_loaded': 'kivy' in sys.modules
+}), flush=True)
+sys.stdin.read()
+"""
+
+STACKS = {
+    "app": """
+import main
+from config_manager import ConfigManager
+from alarm_manager import AlarmManager
+alarm_manager = AlarmManager(ConfigManager())
+alarm_manager.load_alarms()
+alarm_manager.start()
+""",
+    "daemon": """
+from alarm_daemon import AlarmDaemon
+daemon = AlarmDaemon(notifier="log", audio="system", browser="system")
+daemon.start()
+"""
+}
+
+def measure(stack: str, work_dir: str) -> Dict[str, Any]:
+    """
+    Arranca un intérprete con la pila indicada y espera a que informe
+
+    Args:
+        stack: Clave de STACKS
+        work_dir: Directorio de trabajo del proceso hijo
+
+    Returns:
+        Diccionario con startup_ms, rss_kb, modules y kivy_loaded
+    """
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    code = CHILD_PREAMBLE + STACKS[stack] + CHILD_REPORT
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=work_dir, env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    try:
+        line = process.stdout.readline()
+        startup = time.perf_counter() - start
+        if not line:
+            raise RuntimeError(f"La pila {stack} terminó sin informar")
+        result = json.loads(line)
+    finally:
+        process.stdin.close()
+        process.wait()
+
+    result['startup_ms'] = startup * 1000
+    return result
+
+def run_benchmark(runs: int = 5) -> List[Dict[str, Any]]:
+    """
+    Mide cada pila varias veces, alternándolas
+
+    Args:
+        runs: Muestras por pila
+
+    Returns:
+        Resultados por pila con medianas
+    """
+    samples = {stack: [] for stack in STACKS}
+    work_dir = tempfile.mkdtemp(prefix="daemon_benchmark_")
+    try:
+        for _ in range(runs):
+            for stack in STACKS:
+                samples[stack].append(measure(stack, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return [{
+        'stack': stack,
+        'runs': runs,
+        'startup_ms': statistics.median(s['startup_ms'] for s in results),
+        'rss_mb': statistics.median(s['rss_kb'] for s in results) / 1024,
+        'modules': results[-1]['modules'],
+        'kivy_loaded': results[-1]['kivy_loaded']
+    } for stack, results in samples.items()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria y arranque del planificador con y sin interfaz")
+    parser.add_argument("--runs", type=int, default=5, help="Muestras por pila")
+    parser.add_argument("--json", help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.runs)
+    print(f"{'pila':<10}{'arranque':>12}{'RSS':>12}{'módulos':>10}{'kivy':>7}")
+    for r in results:
+        print(f"{r['stack']:<10}{r['startup_ms']:>9.0f} ms{r['rss_mb']:>9.1f} MB"
+              f"{r['modules']:>10}{'sí' if r['kivy_loaded'] else 'no':>7}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
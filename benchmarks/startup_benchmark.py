@@ -0,0 +1,233 @@
+"""
+Benchmark de arranque de la aplicación
+Mide dos cosas en intérpretes nuevos:
+
+    importación    Tiempo de "import main" según -X importtime, con el desglose de
+                   sus importaciones directas y los módulos diferidos que se cargaron
+    primer frame   Tiempo hasta el primer frame dibujado, con main.py ejecutándose
+                   con ALARM_APP_FIRST_FRAME_REPORT=exit (necesita una pantalla)
+
+Con --budget-ms el proceso termina con código 1 si la mediana de importación supera
+el presupuesto, para detectar regresiones.
+
+Uso:
+    python benchmarks/startup_benchmark.py [--runs 5] [--top 10] [--first-frame] [--budget-ms 400] [--json salida.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Any, Dict, List, Optional
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que solo deben cargarse al usarse (pantallas secundarias, diálogos, motor de audio)
+DEFERRED_MODULES = (
+    "numpy",
+    "audio_engine",
+    "kivymd.uix.textfield",
+    "kivymd.uix.slider",
+    "kivymd.uix.dialog",
+    "kivymd.uix.snackbar"
+)
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Interpreta la salida de -X importtime
+
+    Args:
+        output: Texto de stderr del intérprete
+
+    Returns:
+        Lista de módulos en orden de aparición con name, self_us, cumulative_us y depth
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Cabecera "self [us] | cumulative | imported package"
+
+        field = parts[2][1:]
+        name = field.lstrip(" ")
+        modules.append({
+            'name': name,
+            'self_us': int(parts[0]),
+            'cumulative_us': int(parts[1]),
+            'depth': (len(field) - len(name)) // 2
+        })
+    return modules
+
+def direct_imports(modules: List[Dict[str, Any]], root: str) -> List[Dict[str, Any]]:
+    """
+    Obtiene las importaciones directas de un módulo
+
+    En la salida de importtime los hijos aparecen antes que su padre y con
+    un nivel más de sangría
+
+    Args:
+        modules: Resultado de parse_importtime
+        root: Nombre del módulo padre
+
+    Returns:
+        Importaciones directas de root
+    """
+    for index, entry in enumerate(modules):
+        if entry['name'] == root:
+            children = []
+            for child in reversed(modules[:index]):
+                if child['depth'] <= entry['depth']:
+                    break
+                if child['depth'] == entry['depth'] + 1:
+                    children.append(child)
+            return children
+    return []
+
+def _child_env() -> Dict[str, str]:
+    return dict(os.environ, PYTHONPATH=REPO_DIR, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+
+def measure_import(work_dir: str, module: str = "main") -> List[Dict[str, Any]]:
+    """
+    Importa un módulo en un intérprete nuevo con -X importtime
+
+    Args:
+        work_dir: Directorio de trabajo (main.py crea su log en él)
+        module: Módulo a importar
+
+    Returns:
+        Resultado de parse_importtime
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=work_dir, env=_child_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Fallo importando {module}: {result.stderr.strip().splitlines()[-1:]}")
+    return parse_importtime(result.stderr)
+
+def measure_first_frame(work_dir: str, timeout: float = 60) -> Optional[Dict[str, float]]:
+    """
+    Ejecuta main.py hasta el primer frame
+
+    Args:
+        work_dir: Directorio de trabajo (configuración y datos temporales)
+        timeout: Segundos máximos de espera
+
+    Returns:
+        Diccionario con first_frame_ms (medido por la aplicación desde que se importa
+        main) y process_ms (medido desde el lanzamiento), o None si no hubo frame
+    """
+    env = dict(_child_env(), ALARM_APP_FIRST_FRAME_REPORT="exit")
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [sys.executable, os.path.join(REPO_DIR, "main.py")],
+            cwd=work_dir, env=env, capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return None
+    process_ms = (time.perf_counter() - start) * 1000
+
+    for line in result.stdout.splitlines():
+        if line.startswith('{"first_frame_ms"'):
+            report = json.loads(line)
+            report['process_ms'] = process_ms
+            return report
+    return None
+
+def run_benchmark(runs: int = 5, top: int = 10, first_frame: bool = False) -> Dict[str, Any]:
+    """
+    Ejecuta las mediciones en un directorio temporal
+
+    Args:
+        runs: Muestras por medición
+        top: Importaciones directas de main a mostrar
+        first_frame: Medir también el tiempo hasta el primer frame
+
+    Returns:
+        Diccionario con import_ms, top_imports, deferred_loaded y first_frame
+    """
+    work_dir = tempfile.mkdtemp(prefix="startup_benchmark_")
+    try:
+        samples = [measure_import(work_dir) for _ in range(runs)]
+
+        totals = [next(m['cumulative_us'] for m in sample if m['name'] == 'main') for sample in samples]
+        median_sample = samples[totals.index(sorted(totals)[len(totals) // 2])]
+        loaded = {m['name'] for m in median_sample}
+
+        report = {
+            'runs': runs,
+            'import_ms': statistics.median(totals) / 1000,
+            'top_imports': [
+                {'name': m['name'], 'cumulative_ms': m['cumulative_us'] / 1000}
+                for m in sorted(direct_imports(median_sample, 'main'),
+                                key=lambda m: m['cumulative_us'], reverse=True)[:top]
+            ],
+            'deferred_loaded': [name for name in DEFERRED_MODULES if name in loaded],
+            'first_frame': None
+        }
+
+        if first_frame:
+            frames = [measure_first_frame(work_dir) for _ in range(runs)]
+            frames = [f for f in frames if f]
+            if frames:
+                report['first_frame'] = {
+                    'first_frame_ms': statistics.median(f['first_frame_ms'] for f in frames),
+                    'process_ms': statistics.median(f['process_ms'] for f in frames),
+                    'runs': len(frames)
+                }
+
+        return report
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def print_report(report: Dict[str, Any], first_frame: bool):
+    """
+    Muestra el informe como texto
+    """
+    print(f"import main: {report['import_ms']:.0f} ms (mediana de {report['runs']})")
+    print(f"{'importación directa':<40}{'acumulado':>12}")
+    for entry in report['top_imports']:
+        print(f"{entry['name']:<40}{entry['cumulative_ms']:>9.1f} ms")
+
+    deferred = report['deferred_loaded']
+    print(f"módulos diferidos cargados: {', '.join(deferred) if deferred else 'ninguno'}")
+
+    if first_frame:
+        frame = report['first_frame']
+        if frame:
+            print(f"primer frame: {frame['first_frame_ms']:.0f} ms desde import main, "
+                  f"{frame['process_ms']:.0f} ms de proceso completo")
+        else:
+            print("primer frame: no medido (¿sin pantalla disponible?)")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tiempo de importación y de primer frame de la aplicación")
+    parser.add_argument("--runs", type=int, default=5, help="Muestras por medición")
+    parser.add_argument("--top", type=int, default=10, help="Importaciones directas de main a mostrar")
+    parser.add_argument("--first-frame", action="store_true", help="Medir el tiempo hasta el primer frame")
+    parser.add_argument("--budget-ms", type=float, help="Fallar si la importación supera este tiempo")
+    parser.add_argument("--json", help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.runs, args.top, args.first_frame)
+    print_report(report, args.first_frame)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.budget_ms is not None and report['import_ms'] > args.budget_ms:
+        print(f"Presupuesto superado: {report['import_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
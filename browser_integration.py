@@ -9,13 +9,328 @@ import logging
 import webbrowser
 import subprocess
 import platform
-import random
-from typing import Optional, Dict, Any, List
-from urllib.parse import urlparse, parse_qs
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlparse
 import json
 
+from file_store import atomic_write
+from process_supervisor import get_supervisor
+from sound_library import get_sound_library, probe_sound_file
+from video_catalog import get_catalog, extract_youtube_video_id
+
 logger = logging.getLogger(__name__)
 
+# Candidatos a sondear por plataforma: nombre -> lista de argv posibles
+BROWSER_CANDIDATES = {
+    "Darwin": {
+        "brave": [["/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"]],
+        "chrome": [["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"]],
+        "safari": [["open", "-a", "Safari"]],
+        "default": [["open"]]
+    },
+    "Windows": {
+        "brave": [["C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe"]],
+        "chrome": [
+            ["C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"],
+            ["C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe"]
+        ]
+    },
+    "Linux": {
+        "brave": [["brave-browser"], ["brave"]],
+        "chrome": [["google-chrome"], ["google-chrome-stable"], ["chromium"], ["chromium-browser"]],
+        "firefox": [["firefox"]],
+        "default": [["xdg-open"]]
+    }
+}
+
+PLAYER_CANDIDATES = {
+    "Darwin": ["afplay"],
+    "Linux": ["aplay", "ffplay", "paplay"]
+}
+
+CAPABILITY_TTL = 24 * 3600  # Segundos de validez del sondeo persistido
+
+# Navegadores cuyo argv acepta varias URLs en una sola invocación
+MULTI_URL_BROWSERS = {"brave", "chrome", "firefox", "safari"}
+
+_capabilities = None
+_capabilities_lock = threading.Lock()
+_shared_integration = None
+_shared_integration_lock = threading.Lock()
+
+def _resolve_command(argv: List[str]) -> Optional[List[str]]:
+    """
+    Comprueba que el ejecutable de un comando existe
+
+    Args:
+        argv: Comando y argumentos
+
+    Returns:
+        argv con la ruta absoluta del ejecutable o None si no existe
+    """
+    executable = argv[0]
+    if os.path.isabs(executable):
+        return list(argv) if os.path.exists(executable) else None
+
+    path = shutil.which(executable)
+    return [path] + list(argv[1:]) if path else None
+
+def probe_capabilities() -> Dict[str, Any]:
+    """
+    Sondea en paralelo los navegadores y reproductores instalados
+
+    Returns:
+        Diccionario con navegadores y reproductores disponibles
+    """
+    system = platform.system()
+    capabilities = {"system": system, "probed_at": time.time(), "browsers": {}, "players": {}}
+
+    if system == "Android":
+        # Las apps Android no son ejecutables: se abren por intent con 'am'
+        capabilities["browsers"] = {
+            "brave": ["com.brave.browser"],
+            "chrome": ["com.android.chrome"],
+            "firefox": ["org.mozilla.firefox"]
+        }
+        return capabilities
+
+    browser_candidates = BROWSER_CANDIDATES.get(system, BROWSER_CANDIDATES["Linux"])
+    player_candidates = PLAYER_CANDIDATES.get(system, [])
+
+    jobs = [("browsers", name, argv) for name, options in browser_candidates.items() for argv in options]
+    jobs += [("players", name, [name]) for name in player_candidates]
+
+    with ThreadPoolExecutor(max_workers=min(8, len(jobs) or 1)) as executor:
+        results = list(executor.map(lambda job: _resolve_command(job[2]), jobs))
+
+    for (kind, name, _), resolved in zip(jobs, results):
+        if resolved and name not in capabilities[kind]:
+            capabilities[kind][name] = resolved if kind == "browsers" else resolved[0]
+
+    return capabilities
+
+def load_capabilities(force: bool = False, cache_file: str = None) -> Dict[str, Any]:
+    """
+    Obtiene las capacidades del sistema, sondeando solo si la caché caducó
+
+    Args:
+        force: Ignorar la caché y volver a sondear
+        cache_file: Ruta del archivo de caché (por defecto data/capabilities.json)
+
+    Returns:
+        Diccionario de capacidades
+    """
+    global _capabilities
+
+    cache_file = cache_file or os.path.join(os.getcwd(), "data", "capabilities.json")
+
+    with _capabilities_lock:
+        if not force and _is_fresh(_capabilities):
+            return _capabilities
+
+        if not force and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if _is_fresh(cached):
+                    _capabilities = cached
+                    return _capabilities
+            except Exception as e:
+                logger.warning(f"Caché de capacidades inválida: {e}")
+
+        _capabilities = probe_capabilities()
+        logger.info(f"Navegadores detectados: {list(_capabilities['browsers'])}, "
+                    f"reproductores: {list(_capabilities['players'])}")
+
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            atomic_write(cache_file, json.dumps(_capabilities, indent=2))
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la caché de capacidades: {e}")
+
+        return _capabilities
+
+def _is_fresh(capabilities: Optional[Dict[str, Any]]) -> bool:
+    """Comprueba si un sondeo es de esta plataforma y no ha caducado"""
+    return bool(capabilities) and \
+        capabilities.get("system") == platform.system() and \
+        time.time() - capabilities.get("probed_at", 0) < CAPABILITY_TTL
+
+def get_browser_integration(config_manager) -> 'BrowserIntegration':
+    """
+    Obtiene la instancia compartida de BrowserIntegration del proceso
+
+    Args:
+        config_manager: Instancia del gestor de configuraciones
+
+    Returns:
+        Instancia compartida de BrowserIntegration
+    """
+    global _shared_integration
+
+    with _shared_integration_lock:
+        if _shared_integration is None:
+            _shared_integration = BrowserIntegration(config_manager)
+        return _shared_integration
+
+class LaunchCoalescer:
+    """
+    Agrupa las aperturas de navegador que llegan dentro de una ventana corta
+    (browser.coalesce_window) para abrir como máximo browser.max_tabs pestañas
+    con una sola invocación del navegador
+    """
+    
+    def __init__(self, integration: 'BrowserIntegration', history_size: int = 50):
+        """
+        Inicializa el agrupador
+        
+        Args:
+            integration: Integración con navegadores que realiza las aperturas
+            history_size: Número de ventanas cerradas a conservar en estadísticas
+        """
+        self.integration = integration
+        self.pending: List[Dict[str, Any]] = []
+        self.windows = deque(maxlen=history_size)
+        self.totals = {"requests": 0, "launches": 0, "saved": 0}
+        self._timer = None
+        self._lock = threading.Lock()
+    
+    def _settings(self) -> Tuple[float, int]:
+        """
+        Lee la ventana de agrupación y el máximo de pestañas de la configuración
+        
+        Returns:
+            Tupla (segundos de ventana, máximo de pestañas)
+        """
+        config_manager = self.integration.config_manager
+        window = float(config_manager.get('browser', 'coalesce_window', 2.0) or 0)
+        max_tabs = max(1, int(config_manager.get('browser', 'max_tabs', 1) or 1))
+        return window, max_tabs
+    
+    def submit(self, launch: Dict[str, Any], alarm_id: str = None, specific: bool = False) -> bool:
+        """
+        Encola una apertura preparada; se abre al cerrar la ventana actual
+        
+        Args:
+            launch: Apertura resuelta por BrowserIntegration.prepare_launch
+            alarm_id: ID de la alarma que la origina
+            specific: True si es el video propio de la alarma (prioridad sobre aleatorios)
+            
+        Returns:
+            True si se encoló (o se abrió, sin ventana de agrupación)
+        """
+        window, _ = self._settings()
+        
+        with self._lock:
+            self.pending.append({"launch": launch, "alarm_id": alarm_id, "specific": specific})
+            if window > 0 and self._timer is None:
+                self._timer = threading.Timer(window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        if window <= 0:
+            return self.flush()
+        return True
+    
+    def flush(self) -> bool:
+        """
+        Cierra la ventana actual y abre las pestañas seleccionadas
+        
+        Returns:
+            True si todas las invocaciones se lanzaron correctamente
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            requests, self.pending = self.pending, []
+        
+        if not requests:
+            return True
+        
+        _, max_tabs = self._settings()
+        
+        # Videos específicos de alarma primero, luego aleatorios; sin URLs repetidas.
+        # Los aleatorios se sortean solo si consiguen pestaña: un descarte no gasta
+        # una extracción de la bolsa
+        ordered = [r for r in requests if r["specific"]] + [r for r in requests if not r["specific"]]
+        chosen: List[Dict[str, Any]] = []
+        by_url: Dict[str, Dict[str, Any]] = {}
+        leftover_ids = []
+        for request in ordered:
+            launch = request["launch"]
+            if launch["url"] in by_url:
+                by_url[launch["url"]]["alarm_ids"].append(request["alarm_id"])
+                continue
+            if len(chosen) == max_tabs:
+                leftover_ids.append(request["alarm_id"])
+                continue
+            if launch.get("random"):
+                launch = self.integration.resolve_launch(launch)
+                if not launch:
+                    leftover_ids.append(request["alarm_id"])
+                    continue
+                if launch["url"] in by_url:
+                    by_url[launch["url"]]["alarm_ids"].append(request["alarm_id"])
+                    continue
+            entry = {"launch": launch, "alarm_ids": [request["alarm_id"]]}
+            by_url[launch["url"]] = entry
+            chosen.append(entry)
+        
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in chosen:
+            groups.setdefault(entry["launch"]["browser"], []).append(entry)
+        
+        success, launches = True, 0
+        for index, group in enumerate(groups.values()):
+            # Cada lanzamiento registra todas las alarmas que atiende; las que se
+            # quedaron sin pestaña se asocian al primero
+            alarm_ids = [alarm_id for entry in group for alarm_id in entry["alarm_ids"]]
+            if index == 0:
+                alarm_ids += leftover_ids
+            opened, count = self.integration.open_urls(
+                [entry["launch"]["url"] for entry in group],
+                group[0]["launch"]["browser"],
+                fullscreen=group[0]["launch"]["fullscreen"],
+                alarm_ids=[alarm_id for alarm_id in dict.fromkeys(alarm_ids) if alarm_id]
+            )
+            success = success and opened
+            launches += count
+        
+        stats = {
+            "closed_at": time.time(),
+            "requests": len(requests),
+            "tabs": len(chosen),
+            "launches": launches,
+            "saved": len(requests) - launches,
+            "alarm_ids": [request["alarm_id"] for request in requests]
+        }
+        
+        with self._lock:
+            self.windows.append(stats)
+            for key in self.totals:
+                self.totals[key] += stats[key]
+        
+        if stats["saved"]:
+            logger.info(f"Aperturas agrupadas: {stats['requests']} solicitudes, {launches} invocaciones")
+        return success
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene los contadores de agrupación
+        
+        Returns:
+            Diccionario con totales y las últimas ventanas
+        """
+        with self._lock:
+            return {"totals": dict(self.totals), "windows": list(self.windows)}
+
 class BrowserIntegration:
     """
     Gestor de integración con navegadores y deep linking
@@ -29,38 +344,23 @@ class BrowserIntegration:
             config_manager: Instancia del gestor de configuraciones
         """
         self.config_manager = config_manager
+        self.capabilities = load_capabilities()
         self.browser_commands = self._detect_browsers()
         self.deep_link_protocols = self._setup_deep_link_protocols()
+        self.video_catalog = get_catalog(os.path.join(os.getcwd(), "motivational_videos.json"))
+        self.supervisor = get_supervisor()
+        self.coalescer = LaunchCoalescer(self)
     
-    def _detect_browsers(self) -> Dict[str, str]:
-        """Detecta navegadores disponibles en el sistema"""
-        browsers = {}
-        system = platform.system()
-        
-        if system == "Android":
-            browsers.update({
-                "brave": "com.brave.browser",
-                "chrome": "com.android.chrome",
-                "firefox": "org.mozilla.firefox"
-            })
-        elif system == "Darwin":  # macOS
-            browsers.update({
-                "brave": "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
-                "chrome": "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-                "safari": "open -a Safari"
-            })
-        elif system == "Windows":
-            browsers.update({
-                "brave": "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe",
-                "chrome": "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-            })
-        else:  # Linux
-            browsers.update({
-                "brave": "brave-browser",
-                "chrome": "google-chrome",
-                "firefox": "firefox"
-            })
+    def _detect_browsers(self) -> Dict[str, List[str]]:
+        """
+        Obtiene los navegadores disponibles según el sondeo de capacidades
         
+        Returns:
+            Diccionario nombre -> argv del navegador. 'default' siempre existe;
+            una lista vacía indica usar el módulo webbrowser
+        """
+        browsers = dict(self.capabilities.get("browsers", {}))
+        browsers.setdefault("default", [])
         return browsers
     
     def _setup_deep_link_protocols(self) -> Dict[str, str]:
@@ -72,8 +372,20 @@ class BrowserIntegration:
             "youtube": "yt://"
         }
     
-    def open_url(self, url: str, browser: str = None, fullscreen: bool = False) -> bool:
-        """Abre una URL en el navegador especificado"""
+    def open_url(self, url: str, browser: str = None, fullscreen: bool = False,
+                 alarm_id: str = None) -> bool:
+        """
+        Abre una URL en el navegador especificado sin esperar al proceso del navegador
+        
+        Args:
+            url: URL a abrir
+            browser: Navegador preferido (por defecto usa configuración)
+            fullscreen: Abrir en pantalla completa
+            alarm_id: ID de la alarma que origina la apertura (para el registro de lanzamientos)
+            
+        Returns:
+            True si el navegador se lanzó correctamente
+        """
         try:
             if not browser:
                 browser = self.config_manager.get('browser', 'default_browser', 'brave')
@@ -84,7 +396,7 @@ class BrowserIntegration:
             
             browser_type = self._determine_browser_type(url, browser)
             
-            if self._open_specific_browser(url, browser_type, fullscreen):
+            if self._open_specific_browser(url, browser_type, fullscreen, alarm_id):
                 logger.info(f"URL abierta en {browser_type}: {url}")
                 return True
             
@@ -119,73 +431,77 @@ class BrowserIntegration:
         
         return "default"
     
-    def _open_specific_browser(self, url: str, browser: str, fullscreen: bool) -> bool:
+    def _open_specific_browser(self, url: str, browser: str, fullscreen: bool,
+                               alarm_id: str = None) -> bool:
         """Abre URL en un navegador específico"""
         try:
             system = platform.system()
             
             if system == "Android":
-                return self._open_android_browser(url, browser)
+                return self._open_android_browser(url, browser, alarm_id)
             elif system == "Darwin":
-                return self._open_macos_browser(url, browser)
+                return self._open_macos_browser(url, browser, alarm_id)
             elif system == "Windows":
-                return self._open_windows_browser(url, browser)
+                return self._open_windows_browser(url, browser, alarm_id)
             else:
-                return self._open_linux_browser(url, browser)
+                return self._open_linux_browser(url, browser, alarm_id)
                 
         except Exception as e:
             logger.error(f"Error abriendo navegador específico {browser}: {e}")
             return False
     
-    def _open_android_browser(self, url: str, browser: str) -> bool:
+    def _launch(self, argv: List[str], alarm_id: str = None) -> bool:
+        """
+        Lanza un proceso desacoplado a través del supervisor
+        
+        Args:
+            argv: Comando y argumentos
+            alarm_id: ID de la alarma asociada, o lista de IDs si la apertura
+                atiende a varias alarmas agrupadas
+            
+        Returns:
+            True si el proceso se lanzó
+        """
+        return self.supervisor.spawn(argv, tag=alarm_id) is not None
+    
+    def _open_android_browser(self, url: str, browser: str, alarm_id: str = None) -> bool:
         """Abre URL en navegador Android"""
         try:
             if browser == "brave":
-                intent_url = f"intent://open?url={url}#Intent;scheme=https;package=com.brave.browser;end"
-                os.system(f"am start -a android.intent.action.VIEW -d '{intent_url}'")
-                return True
-            else:
-                os.system(f"am start -a android.intent.action.VIEW -d '{url}'")
-                return True
+                url = f"intent://open?url={url}#Intent;scheme=https;package=com.brave.browser;end"
+            return self._launch(["am", "start", "-a", "android.intent.action.VIEW", "-d", url], alarm_id)
         except Exception:
             return False
     
-    def _open_macos_browser(self, url: str, browser: str) -> bool:
+    def _open_macos_browser(self, url: str, browser: str, alarm_id: str = None) -> bool:
         """Abre URL en navegador macOS"""
         try:
             command = self.browser_commands[browser]
-            if browser in ["brave", "chrome"]:
-                subprocess.run([command, url], check=True)
-                return True
-            else:
-                subprocess.run([command, url], check=True)
-                return True
+            if not command:
+                return webbrowser.open(url)
+            return self._launch([*command, url], alarm_id)
         except Exception:
             return False
     
-    def _open_windows_browser(self, url: str, browser: str) -> bool:
+    def _open_windows_browser(self, url: str, browser: str, alarm_id: str = None) -> bool:
         """Abre URL en navegador Windows"""
         try:
             command = self.browser_commands[browser]
-            if browser in ["brave", "chrome"]:
-                subprocess.run([command, url], check=True)
-                return True
-            else:
-                os.system(f'start "" "{url}"')
-                return True
+            if command:
+                return self._launch([*command, url], alarm_id)
+            # Navegador predeterminado vía ShellExecute, sin cmd.exe
+            os.startfile(url)
+            return True
         except Exception:
             return False
     
-    def _open_linux_browser(self, url: str, browser: str) -> bool:
+    def _open_linux_browser(self, url: str, browser: str, alarm_id: str = None) -> bool:
         """Abre URL en navegador Linux"""
         try:
             command = self.browser_commands[browser]
-            if browser in ["brave", "chrome"]:
-                subprocess.run([command, url], check=True)
-                return True
-            else:
-                os.system(f"xdg-open '{url}'")
-                return True
+            if not command:
+                return webbrowser.open(url)
+            return self._launch([*command, url], alarm_id)
         except Exception:
             return False
     
@@ -204,49 +520,19 @@ class BrowserIntegration:
     
     def extract_youtube_video_id(self, youtube_url: str) -> Optional[str]:
         """Extrae el ID de video de una URL de YouTube"""
-        try:
-            parsed_url = urlparse(youtube_url)
-            
-            if "youtube.com" in parsed_url.netloc:
-                query_params = parse_qs(parsed_url.query)
-                if "v" in query_params:
-                    return query_params["v"][0]
-            
-            if "youtu.be" in parsed_url.netloc:
-                video_id = parsed_url.path.lstrip("/")
-                if video_id:
-                    return video_id
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error extrayendo video ID de {youtube_url}: {e}")
-            return None
+        return extract_youtube_video_id(youtube_url)
     
     def load_motivational_videos(self) -> Dict[str, Any]:
         """
         Carga la configuración de videos motivacionales
+        Solo vuelve a leer el archivo si cambió su mtime o tamaño
         
         Returns:
             Diccionario con videos y configuración
         """
         try:
-            videos_file = os.path.join(os.getcwd(), "motivational_videos.json")
-            
-            if os.path.exists(videos_file):
-                with open(videos_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                # Configuración por defecto si no existe el archivo
-                return {
-                    "default_videos": [],
-                    "custom_videos": [],
-                    "settings": {
-                        "random_selection": True,
-                        "autoplay": True,
-                        "fullscreen": False
-                    }
-                }
+            self.video_catalog.refresh()
+            return self.video_catalog.as_dict()
         except Exception as e:
             logger.error(f"Error cargando videos motivacionales: {e}")
             return {"default_videos": [], "custom_videos": [], "settings": {}}
@@ -261,37 +547,24 @@ class BrowserIntegration:
         Returns:
             True si se guardó correctamente
         """
-        try:
-            videos_file = os.path.join(os.getcwd(), "motivational_videos.json")
-            
-            with open(videos_file, 'w', encoding='utf-8') as f:
-                json.dump(videos_data, f, indent=2, ensure_ascii=False)
-            
-            logger.info("Videos motivacionales guardados correctamente")
-            return True
-        except Exception as e:
-            logger.error(f"Error guardando videos motivacionales: {e}")
-            return False
+        return self.video_catalog.replace(videos_data)
     
     def get_random_motivational_video(self) -> Optional[str]:
         """
         Obtiene un video motivacional aleatorio
+        Usa la bolsa barajada del catálogo: respeta los pesos de cada video
+        y evita repetir los videos recientes
         
         Returns:
             URL del video seleccionado o None
         """
         try:
-            videos_config = self.load_motivational_videos()
+            selected_video = self.video_catalog.draw_video()
             
-            # Combinar videos predeterminados y personalizados
-            all_videos = videos_config.get("default_videos", []) + videos_config.get("custom_videos", [])
-            
-            if not all_videos:
+            if not selected_video:
                 logger.warning("No hay videos motivacionales configurados")
                 return None
             
-            # Seleccionar video aleatorio
-            selected_video = random.choice(all_videos)
             video_url = selected_video.get("url", "")
             
             logger.info(f"Video motivacional seleccionado: {selected_video.get('title', 'Sin título')}")
@@ -301,12 +574,13 @@ class BrowserIntegration:
             logger.error(f"Error obteniendo video motivacional aleatorio: {e}")
             return None
     
-    def open_motivational_video(self, browser: str = None) -> bool:
+    def open_motivational_video(self, browser: str = None, alarm_id: str = None) -> bool:
         """
         Abre un video motivacional aleatorio en el navegador
         
         Args:
             browser: Navegador preferido (por defecto usa configuración)
+            alarm_id: ID de la alarma que origina la apertura
             
         Returns:
             True si se abrió correctamente
@@ -319,17 +593,12 @@ class BrowserIntegration:
                 return False
             
             # Agregar parámetros de autoplay
-            videos_config = self.load_motivational_videos()
-            settings = videos_config.get("settings", {})
-            
-            if settings.get("autoplay", True):
-                if "?" in video_url:
-                    video_url += "&autoplay=1"
-                else:
-                    video_url += "?autoplay=1"
+            settings = self.video_catalog.get_settings()
+            video_url = self._add_autoplay(video_url, settings)
             
             # Abrir en navegador
-            success = self.open_url(video_url, browser, fullscreen=settings.get("fullscreen", False))
+            success = self.open_url(video_url, browser, fullscreen=settings.get("fullscreen", False),
+                                    alarm_id=alarm_id)
             
             if success:
                 logger.info(f"Video motivacional abierto correctamente: {video_url}")
@@ -340,6 +609,145 @@ class BrowserIntegration:
             logger.error(f"Error abriendo video motivacional: {e}")
             return False
     
+    def _add_autoplay(self, video_url: str, settings: Dict[str, Any]) -> str:
+        """Agrega el parámetro de autoplay a la URL si está habilitado"""
+        if settings.get("autoplay", True):
+            separator = "&" if "?" in video_url else "?"
+            video_url += f"{separator}autoplay=1"
+        return video_url
+    
+    def prepare_launch(self, browser: str = None, video_url: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Resuelve de antemano todo lo necesario para abrir el video de una alarma
+        
+        El video aleatorio no se sortea aquí: la apertura queda marcada con
+        'random' y se resuelve con resolve_launch al abrirla, de modo que una
+        preparación descartada no gasta una extracción de la bolsa
+        
+        Args:
+            browser: Navegador preferido (por defecto usa configuración)
+            video_url: URL específica de la alarma; si está vacía se elige un video aleatorio
+            
+        Returns:
+            Diccionario con 'url', 'browser' y 'fullscreen' (más 'random' si el
+            video se sortea al abrir), o None si no hay video válido
+        """
+        try:
+            if not browser:
+                browser = self.config_manager.get('browser', 'default_browser', 'brave')
+            
+            if not (video_url and video_url.strip()):
+                if not self.video_catalog.get_videos():
+                    logger.warning("No hay videos motivacionales configurados")
+                    return None
+                return {
+                    'url': None,
+                    'browser': browser,
+                    'fullscreen': self.video_catalog.get_settings().get("fullscreen", False),
+                    'random': True
+                }
+            
+            url = video_url
+            if not self._is_valid_url(url):
+                logger.error(f"URL inválida: {url}")
+                return None
+            
+            return {
+                'url': url,
+                'browser': self._determine_browser_type(url, browser),
+                'fullscreen': False
+            }
+            
+        except Exception as e:
+            logger.error(f"Error preparando apertura de video: {e}")
+            return None
+    
+    def resolve_launch(self, launch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Completa una apertura de prepare_launch sorteando su video aleatorio
+        
+        Args:
+            launch: Resultado de prepare_launch
+            
+        Returns:
+            Apertura con URL y navegador definitivos, o None si no hay video válido
+        """
+        if not launch.get('random'):
+            return launch
+        
+        url = self.get_random_motivational_video()
+        if not url:
+            return None
+        url = self._add_autoplay(url, self.video_catalog.get_settings())
+        if not self._is_valid_url(url):
+            logger.error(f"URL inválida: {url}")
+            return None
+        
+        return {
+            'url': url,
+            'browser': self._determine_browser_type(url, launch['browser']),
+            'fullscreen': launch['fullscreen']
+        }
+    
+    def open_prepared(self, launch: Dict[str, Any], alarm_id: str = None) -> bool:
+        """
+        Abre un video ya resuelto por prepare_launch
+        
+        Args:
+            launch: Resultado de prepare_launch
+            alarm_id: ID de la alarma que origina la apertura
+            
+        Returns:
+            True si el navegador se lanzó correctamente
+        """
+        launch = self.resolve_launch(launch)
+        if not launch:
+            return False
+        if self._open_specific_browser(launch['url'], launch['browser'], launch['fullscreen'], alarm_id):
+            logger.info(f"URL abierta en {launch['browser']}: {launch['url']}")
+            return True
+        return False
+    
+    def submit_launch(self, launch: Dict[str, Any], alarm_id: str = None, specific: bool = False) -> bool:
+        """
+        Encola una apertura preparada en el agrupador de lanzamientos
+        
+        Args:
+            launch: Resultado de prepare_launch
+            alarm_id: ID de la alarma que origina la apertura
+            specific: True si es el video propio de la alarma
+            
+        Returns:
+            True si se encoló correctamente
+        """
+        return self.coalescer.submit(launch, alarm_id, specific)
+    
+    def open_urls(self, urls: List[str], browser: str, fullscreen: bool = False,
+                  alarm_ids: List[str] = None) -> Tuple[bool, int]:
+        """
+        Abre varias URLs, con una sola invocación si el navegador lo admite
+        
+        Args:
+            urls: URLs a abrir
+            browser: Navegador resuelto
+            fullscreen: Abrir en pantalla completa
+            alarm_ids: IDs de las alarmas atendidas por el lanzamiento
+            
+        Returns:
+            Tupla (todas abiertas, número de invocaciones)
+        """
+        command = self.browser_commands.get(browser)
+        tag = alarm_ids[0] if alarm_ids and len(alarm_ids) == 1 else (alarm_ids or None)
+        
+        if len(urls) > 1 and command and browser in MULTI_URL_BROWSERS and platform.system() != "Android":
+            if self._launch([*command, *urls], tag):
+                logger.info(f"{len(urls)} URLs abiertas en {browser}")
+                return True, 1
+            return False, 1
+        
+        results = [self._open_specific_browser(url, browser, fullscreen, tag) for url in urls]
+        return all(results), len(urls)
+    
     def add_custom_video(self, title: str, url: str, duration: str = "0:00") -> bool:
         """
         Agrega un video personalizado a la lista
@@ -357,8 +765,6 @@ class BrowserIntegration:
                 logger.error(f"URL inválida: {url}")
                 return False
             
-            videos_config = self.load_motivational_videos()
-            
             # Crear entrada de video
             new_video = {
                 "title": title,
@@ -366,14 +772,12 @@ class BrowserIntegration:
                 "duration": duration
             }
             
-            # Agregar a videos personalizados
-            if "custom_videos" not in videos_config:
-                videos_config["custom_videos"] = []
-            
-            videos_config["custom_videos"].append(new_video)
+            # La escritura a disco se agrupa con otros cambios cercanos
+            if not self.video_catalog.add_video(new_video):
+                logger.warning(f"El video ya existe en el catálogo: {url}")
+                return False
             
-            # Guardar
-            return self.save_motivational_videos(videos_config)
+            return True
             
         except Exception as e:
             logger.error(f"Error agregando video personalizado: {e}")
@@ -390,21 +794,7 @@ class BrowserIntegration:
             True si se eliminó correctamente
         """
         try:
-            videos_config = self.load_motivational_videos()
-            
-            if "custom_videos" not in videos_config:
-                return False
-            
-            # Filtrar videos
-            original_count = len(videos_config["custom_videos"])
-            videos_config["custom_videos"] = [
-                v for v in videos_config["custom_videos"] if v.get("url") != video_url
-            ]
-            
-            if len(videos_config["custom_videos"]) < original_count:
-                return self.save_motivational_videos(videos_config)
-            
-            return False
+            return self.video_catalog.remove_video(video_url)
             
         except Exception as e:
             logger.error(f"Error eliminando video personalizado: {e}")
@@ -418,60 +808,215 @@ class BrowserIntegration:
             Lista de diccionarios con información de videos
         """
         try:
-            videos_config = self.load_motivational_videos()
-            
-            all_videos = []
+            return self.video_catalog.list_videos()["items"]
             
-            # Agregar videos predeterminados
-            for video in videos_config.get("default_videos", []):
-                video["type"] = "default"
-                all_videos.append(video)
+        except Exception as e:
+            logger.error(f"Error obteniendo todos los videos: {e}")
+            return []
+    
+    def search_videos(self, query: str, offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """
+        Busca videos por prefijos de palabras del título
+        
+        Args:
+            query: Términos de búsqueda
+            offset: Número de resultados a saltar
+            limit: Máximo de resultados por página
             
-            # Agregar videos personalizados
-            for video in videos_config.get("custom_videos", []):
-                video["type"] = "custom"
-                all_videos.append(video)
+        Returns:
+            Diccionario con 'total' e 'items'
+        """
+        try:
+            return self.video_catalog.search_videos(query, offset, limit)
             
-            return all_videos
+        except Exception as e:
+            logger.error(f"Error buscando videos: {e}")
+            return {"total": 0, "items": []}
+    
+    def import_videos(self, file_path: str, fmt: str = None) -> Dict[str, Any]:
+        """
+        Importa videos personalizados en bloque desde JSON, NDJSON o CSV
+        
+        Args:
+            file_path: Ruta del archivo a importar
+            fmt: Formato del archivo (por defecto según la extensión)
             
+        Returns:
+            Reporte de importación (ver VideoCatalog.bulk_import)
+        """
+        return self.video_catalog.bulk_import(file_path, fmt)
+
+class PlaybackHandle:
+    """
+    Sesión de reproducción de un sonido, controlable de forma independiente
+    """
+    
+    def __init__(self, file_path: str, volume: int, player: str, tag: str = None,
+                 process: subprocess.Popen = None, stopper=None, duration: float = None):
+        """
+        Inicializa la sesión
+        
+        Args:
+            file_path: Archivo reproducido
+            volume: Volumen inicial (0-100)
+            player: Reproductor usado
+            tag: Etiqueta de la sesión (por ejemplo, el ID de la alarma)
+            process: Proceso del reproductor externo, si lo hay
+            stopper: Función para detener backends sin proceso (winsound, plyer)
+            duration: Duración del sonido en segundos; sin proceso es la única
+                señal de fin (si se desconoce, el estado queda en "unknown")
+        """
+        self.id = uuid.uuid4().hex
+        self.file_path = file_path
+        self.volume = volume
+        self.player = player
+        self.tag = tag
+        self.process = process
+        self.started_at = time.time()
+        self.duration = duration
+        self._stopper = stopper
+        self._stopped = False
+    
+    @property
+    def status(self) -> str:
+        """Estado de la sesión: playing, finished, failed, stopped o unknown"""
+        if self._stopped:
+            return "stopped"
+        if self.process is None:
+            # winsound y plyer no avisan al terminar: se estima por la duración
+            if self.duration is None:
+                return "unknown"
+            return "playing" if time.time() < self.started_at + self.duration else "finished"
+        
+        exit_status = self.process.poll()
+        if exit_status is None:
+            return "playing"
+        return "finished" if exit_status == 0 else "failed"
+    
+    @property
+    def is_active(self) -> bool:
+        """Indica si la sesión sigue sonando"""
+        return self.status == "playing"
+    
+    @property
+    def is_pending(self) -> bool:
+        """Indica si la sesión no ha terminado (sonando o en estado desconocido)"""
+        return self.status in ("playing", "unknown")
+    
+    def stop(self) -> bool:
+        """
+        Detiene solo esta sesión
+        
+        Returns:
+            True si estaba sonando o en estado desconocido
+        """
+        if not self.is_pending:
+            return False
+        
+        self._stopped = True
+        try:
+            if self.process is not None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+            elif self._stopper:
+                self._stopper()
         except Exception as e:
-            logger.error(f"Error obteniendo todos los videos: {e}")
-            return []
+            logger.error(f"Error deteniendo reproducción {self.id}: {e}")
+        return True
+    
+    def wait(self, timeout: float = None) -> Optional[int]:
+        """
+        Espera a que termine la reproducción
+        
+        Args:
+            timeout: Segundos máximos de espera (None para esperar indefinidamente)
+            
+        Returns:
+            Código de salida del reproductor o None si sigue sonando o no hay proceso
+        """
+        if self.process is None:
+            return None
+        try:
+            return self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            return None
+    
+    def set_volume(self, volume: int) -> bool:
+        """
+        Cambia el volumen de la sesión
+        
+        Args:
+            volume: Volumen (se limita a 0-100)
+            
+        Returns:
+            True si el cambio se aplicó en caliente. Los reproductores externos
+            solo aceptan el volumen al arrancar, así que devuelven False
+        """
+        self.volume = max(0, min(100, int(volume)))
+        return False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte la sesión a diccionario
+        
+        Returns:
+            Diccionario con el estado de la sesión
+        """
+        return {
+            'id': self.id,
+            'tag': self.tag,
+            'file_path': self.file_path,
+            'player': self.player,
+            'volume': self.volume,
+            'started_at': self.started_at,
+            'status': self.status
+        }
 
 class AudioManager:
     """
     Gestor de audio para reproducir sonidos de alarmas y música de fondo
+    Cada reproducción devuelve una PlaybackHandle registrada como sesión activa
     """
     
     def __init__(self, config_manager):
         """Inicializa el gestor de audio"""
         self.config_manager = config_manager
+        self.capabilities = load_capabilities()
+        self.supervisor = get_supervisor()
         self.current_volume = 80
-        self.is_playing = False
-        self.sound_files = self._scan_sound_files()
-    
-    def _scan_sound_files(self) -> Dict[str, str]:
-        """Escanea archivos de sonido disponibles"""
-        sound_dir = os.path.join(os.getcwd(), "sounds")
-        sound_files = {}
-        
-        if os.path.exists(sound_dir):
-            for file in os.listdir(sound_dir):
-                if file.endswith(('.mp3', '.wav', '.ogg', '.m4a')):
-                    file_path = os.path.join(sound_dir, file)
-                    sound_files[file[:-4]] = file_path
-        
-        sound_files.update({
-            "default": "default_alarm",
-            "gentle": "gentle_chime",
-            "energetic": "energetic_beep",
-            "nature": "nature_sounds"
-        })
-        
-        return sound_files
-    
-    def play_alarm_sound(self, sound_name: str = None, volume: int = None) -> bool:
-        """Reproduce el sonido de alarma"""
+        self.engine = None  # Motor en proceso (audio.engine = "internal")
+        self.sessions: Dict[str, PlaybackHandle] = {}
+        self._sessions_lock = threading.Lock()
+        self.sound_library = get_sound_library()
+    
+    @property
+    def is_playing(self) -> bool:
+        """Indica si alguna sesión sigue sonando (las de estado desconocido no cuentan)"""
+        return any(handle.is_active for handle in self.get_sessions())
+    
+    @property
+    def sound_files(self) -> Dict[str, str]:
+        """Sonidos disponibles por nombre (incluye los alias integrados)"""
+        return self.sound_library.get_sound_files()
+    
+    def play_alarm_sound(self, sound_name: str = None, volume: int = None,
+                         tag: str = None, snooze_count: int = 0) -> Optional[PlaybackHandle]:
+        """
+        Reproduce el sonido de alarma sin bloquear
+        
+        Args:
+            sound_name: Nombre del sonido (por defecto usa configuración)
+            volume: Volumen (por defecto usa configuración)
+            tag: Etiqueta de la sesión (por ejemplo, el ID de la alarma)
+            snooze_count: Posposiciones acumuladas (acortan la rampa de volumen)
+            
+        Returns:
+            Sesión de reproducción o None si no se pudo reproducir
+        """
         try:
             if sound_name is None:
                 sound_name = self.config_manager.get('audio', 'alarm_sound', 'default')
@@ -480,42 +1025,142 @@ class AudioManager:
                 volume = self.config_manager.get('audio', 'alarm_volume', 80)
             
             if not self._has_audio_support():
-                return False
+                return None
             
             sound_file = self._get_sound_file_path(sound_name)
             if not sound_file:
                 logger.error(f"Archivo de sonido no encontrado: {sound_name}")
-                return False
+                return None
             
-            success = self._play_sound_file(sound_file, volume)
+            return self.play_prepared(sound_file, volume, tag, snooze_count)
             
-            if success:
-                self.is_playing = True
-                self.current_volume = volume
+        except Exception as e:
+            logger.error(f"Error reproduciendo sonido de alarma: {e}")
+            return None
+    
+    def prepare_sound(self, sound_name: str = None, warm: bool = True) -> Optional[str]:
+        """
+        Resuelve el archivo de sonido y lo precarga en la caché de páginas del sistema
+        
+        Args:
+            sound_name: Nombre del sonido (por defecto usa configuración)
+            warm: Leer el archivo en segundo plano para precargarlo
             
-            return success
+        Returns:
+            Ruta del archivo o None si no existe
+        """
+        try:
+            if not sound_name:
+                sound_name = self.config_manager.get('audio', 'alarm_sound', 'default')
+            
+            if not self._has_audio_support():
+                return None
+            
+            sound_file = self._get_sound_file_path(sound_name)
+            if not sound_file or not os.path.exists(sound_file):
+                logger.warning(f"Archivo de sonido no encontrado: {sound_name}")
+                return None
+            
+            if warm:
+                threading.Thread(target=self._warm_page_cache, args=(sound_file,), daemon=True).start()
+            return sound_file
             
         except Exception as e:
-            logger.error(f"Error reproduciendo sonido de alarma: {e}")
-            return False
+            logger.error(f"Error preparando sonido {sound_name}: {e}")
+            return None
+    
+    def _warm_page_cache(self, file_path: str):
+        """
+        Lee el archivo completo para que esté en la caché de páginas al reproducirlo
+        Con el motor en proceso, los WAV se decodifican directamente en su caché PCM
+        
+        Args:
+            file_path: Ruta del archivo de sonido
+        """
+        engine = self._get_engine() if file_path.lower().endswith(".wav") else None
+        if engine and engine.preload(file_path):
+            return
+        
+        try:
+            with open(file_path, 'rb') as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                while f.read(1024 * 1024):
+                    pass
+        except Exception as e:
+            logger.error(f"Error precargando {file_path}: {e}")
+    
+    def play_prepared(self, sound_file: str, volume: int, tag: str = None,
+                      snooze_count: int = 0) -> Optional[PlaybackHandle]:
+        """
+        Reproduce un archivo ya resuelto por prepare_sound
+        
+        Args:
+            sound_file: Ruta del archivo de sonido
+            volume: Volumen (0-100)
+            tag: Etiqueta de la sesión (por ejemplo, el ID de la alarma)
+            snooze_count: Posposiciones acumuladas (acortan la rampa de volumen)
+            
+        Returns:
+            Sesión de reproducción o None si no se pudo reproducir
+        """
+        handle = self._play_sound_file(sound_file, volume, tag, self._get_ramp(snooze_count))
+        if handle:
+            self.current_volume = handle.volume
+            with self._sessions_lock:
+                self.sessions[handle.id] = handle
+        return handle
+    
+    def get_sessions(self) -> List[PlaybackHandle]:
+        """
+        Obtiene las sesiones no terminadas y descarta las demás
+        Las de estado desconocido se conservan para poder detenerlas
+        
+        Returns:
+            Lista de sesiones sonando o en estado desconocido
+        """
+        with self._sessions_lock:
+            for handle_id, handle in list(self.sessions.items()):
+                if not handle.is_pending:
+                    del self.sessions[handle_id]
+            return list(self.sessions.values())
+    
+    def stop_session(self, session: str) -> bool:
+        """
+        Detiene las sesiones con el ID o la etiqueta indicados
+        
+        Args:
+            session: ID de la sesión o etiqueta (por ejemplo, el ID de la alarma)
+            
+        Returns:
+            True si se detuvo alguna sesión
+        """
+        stopped = False
+        for handle in self.get_sessions():
+            if session in (handle.id, handle.tag):
+                stopped = handle.stop() or stopped
+        return stopped
+    
+    def set_volume(self, volume: int) -> int:
+        """
+        Establece el volumen actual y lo aplica a las sesiones activas
+        
+        Args:
+            volume: Volumen (se limita a 0-100)
+            
+        Returns:
+            Volumen aplicado
+        """
+        self.current_volume = max(0, min(100, int(volume)))
+        for handle in self.get_sessions():
+            handle.set_volume(self.current_volume)
+        return self.current_volume
     
     def stop_audio(self):
-        """Detiene la reproducción de audio"""
+        """Detiene todas las sesiones de este gestor, sin afectar a otros procesos"""
         try:
-            if self.is_playing:
-                system = platform.system()
-                
-                if system == "Darwin":
-                    subprocess.run(["pkill", "afplay"], check=False)
-                elif system == "Windows":
-                    import winsound
-                    winsound.PlaySound(None, winsound.SND_PURGE)
-                else:
-                    subprocess.run(["pkill", "-f", "aplay"], check=False)
-                    subprocess.run(["pkill", "-f", "ffplay"], check=False)
-                
-                self.is_playing = False
-                
+            for handle in self.get_sessions():
+                handle.stop()
         except Exception as e:
             logger.error(f"Error deteniendo audio: {e}")
     
@@ -526,88 +1171,206 @@ class AudioManager:
             
             if system == "Android":
                 return os.path.exists("/system/bin/mediaserver")
-            elif system == "Darwin":
-                return os.path.exists("/usr/bin/afplay")
             elif system == "Windows":
                 return os.path.exists("C:\\Windows\\System32\\WindowsMediaPlayer.dll")
             else:
-                return os.path.exists("/usr/bin/aplay") or os.path.exists("/usr/bin/ffplay")
+                return bool(self.capabilities.get("players"))
                 
         except Exception:
             return False
     
     def _get_sound_file_path(self, sound_name: str) -> Optional[str]:
-        """Obtiene la ruta del archivo de sonido"""
-        if sound_name in self.sound_files:
-            return self.sound_files[sound_name]
+        """
+        Obtiene la ruta del archivo de sonido desde el índice de la biblioteca
+        Si el nombre no está indexado se refrescan los directorios modificados
         
-        sound_dir = os.path.join(os.getcwd(), "sounds")
-        for extension in ['.mp3', '.wav', '.ogg', '.m4a']:
-            file_path = os.path.join(sound_dir, f"{sound_name}{extension}")
-            if os.path.exists(file_path):
-                return file_path
+        Args:
+            sound_name: Nombre del sonido o alias integrado
+            
+        Returns:
+            Ruta del archivo o None si no existe
+        """
+        sound_file = self.sound_library.resolve(sound_name)
+        if sound_file is None and self.sound_library.refresh():
+            sound_file = self.sound_library.resolve(sound_name)
+        return sound_file
+    
+    def _get_ramp(self, snooze_count: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene la rampa de volumen progresivo (snooze.progressive_volume)
+        Cada posposición divide la duración de la rampa para que suba antes y
+        la hace arrancar en audio.snooze_volume en lugar de audio.ramp_start_volume
         
-        return None
+        Args:
+            snooze_count: Posposiciones acumuladas
+            
+        Returns:
+            Diccionario con start_volume, seconds y curve, o None si está desactivada
+        """
+        if not self.config_manager.get('snooze', 'progressive_volume', True):
+            return None
+        
+        seconds = float(self.config_manager.get('audio', 'ramp_seconds', 30))
+        if seconds <= 0:
+            return None
+        
+        start_volume = self.config_manager.get('audio', 'ramp_start_volume', 10)
+        if snooze_count > 0:
+            start_volume = self.config_manager.get('audio', 'snooze_volume', start_volume)
+        
+        return {
+            'start_volume': start_volume,
+            'seconds': seconds / (max(0, snooze_count) + 1),
+            'curve': self.config_manager.get('audio', 'ramp_curve', 'linear')
+        }
     
-    def _play_sound_file(self, file_path: str, volume: int) -> bool:
-        """Reproduce un archivo de sonido específico"""
+    def _play_sound_file(self, file_path: str, volume: int, tag: str = None,
+                         ramp: Dict[str, Any] = None) -> Optional[PlaybackHandle]:
+        """
+        Reproduce un archivo de sonido específico
+        La rampa de volumen solo se aplica con el motor en proceso; afplay,
+        ffplay y paplay reciben el volumen final al arrancar. aplay no tiene
+        control de volumen, así que por debajo de 100 el WAV pasa por la
+        ganancia del motor aunque audio.engine sea "external"
+        """
         try:
             if not os.path.exists(file_path):
-                return False
+                return None
+            
+            volume = max(0, min(100, int(volume)))
+            
+            is_wav = file_path.lower().endswith(".wav")
+            engine = self._get_engine() if is_wav else None
+            if engine is None and is_wav and volume < 100:
+                command = self._player_command(file_path, volume)
+                if command and command[0] == "aplay":
+                    engine = self._get_engine(required=True)
+            if engine:
+                try:
+                    return engine.play(file_path, volume, tag, ramp)
+                except ValueError as e:
+                    logger.info(f"{e}; se usa un reproductor externo")
             
             system = platform.system()
             
             if system == "Android":
-                return self._play_android_audio(file_path, volume)
-            elif system == "Darwin":
-                return self._play_macos_audio(file_path, volume)
+                return self._play_android_audio(file_path, volume, tag)
             elif system == "Windows":
-                return self._play_windows_audio(file_path, volume)
+                return self._play_windows_audio(file_path, volume, tag)
             else:
-                return self._play_linux_audio(file_path, volume)
+                return self._play_process_audio(file_path, volume, tag)
                 
         except Exception as e:
             logger.error(f"Error reproduciendo archivo {file_path}: {e}")
-            return False
+            return None
     
-    def _play_android_audio(self, file_path: str, volume: int) -> bool:
+    def _get_engine(self, required: bool = False) -> Optional["AudioEngine"]:
+        """
+        Obtiene el motor de audio en proceso si está habilitado (audio.engine)
+        
+        Args:
+            required: Crear el motor aunque audio.engine sea "external"
+                (aplay sin control de volumen)
+        
+        Returns:
+            Motor de audio o None si se usan reproductores externos
+        """
+        if not required and self.config_manager.get('audio', 'engine', 'external') != 'internal':
+            return None
+        
+        if self.engine is None:
+            aplay = self.capabilities.get("players", {}).get("aplay")
+            if not aplay or platform.system() in ("Android", "Windows"):
+                return None
+            
+            # NumPy (vía audio_engine) solo se carga si se usa el motor en proceso
+            from audio_engine import AudioEngine, PcmCache, PipeSink, aplay_command
+            
+            cache_mb = self.config_manager.get('audio', 'engine_cache_mb', 32)
+            self.engine = AudioEngine(
+                lambda: PipeSink(aplay_command(aplay)),
+                PcmCache(int(cache_mb) * 1024 * 1024)
+            )
+        
+        return self.engine
+    
+    def _player_command(self, file_path: str, volume: int) -> Optional[Tuple[str, List[str]]]:
+        """
+        Elige el reproductor externo sondeado y construye su argv
+        aplay no acepta volumen: por debajo de 100 se prefieren ffplay y paplay
+        
+        Args:
+            file_path: Archivo a reproducir
+            volume: Volumen (0-100)
+            
+        Returns:
+            Tupla (reproductor, argv) o None si no hay reproductor adecuado
+        """
+        players = self.capabilities.get("players", {})
+        is_wav = file_path.lower().endswith(".wav")
+        
+        if "afplay" in players:
+            return "afplay", [players["afplay"], "-v", f"{volume / 100:.2f}", file_path]
+        if is_wav and "aplay" in players and volume >= 100:
+            return "aplay", [players["aplay"], "-q", file_path]
+        if "ffplay" in players:
+            return "ffplay", [players["ffplay"], "-nodisp", "-autoexit", "-loglevel", "quiet",
+                              "-volume", str(volume), file_path]
+        if "paplay" in players:
+            return "paplay", [players["paplay"], f"--volume={volume * 65536 // 100}", file_path]
+        if is_wav and "aplay" in players:
+            return "aplay", [players["aplay"], "-q", file_path]
+        return None
+    
+    def _play_android_audio(self, file_path: str, volume: int, tag: str = None) -> Optional[PlaybackHandle]:
         """Reproduce audio en Android"""
         try:
             from plyer import audio
             if hasattr(audio, 'play'):
                 audio.play(file_path)
-                return True
-            return False
+                return PlaybackHandle(file_path, volume, "plyer", tag, stopper=getattr(audio, 'stop', None),
+                                      duration=self._sound_duration(file_path))
+            return None
         except Exception:
-            return False
+            return None
     
-    def _play_macos_audio(self, file_path: str, volume: int) -> bool:
-        """Reproduce audio en macOS"""
+    def _sound_duration(self, file_path: str) -> Optional[float]:
+        """
+        Obtiene la duración de un sonido para estimar el fin en backends sin proceso
+        
+        Args:
+            file_path: Ruta del archivo
+            
+        Returns:
+            Duración en segundos o None si no se puede leer (formatos comprimidos)
+        """
         try:
-            import subprocess
-            subprocess.run(["afplay", file_path], check=True, timeout=30)
-            return True
-        except Exception:
-            return False
+            return probe_sound_file(file_path)['duration']
+        except OSError:
+            return None
     
-    def _play_windows_audio(self, file_path: str, volume: int) -> bool:
+    def _play_process_audio(self, file_path: str, volume: int, tag: str = None) -> Optional[PlaybackHandle]:
+        """Reproduce audio con un reproductor externo (macOS y Linux) sin esperar a que termine"""
+        command = self._player_command(file_path, volume)
+        if command is None:
+            logger.error(f"No hay reproductor disponible para {file_path}")
+            return None
+        
+        player, argv = command
+        record = self.supervisor.spawn(argv, tag=tag)
+        if record is None:
+            return None
+        return PlaybackHandle(file_path, volume, player, tag, process=record.process)
+    
+    def _play_windows_audio(self, file_path: str, volume: int, tag: str = None) -> Optional[PlaybackHandle]:
         """Reproduce audio en Windows"""
         try:
             import winsound
             winsound.PlaySound(file_path, winsound.SND_FILENAME | winsound.SND_ASYNC)
-            return True
+            return PlaybackHandle(
+                file_path, volume, "winsound", tag,
+                stopper=lambda: winsound.PlaySound(None, winsound.SND_PURGE),
+                duration=self._sound_duration(file_path)
+            )
         except Exception:
-            return False
-    
-    def _play_linux_audio(self, file_path: str, volume: int) -> bool:
-        """Reproduce audio en Linux"""
-        try:
-            import subprocess
-            subprocess.run(["aplay", file_path], check=True, timeout=30)
-            return True
-        except Exception:
-            try:
-                subprocess.run(["ffplay", "-autoexit", file_path], check=True, timeout=30)
-                return True
-            except Exception:
-                return False
\ No newline at end of file
+            return None
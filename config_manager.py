@@ -5,10 +5,15 @@ Maneja el almacenamiento y recuperación de configuraciones de usuario
 
 import json
 import os
+import hashlib
+import threading
+import zlib
 from typing import Any, Optional
 from cryptography.fernet import Fernet
 import logging
 
+from file_store import FileStore, atomic_write
+
 logger = logging.getLogger(__name__)
 
 class ConfigManager:
@@ -26,6 +31,15 @@ class ConfigManager:
         self.config_file = config_file
         self.config_dir = os.path.join(os.getcwd(), "config")
         self.config_path = os.path.join(self.config_dir, config_file)
+        self.file_watcher = None
+        self._store = None
+        
+        # Estado de backups
+        self._backup_manifest = None
+        self._backup_manifest_path = None
+        self._backup_thread = None
+        self._last_backup_attempt = None
+        self._backup_stop_event = threading.Event()
         
         # Crear directorio de configuración si no existe
         os.makedirs(self.config_dir, exist_ok=True)
@@ -61,8 +75,7 @@ class ConfigManager:
         
         if os.path.exists(self.config_path):
             try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    encrypted_data = f.read()
+                encrypted_data, _ = self._get_store().read(force=True)
                 
                 # Desencriptar datos
                 decrypted_data = self.cipher.decrypt(encrypted_data.encode())
@@ -87,14 +100,65 @@ class ConfigManager:
             json_data = json.dumps(self.config_data, indent=2, ensure_ascii=False)
             encrypted_data = self.cipher.encrypt(json_data.encode())
             
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                f.write(encrypted_data.decode())
+            # Escritura atómica bajo bloqueo compartido con otros procesos
+            self._get_store().write(encrypted_data)
+            
+            if self.file_watcher:
+                self.file_watcher.acknowledge(self.config_path)
             
             logger.info("Configuración guardada correctamente")
             
         except Exception as e:
             logger.error(f"Error guardando configuración: {e}")
     
+    def _get_store(self) -> FileStore:
+        """
+        Obtiene el almacén del archivo de configuración actual
+        
+        Returns:
+            Instancia de FileStore para config_path
+        """
+        if self._store is None or self._store.path != self.config_path:
+            self._store = FileStore(self.config_path)
+        return self._store
+    
+    def attach_watcher(self, file_watcher):
+        """
+        Registra el archivo de configuración en un vigilante de archivos
+        
+        Args:
+            file_watcher: Instancia de FileWatcher
+        """
+        self.file_watcher = file_watcher
+        file_watcher.watch(self.config_path, lambda path: self.reload_config())
+    
+    def reload_config(self) -> bool:
+        """
+        Recarga la configuración tras un cambio hecho por otro proceso
+        
+        Returns:
+            True si la configuración en memoria cambió
+        """
+        try:
+            encrypted_data, changed = self._get_store().read()
+            if not changed or encrypted_data is None:
+                # Misma generación y firma: no hace falta descifrar de nuevo
+                return False
+            
+            decrypted_data = self.cipher.decrypt(encrypted_data.encode())
+            disk_config = json.loads(decrypted_data.decode())
+            
+            if disk_config == self.config_data:
+                return False
+            
+            self.config_data = disk_config
+            logger.info("Configuración recargada desde disco")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error recargando configuración: {e}")
+            return False
+    
     def _get_default_config(self) -> dict:
         """
         Retorna la configuración por defecto
@@ -111,6 +175,11 @@ class ConfigManager:
                 "snooze_volume": 60,
                 "background_play": True,
                 "alarm_sound": "default",
+                "engine": "external",
+                "engine_cache_mb": 32,
+                "ramp_start_volume": 10,
+                "ramp_seconds": 30,
+                "ramp_curve": "linear",
                 "custom_sounds": {}
             },
             "notifications": {
@@ -129,6 +198,8 @@ class ConfigManager:
                 "default_browser": "brave",
                 "auto_open": True,
                 "open_fullscreen": False,
+                "coalesce_window": 2.0,
+                "max_tabs": 1,
                 "custom_protocols": {}
             },
             "validation": {
@@ -148,6 +219,14 @@ class ConfigManager:
                 "pin_protection": False,
                 "biometric_unlock": False
             },
+            "scheduler": {
+                "prearm_seconds": 30
+            },
+            "api": {
+                "enabled": False,
+                "address": "127.0.0.1:8765",
+                "token": None
+            },
             "backup": {
                 "auto_backup": True,
                 "backup_interval": 24,
@@ -342,25 +421,144 @@ class ConfigManager:
         """
         return self.config_data.copy()
     
+    def _get_backup_dir(self) -> str:
+        """
+        Obtiene el directorio de backups (almacenados por hash de contenido)
+        
+        Returns:
+            Ruta del directorio de backups
+        """
+        backup_dir = os.path.join(self.config_dir, "backups")
+        os.makedirs(backup_dir, exist_ok=True)
+        return backup_dir
+    
+    def _load_backup_manifest(self) -> list:
+        """
+        Carga el índice de backups (del más antiguo al más reciente)
+        
+        Returns:
+            Lista de entradas del manifiesto
+        """
+        manifest_path = os.path.join(self._get_backup_dir(), "manifest.json")
+        
+        if self._backup_manifest is None or self._backup_manifest_path != manifest_path:
+            self._backup_manifest_path = manifest_path
+            self._backup_manifest = []
+            if os.path.exists(manifest_path):
+                try:
+                    with open(manifest_path, 'r', encoding='utf-8') as f:
+                        self._backup_manifest = json.load(f).get("backups", [])
+                except Exception as e:
+                    logger.error(f"Error leyendo manifiesto de backups: {e}")
+        
+        return self._backup_manifest
+    
+    def _save_backup_manifest(self):
+        """
+        Guarda el índice de backups
+        """
+        atomic_write(self._backup_manifest_path, json.dumps({"backups": self._backup_manifest}, indent=2))
+    
+    def _get_backup_snapshot(self) -> str:
+        """
+        Serializa la configuración de forma canónica para calcular su hash
+        Excluye la fecha del último backup para que no altere el contenido
+        
+        Returns:
+            JSON canónico de la configuración
+        """
+        snapshot = dict(self.config_data)
+        if isinstance(snapshot.get("backup"), dict):
+            snapshot["backup"] = {k: v for k, v in snapshot["backup"].items() if k != "last_backup"}
+        
+        return json.dumps(snapshot, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    
     def backup_config(self) -> str:
         """
         Crea una copia de seguridad de la configuración
+        Los backups se identifican por el hash de su contenido, por lo que
+        una configuración sin cambios no genera un archivo nuevo
         
         Returns:
             Ruta del archivo de backup
         """
         import datetime
         
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = f"config_backup_{timestamp}.json"
-        backup_path = os.path.join(self.config_dir, backup_file)
-        
-        if self.export_config(backup_path, encrypt=True):
+        try:
+            snapshot = self._get_backup_snapshot()
+            digest = hashlib.sha256(snapshot.encode()).hexdigest()
+            manifest = self._load_backup_manifest()
+            backup_path = os.path.join(self._get_backup_dir(), f"{digest}.bak")
+            
+            self._last_backup_attempt = datetime.datetime.now()
+            
+            if any(entry["hash"] == digest for entry in manifest) and os.path.exists(backup_path):
+                logger.info(f"Configuración sin cambios, backup omitido ({digest[:12]})")
+                return backup_path
+            
+            # Comprimir antes de cifrar
+            payload = self.cipher.encrypt(zlib.compress(snapshot.encode(), 9))
+            atomic_write(backup_path, payload)
+            
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            manifest[:] = [entry for entry in manifest if entry["hash"] != digest]
+            manifest.append({
+                "hash": digest,
+                "file": os.path.basename(backup_path),
+                "created": timestamp,
+                "size": len(payload)
+            })
+            self._save_backup_manifest()
+            
             # Actualizar fecha de último backup
             self.set("backup", "last_backup", timestamp)
+            logger.info(f"Backup de configuración creado: {backup_path}")
             return backup_path
+            
+        except Exception as e:
+            logger.error(f"Error creando backup: {e}")
+            return ""
+    
+    def list_backups(self) -> list:
+        """
+        Lista los backups disponibles
+        
+        Returns:
+            Entradas del manifiesto, de la más reciente a la más antigua
+        """
+        return list(reversed(self._load_backup_manifest()))
+    
+    def restore_backup(self, digest: str) -> bool:
+        """
+        Restaura la configuración desde un backup
         
-        return ""
+        Args:
+            digest: Hash del backup a restaurar
+            
+        Returns:
+            True si se restauró correctamente
+        """
+        try:
+            backup_path = os.path.join(self._get_backup_dir(), f"{digest}.bak")
+            with open(backup_path, 'rb') as f:
+                payload = f.read()
+            
+            restored_data = json.loads(zlib.decompress(self.cipher.decrypt(payload)).decode())
+            
+            if not self._validate_config_structure(restored_data):
+                logger.error("Estructura de configuración inválida en backup")
+                return False
+            
+            last_backup = self.get("backup", "last_backup")
+            restored_data.setdefault("backup", {})["last_backup"] = last_backup
+            self.config_data = restored_data
+            self._save_config()
+            logger.info(f"Configuración restaurada desde backup {digest[:12]}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error restaurando backup {digest}: {e}")
+            return False
     
     def cleanup_old_backups(self, keep_count: int = 5):
         """
@@ -370,19 +568,92 @@ class ConfigManager:
             keep_count: Número de backups a mantener
         """
         try:
-            backup_files = []
-            for file in os.listdir(self.config_dir):
-                if file.startswith("config_backup_") and file.endswith(".json"):
-                    file_path = os.path.join(self.config_dir, file)
-                    backup_files.append((file_path, os.path.getctime(file_path)))
-            
-            # Ordenar por fecha de creación (más recientes primero)
-            backup_files.sort(key=lambda x: x[1], reverse=True)
-            
-            # Eliminar backups antiguos
-            for file_path, _ in backup_files[keep_count:]:
-                os.remove(file_path)
+            manifest = self._load_backup_manifest()
+            if len(manifest) <= keep_count:
+                return
+            
+            # El manifiesto está ordenado del más antiguo al más reciente
+            expired = manifest[:len(manifest) - keep_count]
+            del manifest[:len(manifest) - keep_count]
+            
+            for entry in expired:
+                file_path = os.path.join(self._get_backup_dir(), entry["file"])
+                if os.path.exists(file_path):
+                    os.remove(file_path)
                 logger.info(f"Backup antiguo eliminado: {file_path}")
+            
+            self._save_backup_manifest()
                 
         except Exception as e:
-            logger.error(f"Error limpiando backups: {e}")
\ No newline at end of file
+            logger.error(f"Error limpiando backups: {e}")
+    
+    def start_backup_scheduler(self, keep_count: int = 5):
+        """
+        Inicia el programador de backups automáticos en segundo plano
+        Usa backup.auto_backup y backup.backup_interval (horas)
+        
+        Args:
+            keep_count: Número de backups a mantener
+        """
+        if self._backup_thread and self._backup_thread.is_alive():
+            return
+        
+        self._backup_stop_event.clear()
+        self._backup_thread = threading.Thread(
+            target=self._backup_scheduler_loop,
+            args=(keep_count,),
+            daemon=True
+        )
+        self._backup_thread.start()
+        logger.info("Programador de backups iniciado")
+    
+    def stop_backup_scheduler(self):
+        """
+        Detiene el programador de backups automáticos
+        """
+        self._backup_stop_event.set()
+    
+    def _backup_scheduler_loop(self, keep_count: int):
+        """
+        Bucle del programador de backups
+        Relee la configuración en cada vuelta para aplicar cambios de intervalo
+        """
+        while not self._backup_stop_event.is_set():
+            wait_seconds = self._seconds_until_next_backup()
+            
+            if wait_seconds <= 0:
+                if self.backup_config():
+                    self.cleanup_old_backups(keep_count)
+                wait_seconds = self._seconds_until_next_backup()
+            
+            # Despertar al menos cada minuto para detectar cambios de configuración
+            self._backup_stop_event.wait(min(max(wait_seconds, 1), 60))
+    
+    def _seconds_until_next_backup(self) -> float:
+        """
+        Calcula los segundos hasta el próximo backup automático
+        
+        Returns:
+            Segundos restantes (0 si toca ya, infinito si está desactivado)
+        """
+        import datetime
+        
+        if not self.get("backup", "auto_backup", True):
+            return float("inf")
+        
+        interval = datetime.timedelta(hours=self.get("backup", "backup_interval", 24))
+        last_backup = self.get("backup", "last_backup")
+        
+        try:
+            last_time = datetime.datetime.strptime(last_backup, "%Y%m%d_%H%M%S")
+        except (TypeError, ValueError):
+            last_time = None
+        
+        # Un intento sin cambios también cuenta como backup realizado
+        if self._last_backup_attempt and (last_time is None or self._last_backup_attempt > last_time):
+            last_time = self._last_backup_attempt
+        
+        if last_time is None:
+            return 0
+        
+        return (last_time + interval - datetime.datetime.now()).total_seconds()
@@ -0,0 +1,442 @@
+"""
+Módulo de API de control local
+Expone AlarmManager como JSON sobre HTTP/1.1 (TCP local o socket Unix) con
+conexiones persistentes, operaciones por lotes, un flujo NDJSON de próximas
+activaciones y un flujo SSE con los eventos de cambio de AlarmManager
+
+Rutas:
+    GET    /alarms?offset=&limit=         Lista paginada {"total", "items"}
+    POST   /alarms                        Crea una alarma
+    GET    /alarms/<id>                   Obtiene una alarma
+    PUT    /alarms/<id>                   Modifica una alarma (también PATCH)
+    DELETE /alarms/<id>                   Elimina una alarma
+    POST   /alarms/<id>/snooze            Pospone una alarma
+    POST   /alarms/batch                  {"operations": [...]} con un solo guardado
+    GET    /occurrences?from=&to=&limit=  Activaciones en orden, una por línea (NDJSON)
+    GET    /events                        Eventos added, updated, removed, fired y snoozed
+                                          (text/event-stream)
+
+Seguridad: se rechaza toda petición con cabecera Origin (las páginas web
+abiertas en el navegador no pueden usar la API), POST, PUT y PATCH exigen
+Content-Type application/json y, si hay token configurado (api.token), cada
+petición debe llevar "Authorization: Bearer <token>"
+"""
+
+import os
+import hmac
+import json
+import queue
+import heapq
+import logging
+import threading
+import socketserver
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+DEFAULT_PAGE_SIZE = 100
+EVENT_QUEUE_SIZE = 256
+KEEPALIVE_SECONDS = 15
+CHUNK_BYTES = 64 * 1024
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+class EventBroker:
+    """
+    Reparte eventos a los suscriptores; cada uno tiene una cola limitada y,
+    si se llena, se descartan sus eventos más antiguos
+    """
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: List[queue.Queue] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        subscriber = queue.Queue(self.queue_size)
+        with self._lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """
+        Publica un evento sin bloquear
+
+        Args:
+            event: Nombre del evento
+            data: Datos serializables a JSON
+        """
+        with self._lock:
+            subscribers = list(self.subscribers)
+
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait((event, data))
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+def iter_occurrences(alarms: Iterable, start: datetime, end: datetime) -> Iterable[Tuple[datetime, Any]]:
+    """
+    Mezcla en orden cronológico las activaciones de varias alarmas
+
+    Args:
+        alarms: Alarmas
+        start: Inicio del intervalo
+        end: Fin del intervalo (excluido)
+
+    Returns:
+        Iterador perezoso de tuplas (fecha, alarma); una alarma con datos
+        corruptos se omite (desde su error) sin cortar las demás
+    """
+    def tagged(index, alarm):
+        try:
+            for occurrence in alarm.iter_occurrences(start, end):
+                yield occurrence, index, alarm
+        except Exception as e:
+            logger.error(f"Error calculando activaciones de la alarma {alarm.id}: {e}")
+
+    streams = [tagged(index, alarm) for index, alarm in enumerate(alarms)]
+    for occurrence, _, alarm in heapq.merge(*streams):
+        yield occurrence, alarm
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """
+    Manejador HTTP/1.1 con conexiones persistentes
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "AlarmControl/1.0"
+
+    @property
+    def api(self) -> 'ControlServer':
+        return self.server.control
+
+    def log_message(self, format: str, *args):
+        logger.debug(f"API: {format % args}")
+
+    # Respuestas
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, {"error": message})
+
+    def _start_chunked(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _write_chunk(self, data: bytes):
+        if data:
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _access_error(self, method: str) -> Optional[Tuple[int, str]]:
+        """
+        Comprueba origen, token y tipo de contenido de la petición
+
+        Returns:
+            Tupla (estado, mensaje) del rechazo o None si se admite
+        """
+        if self.headers.get("Origin") is not None:
+            return 403, "peticiones desde navegador no permitidas"
+
+        token = self.api.token
+        if token:
+            authorization = self.headers.get("Authorization") or ""
+            if not hmac.compare_digest(authorization.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+                return 401, "token inválido o ausente"
+
+        if method in BODY_METHODS:
+            content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if content_type != "application/json":
+                return 415, "se requiere Content-Type application/json"
+        return None
+
+    # Enrutado
+
+    def _route(self, method: str):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        rejection = self._access_error(method)
+        if rejection:
+            # El cuerpo no leído dejaría la conexión desincronizada
+            self.close_connection = True
+            self._send_error(*rejection)
+            return
+
+        try:
+            if method in BODY_METHODS:
+                body = self._read_json()
+            else:
+                body = None
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_error(400, f"JSON inválido: {e}")
+            return
+
+        try:
+            if parts == ["alarms"] and method == "GET":
+                self._list_alarms(query)
+            elif parts == ["alarms"] and method == "POST":
+                self._apply_one({"op": "add", "data": body}, created=True)
+            elif parts == ["alarms", "batch"] and method == "POST":
+                self._batch(body)
+            elif len(parts) == 2 and parts[0] == "alarms" and method == "GET":
+                self._get_alarm(parts[1])
+            elif len(parts) == 2 and parts[0] == "alarms" and method in ("PUT", "PATCH"):
+                self._apply_one({"op": "update", "id": parts[1], "data": body})
+            elif len(parts) == 2 and parts[0] == "alarms" and method == "DELETE":
+                self._apply_one({"op": "delete", "id": parts[1]})
+            elif len(parts) == 3 and parts[0] == "alarms" and parts[2] == "snooze" and method == "POST":
+                self._snooze(parts[1])
+            elif parts == ["occurrences"] and method == "GET":
+                self._occurrences(query)
+            elif parts == ["events"] and method == "GET":
+                self._events()
+            else:
+                self._send_error(404, f"Ruta no encontrada: {method} {url.path}")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        except ValueError as e:
+            self._send_error(400, f"Parámetro inválido: {e}")
+        except Exception as e:
+            logger.error(f"Error en la API de control ({method} {url.path}): {e}")
+            self._send_error(500, str(e))
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    # Operaciones
+
+    def _list_alarms(self, query: Dict[str, str]):
+        offset = max(0, int(query.get("offset", 0)))
+        limit = max(0, int(query.get("limit", DEFAULT_PAGE_SIZE)))
+        alarms = list(self.api.alarm_manager.alarms)
+        self._send_json(200, {
+            "total": len(alarms),
+            "items": [alarm.to_dict() for alarm in alarms[offset:offset + limit]]
+        })
+
+    def _get_alarm(self, alarm_id: str):
+        alarm = self.api.alarm_manager.get_alarm_by_id(alarm_id)
+        if alarm is None:
+            self._send_error(404, "alarma no encontrada")
+        else:
+            self._send_json(200, alarm.to_dict())
+
+    def _apply_one(self, operation: Dict[str, Any], created: bool = False):
+        if operation.get("data") is not None and not isinstance(operation["data"], dict):
+            self._send_error(400, "se esperaba un objeto JSON")
+            return
+
+        result = self.api.alarm_manager.apply_batch([operation])[0]
+        if result["ok"]:
+            alarm = self.api.alarm_manager.get_alarm_by_id(result["id"])
+            self._send_json(201 if created else 200, alarm.to_dict() if alarm else {"id": result["id"]})
+        else:
+            self._send_error(404 if result["error"] == "alarma no encontrada" else 400, result["error"])
+
+    def _snooze(self, alarm_id: str):
+        alarm_manager = self.api.alarm_manager
+        alarm = alarm_manager.get_alarm_by_id(alarm_id)
+        if alarm is None:
+            self._send_error(404, "alarma no encontrada")
+        elif not alarm_manager.snooze_alarm(alarm_id):
+            self._send_error(409, "sin posposiciones disponibles")
+        else:
+            self._send_json(200, alarm.to_dict())
+
+    def _batch(self, body: Any):
+        operations = body.get("operations") if isinstance(body, dict) else None
+        if not isinstance(operations, list):
+            self._send_error(400, "se esperaba {\"operations\": [...]}")
+            return
+
+        results = self.api.alarm_manager.apply_batch(operations)
+        self._send_json(200, {"applied": sum(r["ok"] for r in results), "results": results})
+
+    def _occurrences(self, query: Dict[str, str]):
+        try:
+            start = datetime.fromisoformat(query["from"]) if "from" in query else datetime.now()
+            end = datetime.fromisoformat(query["to"]) if "to" in query else start + timedelta(days=7)
+            limit = int(query["limit"]) if "limit" in query else None
+        except ValueError as e:
+            self._send_error(400, f"Parámetro inválido: {e}")
+            return
+
+        self._start_chunked("application/x-ndjson")
+        buffer = bytearray()
+        try:
+            for count, (occurrence, alarm) in enumerate(iter_occurrences(list(self.api.alarm_manager.alarms), start, end)):
+                if limit is not None and count >= limit:
+                    break
+                buffer += json.dumps({
+                    "alarm_id": alarm.id,
+                    "title": alarm.title,
+                    "at": occurrence.isoformat()
+                }, ensure_ascii=False).encode('utf-8') + b"\n"
+                if len(buffer) >= CHUNK_BYTES:
+                    self._write_chunk(bytes(buffer))
+                    buffer.clear()
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            # Las cabeceras ya se enviaron: no cabe otra respuesta. Se corta la
+            # conexión sin el bloque final para que el cliente vea el flujo incompleto
+            logger.error(f"Error generando activaciones: {e}")
+            self.close_connection = True
+            return
+        self._write_chunk(bytes(buffer))
+        self._end_chunked()
+
+    def _events(self):
+        subscriber = self.api.events.subscribe()
+        try:
+            self._start_chunked("text/event-stream")
+            self._write_chunk(b": conectado\n\n")
+            while not self.api.stopping.is_set():
+                try:
+                    event, data = subscriber.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self._write_chunk(b": keep-alive\n\n")
+                    continue
+                payload = json.dumps(data, ensure_ascii=False, default=str)
+                self._write_chunk(f"event: {event}\ndata: {payload}\n\n".encode('utf-8'))
+            self._end_chunked()
+        finally:
+            self.api.events.unsubscribe(subscriber)
+            self.close_connection = True
+
+class _TcpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)  # BaseHTTPRequestHandler espera (host, puerto)
+
+class ControlServer:
+    """
+    Servidor de la API de control para un AlarmManager
+    """
+
+    def __init__(self, alarm_manager, address: str = DEFAULT_ADDRESS, token: str = None):
+        """
+        Inicializa el servidor
+
+        Args:
+            alarm_manager: Gestor de alarmas a exponer
+            address: "host:puerto" (puerto 0 elige uno libre) o "unix:/ruta/al/socket"
+            token: Token exigido como "Authorization: Bearer <token>" (None para no exigirlo)
+        """
+        self.alarm_manager = alarm_manager
+        self.address = address
+        self.token = token
+        self.events = EventBroker()
+        self.stopping = threading.Event()
+        self.httpd = None
+        self._thread = None
+
+    @property
+    def server_address(self):
+        """Dirección real de escucha (útil con el puerto 0)"""
+        return self.httpd.server_address if self.httpd else None
+
+    def _on_change(self, change: Dict[str, Any]):
+        data = {"ids": change["ids"], "timestamp": change["timestamp"]}
+        if "trigger" in change:
+            data["trigger"] = change["trigger"]
+        self.events.publish(change["type"], data)
+
+    def start(self):
+        """
+        Abre el socket y atiende peticiones en un hilo
+        """
+        if self.address.startswith("unix:"):
+            path = self.address[len("unix:"):]
+            if os.path.exists(path):
+                os.remove(path)
+            # El socket nace con permisos 0600: nunca es accesible con los de por defecto
+            previous_umask = os.umask(0o177)
+            try:
+                self.httpd = _UnixServer(path, ControlRequestHandler)
+            finally:
+                os.umask(previous_umask)
+        else:
+            host, _, port = self.address.rpartition(":")
+            self.httpd = _TcpServer((host or "127.0.0.1", int(port)), ControlRequestHandler)
+
+        self.httpd.control = self
+        self.stopping.clear()
+        self.alarm_manager.add_change_listener(self._on_change)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"API de control escuchando en {self.address}")
+
+    def stop(self):
+        """
+        Detiene el servidor y cierra los flujos de eventos
+        """
+        if self.httpd is None:
+            return
+
+        self.stopping.set()
+        self.alarm_manager.remove_change_listener(self._on_change)
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if isinstance(self.httpd, _UnixServer):
+            try:
+                os.remove(self.httpd.server_address)
+            except OSError:
+                pass
+        self.httpd = None
+        logger.info("API de control detenida")
@@ -0,0 +1,201 @@
+"""
+Módulo de almacenamiento seguro entre procesos
+Bloqueo de archivos consultivo, escrituras atómicas y contador de generación
+"""
+
+import os
+import stat
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+def atomic_write(path: str, data: Union[str, bytes]):
+    """
+    Escribe un archivo de forma atómica (archivo temporal + rename)
+    Los lectores ven siempre el contenido anterior o el nuevo, nunca uno a medias;
+    si el destino ya existe se conservan sus permisos
+
+    Args:
+        path: Ruta del archivo destino
+        data: Contenido a escribir
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            # mkstemp crea el temporal con 0600 y el rename lo hereda
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class FileStore:
+    """
+    Archivo de datos compartido entre procesos
+    La generación se guarda en el archivo de bloqueo (<archivo>.lock) y se
+    incrementa en cada escritura, lo que permite a los lectores saber si el
+    archivo cambió sin volver a parsearlo
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa el almacén
+
+        Args:
+            path: Ruta del archivo de datos
+        """
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.generation = None
+        self._seen = None
+
+    @contextmanager
+    def lock(self, exclusive: bool = True):
+        """
+        Adquiere el bloqueo consultivo del archivo
+
+        Args:
+            exclusive: True para escritura, False para lectura compartida
+
+        Yields:
+            Descriptor abierto del archivo de bloqueo
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+
+        with open(self.lock_path, 'a+b') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                # msvcrt solo ofrece bloqueo exclusivo
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+
+            try:
+                yield lock_file
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_generation(self, lock_file) -> int:
+        """
+        Lee el contador de generación del archivo de bloqueo
+
+        Returns:
+            Generación actual (0 si nunca se escribió)
+        """
+        lock_file.seek(0)
+        try:
+            return int(lock_file.read().strip() or 0)
+        except ValueError:
+            return 0
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        """
+        Firma (mtime, tamaño) del archivo; detecta ediciones que no usan el bloqueo
+
+        Returns:
+            Tupla (mtime_ns, tamaño) o None si no existe
+        """
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def read_generation(self) -> int:
+        """
+        Obtiene la generación actual del archivo
+
+        Returns:
+            Número de generación
+        """
+        with self.lock(exclusive=False) as lock_file:
+            return self._read_generation(lock_file)
+
+    def read(self, force: bool = False) -> Tuple[Optional[str], bool]:
+        """
+        Lee el archivo si cambió desde la última lectura o escritura propia
+
+        Args:
+            force: Leer aunque la generación no haya cambiado
+
+        Returns:
+            Tupla (contenido, cambió). El contenido es None si no cambió o no existe
+        """
+        with self.lock(exclusive=False) as lock_file:
+            generation = self._read_generation(lock_file)
+            seen = (generation, self._signature())
+
+            if not force and seen == self._seen:
+                return None, False
+
+            if seen[1] is None:
+                content = None
+            else:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+        self.generation = generation
+        self._seen = seen
+        return content, True
+
+    def write(self, data: Union[str, bytes],
+              merge: Callable[[str], Union[str, bytes]] = None) -> int:
+        """
+        Escribe el archivo de forma atómica bajo bloqueo exclusivo
+
+        Args:
+            data: Contenido completo del archivo
+            merge: Si el archivo cambió desde la última lectura o escritura
+                propia, recibe su contenido actual y devuelve el que se escribe
+                en lugar de data (evita pisar cambios de otros procesos). Sin
+                lectura ni escritura previa no hay nada con qué comparar y se
+                escribe data
+
+        Returns:
+            Nueva generación
+        """
+        with self.lock(exclusive=True) as lock_file:
+            generation = self._read_generation(lock_file)
+            if merge is not None:
+                seen = (generation, self._signature())
+                if self._seen is not None and seen != self._seen and seen[1] is not None:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        data = merge(f.read())
+            generation += 1
+
+            atomic_write(self.path, data)
+
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(str(generation).encode())
+            lock_file.flush()
+
+            self.generation = generation
+            self._seen = (generation, self._signature())
+
+        return generation
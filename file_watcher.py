@@ -0,0 +1,259 @@
+"""
+Módulo de vigilancia de archivos
+Detecta cambios hechos por otros procesos en los archivos de datos de la aplicación
+Usa inotify en Linux y sondeo por mtime/tamaño en el resto de plataformas
+"""
+
+import os
+import struct
+import select
+import logging
+import platform
+import threading
+import ctypes
+import ctypes.util
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constantes de inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+class FileWatcher:
+    """
+    Vigilante ligero de archivos con notificación por callback
+    """
+
+    def __init__(self, poll_interval: float = 1.0, use_inotify: bool = True):
+        """
+        Inicializa el vigilante de archivos
+
+        Args:
+            poll_interval: Segundos entre comprobaciones en modo sondeo
+            use_inotify: Si debe intentar usar inotify cuando esté disponible
+        """
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.callbacks: Dict[str, Callable[[str], None]] = {}
+        self.signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.backend = None
+        self.is_running = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._inotify_fd = None
+        self._watch_dirs: Dict[int, str] = {}
+
+    def watch(self, path: str, callback: Callable[[str], None]):
+        """
+        Registra un archivo a vigilar
+
+        Args:
+            path: Ruta del archivo
+            callback: Función a llamar con la ruta cuando el archivo cambie
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self.callbacks[path] = callback
+            self.signatures[path] = self._signature(path)
+
+        if self._inotify_fd is not None:
+            self._add_inotify_watch(os.path.dirname(path))
+
+    def unwatch(self, path: str):
+        """
+        Deja de vigilar un archivo
+
+        Args:
+            path: Ruta del archivo
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self.callbacks.pop(path, None)
+            self.signatures.pop(path, None)
+
+    def acknowledge(self, path: str):
+        """
+        Registra el estado actual del archivo como conocido
+        Se llama tras una escritura propia para no recargar lo que acabamos de guardar
+
+        Args:
+            path: Ruta del archivo
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self.callbacks:
+                self.signatures[path] = self._signature(path)
+
+    def start(self):
+        """
+        Inicia la vigilancia en un hilo en segundo plano
+        """
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self.backend = "polling"
+
+        if self.use_inotify and platform.system() == "Linux":
+            if self._init_inotify():
+                self.backend = "inotify"
+
+        target = self._inotify_loop if self.backend == "inotify" else self._poll_loop
+        self.is_running = True
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+        logger.info(f"Vigilancia de archivos iniciada ({self.backend})")
+
+    def stop(self):
+        """
+        Detiene la vigilancia
+        """
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        self._stop_event.set()
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+        if self._inotify_fd is not None:
+            try:
+                os.close(self._inotify_fd)
+            except OSError:
+                pass
+            self._inotify_fd = None
+            self._watch_dirs.clear()
+
+        logger.info("Vigilancia de archivos detenida")
+
+    def _signature(self, path: str) -> Optional[Tuple[int, int]]:
+        """
+        Obtiene la firma (mtime, tamaño) de un archivo
+
+        Returns:
+            Tupla (mtime_ns, tamaño) o None si no existe
+        """
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _check(self, path: str):
+        """
+        Compara la firma actual con la conocida y notifica si cambió
+
+        Args:
+            path: Ruta del archivo a comprobar
+        """
+        with self._lock:
+            callback = self.callbacks.get(path)
+            if callback is None:
+                return
+
+            signature = self._signature(path)
+            if signature == self.signatures.get(path):
+                return
+            self.signatures[path] = signature
+
+        if signature is None:
+            # Archivo eliminado: se recargará cuando vuelva a existir
+            return
+
+        try:
+            logger.info(f"Cambio externo detectado en {path}")
+            callback(path)
+        except Exception as e:
+            logger.error(f"Error procesando cambio en {path}: {e}")
+
+    def _poll_loop(self):
+        """
+        Bucle de sondeo por mtime/tamaño
+        """
+        while not self._stop_event.wait(self.poll_interval):
+            for path in list(self.callbacks):
+                self._check(path)
+
+    def _init_inotify(self) -> bool:
+        """
+        Inicializa inotify mediante libc
+
+        Returns:
+            True si inotify está disponible
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return False
+
+            self._libc = libc
+            self._inotify_fd = fd
+
+            for directory in {os.path.dirname(path) for path in self.callbacks}:
+                self._add_inotify_watch(directory)
+
+            return True
+
+        except Exception as e:
+            logger.debug(f"inotify no disponible: {e}")
+            return False
+
+    def _add_inotify_watch(self, directory: str):
+        """
+        Vigila un directorio (las escrituras atómicas reemplazan el inodo del archivo)
+
+        Args:
+            directory: Directorio a vigilar
+        """
+        if directory in self._watch_dirs.values():
+            return
+
+        wd = self._libc.inotify_add_watch(self._inotify_fd, directory.encode(), _WATCH_MASK)
+        if wd >= 0:
+            self._watch_dirs[wd] = directory
+        else:
+            logger.warning(f"No se pudo vigilar {directory} (errno {ctypes.get_errno()})")
+
+    def _inotify_loop(self):
+        """
+        Bucle de lectura de eventos de inotify
+        """
+        while not self._stop_event.is_set():
+            try:
+                ready, _, _ = select.select([self._inotify_fd], [], [], 0.5)
+                if not ready:
+                    continue
+
+                buffer = os.read(self._inotify_fd, 64 * 1024)
+            except (OSError, ValueError, TypeError):
+                # Descriptor cerrado durante stop()
+                break
+
+            changed = set()
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+
+                directory = self._watch_dirs.get(wd)
+                if directory and name:
+                    path = os.path.join(directory, name)
+                    if path in self.callbacks:
+                        changed.add(path)
+
+            for path in changed:
+                self._check(path)
@@ -6,54 +6,59 @@ Desarrollado con Kivy para Android e iOS
 
 import os
 import sys
+import json
 import logging
+from collections import deque
+from time import perf_counter
 from datetime import datetime, timedelta
+
+# Referencia para medir el tiempo hasta el primer frame (ALARM_APP_FIRST_FRAME_REPORT)
+STARTED_AT = perf_counter()
+
 from kivy.config import Config
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.floatlayout import FloatLayout
-from kivy.uix.screenmanager import ScreenManager, Screen
+from kivy.uix.screenmanager import ScreenManager
 from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.popup import Popup
 from kivy.clock import Clock
-from kivy.core.window import Window
 from kivymd.app import MDApp
-from kivymd.theming import ThemeManager
 from kivymd.uix.screen import MDScreen
-from kivymd.uix.textfield import MDTextField
 from kivymd.uix.button import MDRaisedButton, MDIconButton
 from kivymd.uix.toolbar import MDTopAppBar
-from kivymd.uix.list import MDList, ThreeLineAvatarIconListItem, IconLeftWidget
-from kivymd.uix.slider import MDSlider
+from kivymd.uix.list import MDList, IconLeftWidget
 from kivymd.uix.card import MDCard
 from kivymd.uix.label import MDLabel
-from kivymd.uix.snackbar import Snackbar
 from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.dialog import MDDialog
 from kivymd.uix.gridlayout import MDGridLayout
 
-# Importar componentes que pueden tener ubicaciones diferentes
-try:
-    from kivy.uix.switch import Switch as MDSwitch
-except ImportError:
-    MDSwitch = None
+# Los widgets que solo usan la configuración, la lista de alarmas y los diálogos
+# (MDTextField, MDSlider, MDSwitch, MDDialog, ScrollView, Snackbar...) se importan
+# al construirlos, para no pagar su carga antes del primer frame
 
-# Verificar e importar componentes con nombres alternativos
-try:
-    from kivymd.uix.widget import MDSwitch
-except ImportError:
+def _get_switch_class():
+    """
+    Obtiene la clase de switch disponible según la versión de KivyMD
+    
+    Returns:
+        Clase del switch o None si no hay ninguna
+    """
     try:
-        from kivy.uix.switch import Switch as MDSwitch
+        from kivymd.uix.widget import MDSwitch
     except ImportError:
-        MDSwitch = None
+        try:
+            from kivy.uix.switch import Switch as MDSwitch
+        except ImportError:
+            MDSwitch = None
+    return MDSwitch
 
 # Importar módulos auxiliares de la aplicación
 try:
     from config_manager import ConfigManager
-    from alarm_manager import AlarmManager
-    from browser_integration import BrowserIntegration, AudioManager
+    from alarm_manager import AlarmManager, coalesce_changes
+    from browser_integration import BrowserIntegration, AudioManager, get_browser_integration
     from responsive_manager import ResponsiveManager
+    from startup import StartupCoordinator
+    from main_thread import MainThreadDispatcher
 except ImportError as e:
     logger = logging.getLogger(__name__)
     logger.error(f"Error importando módulos auxiliares: {e}")
@@ -63,6 +68,8 @@ except ImportError as e:
     print("- alarm_manager.py")
     print("- browser_integration.py")
     print("- responsive_manager.py")
+    print("- startup.py")
+    print("- main_thread.py")
     sys.exit(1)
 
 # Configuración inicial de logging
@@ -97,13 +104,112 @@ class AlarmApp(MDApp):
         self.theme_cls.accent_hue = "A400"
         self.title = "🔔 Alarmas Inteligente"
         
-        # Manager de pantallas
+        # Manager de pantallas y fábricas de las que aún no se han construido
         self.screen_manager = ScreenManager()
+        self.screen_factories = {}
+        
+        # Los hilos de fondo solo encolan callbacks; el Clock los ejecuta una vez por frame
+        self.dispatcher = MainThreadDispatcher()
+        self.dispatcher.start()
+        
+        # Cambios de alarmas pendientes de aplicar en la interfaz
+        self.alarm_change_handlers = []
+        self._pending_changes = deque()
+        
+        # Cargar configuraciones, alarmas y capacidades en segundo plano;
+        # los callbacks de las tareas se ejecutan en el hilo de Kivy
+        self.startup = StartupCoordinator(dispatch=self.dispatcher.submit)
+        self._start_background_tasks()
+        
+    @property
+    def config_manager(self):
+        """
+        Gestor de configuraciones (espera a que termine de descifrarse)
+        """
+        return self.startup.result('config')
+    
+    @property
+    def alarm_manager(self):
+        """
+        Gestor de alarmas (espera a que terminen de cargarse las alarmas)
+        """
+        return self.startup.result('alarms')
+    
+    def _start_background_tasks(self):
+        """
+        Lanza las tareas de arranque: configuración, alarmas y sondeo de
+        navegadores/sonidos en paralelo, y el planificador cuando tiene sus datos
+        """
+        def load_alarms(config_manager):
+            alarm_manager = AlarmManager(config_manager)
+            alarm_manager.load_alarms()
+            alarm_manager.add_change_listener(self._queue_alarm_change)
+            alarm_manager.set_callback_dispatcher(self.dispatcher.submit)
+            alarm_manager.set_notification_callback(self._on_alarm_fired)
+            return alarm_manager
+        
+        def probe_capabilities(config_manager):
+            # Sondear navegadores y reproductores una sola vez
+            get_browser_integration(config_manager)
+            return AudioManager(config_manager)
+        
+        def start_scheduler(config_manager, alarm_manager, audio_manager):
+            alarm_manager.set_audio_manager(audio_manager)
+            alarm_manager.start()
+            config_manager.start_backup_scheduler()
+            return alarm_manager
+        
+        self.startup.submit('config', ConfigManager)
+        self.startup.submit('alarms', load_alarms, depends=('config',))
+        self.startup.submit('probe', probe_capabilities, depends=('config',))
+        self.startup.submit('scheduler', start_scheduler, depends=('config', 'alarms', 'probe'))
+        
+    def add_alarm_change_handler(self, handler):
+        """
+        Registra un manejador de cambios de alarmas para la interfaz
+        
+        Args:
+            handler: Función (upserted, removed) llamada en el hilo de Kivy como mucho
+                una vez por frame, con las alarmas añadidas o modificadas por ID y
+                los IDs eliminados desde la llamada anterior
+        """
+        self.alarm_change_handlers.append(handler)
+    
+    def _queue_alarm_change(self, event):
+        """
+        Acumula un evento de AlarmManager (desde cualquier hilo) para el próximo frame;
+        todos los vaciados pendientes comparten clave, así que se entrega uno solo
+        """
+        self._pending_changes.append(event)
+        self.dispatcher.submit(self._flush_alarm_changes, key='alarm-changes')
+    
+    def _flush_alarm_changes(self):
+        """
+        Reduce los eventos acumulados y los entrega a los manejadores de la interfaz
+        """
+        events = []
+        while self._pending_changes:
+            events.append(self._pending_changes.popleft())
         
-        # Cargar configuraciones
-        self.config_manager = ConfigManager()
-        self.alarm_manager = AlarmManager(self.config_manager)
+        upserted, removed = coalesce_changes(events)
+        if not upserted and not removed:
+            return
         
+        for handler in list(self.alarm_change_handlers):
+            try:
+                handler(upserted, removed)
+            except Exception as e:
+                logger.error(f"Error aplicando cambios de alarmas: {e}")
+    
+    def _on_alarm_fired(self, trigger_info):
+        """
+        Avisa en la interfaz de una alarma disparada (llega por el dispatcher,
+        nunca desde el hilo del planificador)
+        """
+        from kivymd.uix.snackbar import Snackbar
+        
+        Snackbar(text=f"🔔 {trigger_info.get('title') or 'Alarma'}").open()
+    
     def build(self):
         """
         Construye la interfaz principal de la aplicación
@@ -112,17 +218,12 @@ class AlarmApp(MDApp):
             # Cargar tema personalizado
             self._load_custom_theme()
             
-            # Crear pantalla principal
-            main_screen = MainScreen(name='main')
-            self.screen_manager.add_widget(main_screen)
-            
-            # Crear pantalla de configuración
-            config_screen = ConfigScreen(name='config')
-            self.screen_manager.add_widget(config_screen)
-            
-            # Crear pantalla de alarmas
-            alarm_screen = AlarmScreen(name='alarms')
-            self.screen_manager.add_widget(alarm_screen)
+            # Registrar las pantallas; solo la principal se construye ahora,
+            # el resto en la primera navegación
+            self.register_screen('main', MainScreen)
+            self.register_screen('config', ConfigScreen)
+            self.register_screen('alarms', AlarmScreen)
+            self.show_screen('main')
             
             return self.screen_manager
             
@@ -130,18 +231,49 @@ class AlarmApp(MDApp):
             logger.error(f"Error construyendo la aplicación: {e}")
             return self._create_error_screen(str(e))
     
-    def _load_custom_theme(self):
+    def register_screen(self, name, factory):
         """
-        Carga el tema personalizado basado en las configuraciones
+        Registra una pantalla que se construirá al navegar a ella por primera vez
+        
+        Args:
+            name: Nombre de la pantalla en el ScreenManager
+            factory: Clase o función que recibe name= y devuelve la pantalla
         """
-        try:
-            theme_style = self.config_manager.get('theme', 'theme_style', 'Light')
-            self.theme_cls.theme_style = theme_style
-            
-            logger.info(f"Tema cargado: {theme_style}")
+        self.screen_factories[name] = factory
+    
+    def show_screen(self, name):
+        """
+        Navega a una pantalla, construyéndola si todavía no existe
+        
+        Args:
+            name: Nombre de la pantalla registrada
             
-        except Exception as e:
-            logger.error(f"Error cargando tema: {e}")
+        Returns:
+            La pantalla mostrada
+        """
+        if not self.screen_manager.has_screen(name):
+            start = perf_counter()
+            self.screen_manager.add_widget(self.screen_factories[name](name=name))
+            logger.info(f"Pantalla '{name}' construida en {(perf_counter() - start) * 1000:.1f} ms")
+        
+        self.screen_manager.current = name
+        return self.screen_manager.get_screen(name)
+    
+    def _load_custom_theme(self):
+        """
+        Carga el tema personalizado cuando la configuración esté descifrada
+        """
+        def apply_theme(config_manager):
+            try:
+                theme_style = config_manager.get('theme', 'theme_style', 'Light')
+                self.theme_cls.theme_style = theme_style
+                
+                logger.info(f"Tema cargado: {theme_style}")
+                
+            except Exception as e:
+                logger.error(f"Error cargando tema: {e}")
+        
+        self.startup.when_ready('config', apply_theme)
     
     def _create_error_screen(self, error_message):
         """
@@ -196,18 +328,47 @@ class AlarmApp(MDApp):
             # Solicitar permisos necesarios
             self._request_permissions()
             
-            # Iniciar el manager de alarmas
-            self.alarm_manager.start()
-            
-            # Cargar alarmas existentes
-            self.alarm_manager.load_alarms()
+            # El planificador arranca en segundo plano tras cargar alarmas y capacidades
+            self.startup.when_ready(
+                'scheduler',
+                lambda alarm_manager: logger.info("Aplicación iniciada correctamente"),
+                on_error=lambda e: self._show_error_snackbar(f"Error de inicialización: {e}")
+            )
             
-            logger.info("Aplicación iniciada correctamente")
+            if os.environ.get('ALARM_APP_FIRST_FRAME_REPORT'):
+                from kivy.core.window import Window
+                Window.bind(on_flip=self._report_first_frame)
             
         except Exception as e:
             logger.error(f"Error durante la inicialización: {e}")
             self._show_error_snackbar(f"Error de inicialización: {e}")
     
+    def _report_first_frame(self, window):
+        """
+        Informa por stdout del tiempo hasta el primer frame dibujado
+        Con ALARM_APP_FIRST_FRAME_REPORT=exit cierra la aplicación a continuación
+        (lo usa benchmarks/startup_benchmark.py)
+        """
+        window.unbind(on_flip=self._report_first_frame)
+        print(json.dumps({'first_frame_ms': (perf_counter() - STARTED_AT) * 1000}), flush=True)
+        
+        if os.environ.get('ALARM_APP_FIRST_FRAME_REPORT') == 'exit':
+            Clock.schedule_once(lambda dt: self.stop(), 0)
+    
+    def on_stop(self):
+        """
+        Se ejecuta cuando la aplicación se cierra
+        """
+        # Esperar a las tareas en curso para no dejar el planificador arrancando
+        self.startup.shutdown()
+        if self.startup.ready('config'):
+            self.config_manager.stop_backup_scheduler()
+        if self.startup.ready('alarms'):
+            self.alarm_manager.stop()
+        
+        self.dispatcher.stop()
+        logger.info(f"Entregas al hilo principal: {self.dispatcher.get_stats()}")
+    
     def _request_permissions(self):
         """
         Solicita los permisos necesarios para la aplicación
@@ -230,6 +391,8 @@ class AlarmApp(MDApp):
         """
         Muestra un snackbar de error
         """
+        from kivymd.uix.snackbar import Snackbar
+        
         snackbar = Snackbar(
             text=message,
             bg_color=(1, 0, 0, 0.8)
@@ -336,8 +499,10 @@ class MainScreen(MDScreen):
         layout.add_widget(self.content_layout)
         self.add_widget(layout)
         
-        # Programar actualización de estadísticas
-        Clock.schedule_interval(self._update_stats, 5)  # Cada 5 segundos
+        # Actualizar estadísticas en cuanto haya alarmas y después con cada cambio
+        app = App.get_running_app()
+        app.startup.when_ready('alarms', lambda alarm_manager: self._update_stats(0))
+        app.add_alarm_change_handler(lambda upserted, removed: self._update_stats(0))
     
     def _update_clock(self, dt):
         """
@@ -495,7 +660,7 @@ class MainScreen(MDScreen):
         Abre la pantalla de configuración
         """
         app = App.get_running_app()
-        app.screen_manager.current = 'config'
+        app.show_screen('config')
     
     def _create_status_card(self):
         """
@@ -544,6 +709,7 @@ class MainScreen(MDScreen):
         Muestra el menú lateral mejorado
         """
         from kivymd.uix.list import OneLineIconListItem
+        from kivymd.uix.dialog import MDDialog
         
         menu_items = []
         
@@ -615,6 +781,8 @@ class MainScreen(MDScreen):
         """
         Muestra información sobre la aplicación
         """
+        from kivymd.uix.dialog import MDDialog
+        
         dialog = MDDialog(
             title="📱 Sobre Alarmas Inteligente",
             text="🔔 Versión 1.0\n\n⭐ Sistema inteligente de alarmas\n🎥 Integración con videos motivacionales\n🌙 Temas claro y oscuro\n🔔 Notificaciones avanzadas\n📱 Optimizado para móviles\n\n💻 Desarrollado con ❤️ usando Kivy + KivyMD",
@@ -628,6 +796,8 @@ class MainScreen(MDScreen):
         """
         Muestra la ayuda
         """
+        from kivymd.uix.dialog import MDDialog
+        
         dialog = MDDialog(
             title="❓ Ayuda",
             text="🚀 Crear Alarma Rápida: Botón verde para alarmas de 5-60 minutos\n⏰ Alarma Completa: Para configuración avanzada\n🎥 URL de Video: Enlace a YouTube (opcional)\n🔔 Snooze: Función de postergación disponible\n💡 Tip: Prueba el tema oscuro en configuración",
@@ -641,6 +811,8 @@ class MainScreen(MDScreen):
         """
         Muestra diálogo de confirmación para salir
         """
+        from kivymd.uix.dialog import MDDialog
+        
         dialog = MDDialog(
             title="🚪 Salir de la Aplicación",
             text="¿Estás seguro de que quieres salir de Alarmas Inteligente?\n\nTodas las alarmas activas se mantendrán.",
@@ -695,12 +867,14 @@ class MainScreen(MDScreen):
         Abre la pantalla para agregar alarma
         """
         app = App.get_running_app()
-        app.screen_manager.current = 'alarms'
+        app.show_screen('alarms')
     
     def _quick_add_alarm(self, instance=None):
         """
         Agrega una alarma con hora específica
         """
+        from kivymd.uix.dialog import MDDialog
+        
         try:
             dialog = MDDialog(
                 title="⏰ Nueva Alarma",
@@ -723,6 +897,8 @@ class MainScreen(MDScreen):
         """
         try:
             app = App.get_running_app()
+            if not app.startup.ready('alarms'):
+                return
             alarms = app.alarm_manager.get_active_alarms()
             
             # Actualizar total de alarmas
@@ -757,6 +933,8 @@ class QuickAlarmDialog(BoxLayout):
         """
         Construye la interfaz del diálogo
         """
+        from kivymd.uix.textfield import MDTextField
+        
         # Campo de título
         self.title_field = MDTextField(
             hint_text="Título de la alarma",
@@ -930,6 +1108,8 @@ class ConfigScreen(MDScreen):
         """
         Construye la interfaz de configuración
         """
+        from kivy.uix.scrollview import ScrollView
+        
         layout = MDBoxLayout(orientation='vertical')
         
         # Toolbar
@@ -976,6 +1156,8 @@ class ConfigScreen(MDScreen):
         """
         Crea la sección de configuración de tema
         """
+        MDSwitch = _get_switch_class()
+        
         card = MDCard(padding=15)
         layout = MDBoxLayout(orientation='vertical', spacing=10)
         
@@ -1006,6 +1188,9 @@ class ConfigScreen(MDScreen):
         """
         Crea la sección de configuración de audio
         """
+        from kivymd.uix.slider import MDSlider
+        MDSwitch = _get_switch_class()
+        
         card = MDCard(padding=15)
         layout = MDBoxLayout(orientation='vertical', spacing=15)
         
@@ -1053,6 +1238,8 @@ class ConfigScreen(MDScreen):
         """
         Crea la sección de configuración de snooze
         """
+        from kivymd.uix.slider import MDSlider
+        
         card = MDCard(padding=15)
         layout = MDBoxLayout(orientation='vertical', spacing=15)
         
@@ -1104,6 +1291,8 @@ class ConfigScreen(MDScreen):
         """
         Crea la sección de configuración de notificaciones
         """
+        MDSwitch = _get_switch_class()
+        
         card = MDCard(padding=15)
         layout = MDBoxLayout(orientation='vertical', spacing=15)
         
@@ -1159,7 +1348,7 @@ class ConfigScreen(MDScreen):
         Regresa a la pantalla principal
         """
         app = App.get_running_app()
-        app.screen_manager.current = 'main'
+        app.show_screen('main')
 
 class AlarmScreen(MDScreen):
     """
@@ -1174,6 +1363,10 @@ class AlarmScreen(MDScreen):
         """
         Construye la interfaz de gestión de alarmas mejorada
         """
+        from alarm_list import AlarmRecycleView
+        
+        self._alarms_by_id = {}
+        
         layout = MDBoxLayout(orientation='vertical', spacing=0)
         
         # Toolbar con diseño moderno
@@ -1217,18 +1410,26 @@ class AlarmScreen(MDScreen):
         welcome_card.add_widget(welcome_layout)
         content.add_widget(welcome_card)
         
-        # Lista de alarmas con scroll
-        scroll = ScrollView()
-        self.alarm_list = MDList()
-        scroll.add_widget(self.alarm_list)
+        # Lista virtualizada: solo se instancian las filas visibles
+        self.alarm_list = AlarmRecycleView(
+            edit_callback=self._on_alarm_selected,
+            delete_callback=self._on_alarm_delete
+        )
+        self.empty_card = self._create_empty_card()
         
-        content.add_widget(scroll)
+        # Contenedor que muestra la lista o el aviso de lista vacía
+        self.list_container = MDBoxLayout(orientation='vertical')
+        self.list_container.add_widget(self.empty_card)
+        
+        content.add_widget(self.list_container)
         layout.add_widget(content)
         
         self.add_widget(layout)
         
-        # Cargar alarmas al iniciar
-        Clock.schedule_once(lambda dt: self._refresh_alarms(), 0.5)
+        # Mostrar las alarmas en cuanto estén cargadas y aplicar después solo los cambios
+        app = App.get_running_app()
+        app.startup.when_ready('alarms', self._refresh_alarms)
+        app.add_alarm_change_handler(self._apply_alarm_changes)
     
     def _add_new_alarm(self, *args):
         """
@@ -1241,105 +1442,108 @@ class AlarmScreen(MDScreen):
         )
         snackbar.open()
     
+    def _create_empty_card(self):
+        """
+        Crea el aviso que se muestra cuando no hay alarmas activas
+        """
+        no_alarms_card = MDCard(
+            size_hint=(1, None),
+            height=150,
+            padding=20,
+            radius=[12, 12, 12, 12],
+            elevation=2
+        )
+        no_alarms_card.md_bg_color = (0.98, 0.98, 1.0, 1)
+        
+        no_alarms_layout = MDBoxLayout(orientation='vertical', spacing=10)
+        no_alarms_layout.add_widget(MDLabel(
+            text="📭",
+            font_style="H3",
+            halign="center"
+        ))
+        no_alarms_layout.add_widget(MDLabel(
+            text="No tienes alarmas activas",
+            font_style="H6",
+            halign="center",
+            theme_text_color="Primary"
+        ))
+        no_alarms_layout.add_widget(MDLabel(
+            text="¡Crea tu primera alarma!",
+            font_style="Caption",
+            halign="center"
+        ))
+        no_alarms_card.add_widget(no_alarms_layout)
+        
+        return no_alarms_card
+    
     def _refresh_alarms(self, *args):
         """
         Actualiza la lista de alarmas
+        Solo se reemplazan los datos del RecycleView; las filas visibles se reciclan
         """
         try:
             app = App.get_running_app()
             alarms = app.alarm_manager.get_active_alarms()
             
-            # Limpiar lista actual
-            self.alarm_list.clear_widgets()
-            
-            if not alarms:
-                # Mostrar mensaje si no hay alarmas
-                no_alarms_card = MDCard(
-                    size_hint=(1, None),
-                    height=150,
-                    padding=20,
-                    radius=[12, 12, 12, 12],
-                    elevation=2
-                )
-                no_alarms_card.md_bg_color = (0.98, 0.98, 1.0, 1)
-                
-                no_alarms_layout = MDBoxLayout(orientation='vertical', spacing=10)
-                no_alarms_layout.add_widget(MDLabel(
-                    text="📭",
-                    font_style="H3",
-                    halign="center"
-                ))
-                no_alarms_layout.add_widget(MDLabel(
-                    text="No tienes alarmas activas",
-                    font_style="H6",
-                    halign="center",
-                    theme_text_color="Primary"
-                ))
-                no_alarms_layout.add_widget(MDLabel(
-                    text="¡Crea tu primera alarma!",
-                    font_style="Caption",
-                    halign="center"
-                ))
-                no_alarms_card.add_widget(no_alarms_layout)
-                self.alarm_list.add_widget(no_alarms_card)
-            else:
-                # Mostrar alarmas
-                for alarm in alarms:
-                    alarm_item = self._create_alarm_item(alarm)
-                    self.alarm_list.add_widget(alarm_item)
+            self._alarms_by_id = {alarm.id: alarm for alarm in alarms}
+            self.alarm_list.set_alarms(alarms)
+            self._show_list_or_empty()
             
             logger.info(f"Lista de alarmas actualizada: {len(alarms)} alarmas")
             
         except Exception as e:
             logger.error(f"Error actualizando lista de alarmas: {e}")
     
-    def _create_alarm_item(self, alarm):
-        """
-        Crea un elemento de lista para una alarma
+    def _apply_alarm_changes(self, upserted, removed):
         """
-        # Formatear información de la alarma
-        time_str = alarm.get_formatted_time()
-        title = alarm.title or "Sin título"
-        
-        # Determinar icono según recurrencia
-        if alarm.recurrence == "daily":
-            recurrence_icon = "🔁"
-            recurrence_text = "Diaria"
-        elif alarm.recurrence == "weekly":
-            recurrence_icon = "📅"
-            recurrence_text = "Semanal"
-        else:
-            recurrence_icon = "⏰"
-            recurrence_text = "Una vez"
-        
-        # Crear item de lista
-        item = ThreeLineAvatarIconListItem(
-            text=f"⏰ {title}",
-            secondary_text=f"🕐 Hora: {time_str}",
-            tertiary_text=f"{recurrence_icon} {recurrence_text} | Volumen: {alarm.volume}%"
-        )
-        
-        # Icono izquierdo
-        icon_widget = IconLeftWidget(
-            icon="alarm" if alarm.enabled else "alarm-off"
-        )
-        item.add_widget(icon_widget)
+        Aplica a la lista solo las alarmas que cambiaron
         
-        # Botón de editar/eliminar
-        from kivymd.uix.button import MDIconButton
-        
-        delete_btn = MDIconButton(
-            icon="delete",
-            theme_text_color="Custom",
-            text_color=(0.8, 0.2, 0.2, 1),
-            on_release=lambda x: self._confirm_delete_alarm(alarm)
-        )
-        item.add_widget(delete_btn)
-        
-        # Acción al tocar el item
-        item.bind(on_release=lambda x: self._edit_alarm(alarm))
-        
-        return item
+        Args:
+            upserted: Alarmas añadidas o modificadas por ID
+            removed: IDs de alarmas eliminadas
+        """
+        try:
+            # La lista muestra las alarmas activas: una desactivada se quita
+            shown = [alarm for alarm in upserted.values() if alarm.enabled]
+            hidden = list(removed) + [alarm_id for alarm_id, alarm in upserted.items() if not alarm.enabled]
+            
+            for alarm in shown:
+                self._alarms_by_id[alarm.id] = alarm
+            for alarm_id in hidden:
+                self._alarms_by_id.pop(alarm_id, None)
+            
+            changed = self.alarm_list.apply_changes(shown, hidden)
+            self._show_list_or_empty()
+            
+            logger.debug(f"Lista de alarmas: {changed} filas actualizadas")
+            
+        except Exception as e:
+            logger.error(f"Error aplicando cambios a la lista de alarmas: {e}")
+    
+    def _show_list_or_empty(self):
+        """
+        Muestra la lista o el mensaje de lista vacía
+        """
+        shown = self.alarm_list if self._alarms_by_id else self.empty_card
+        if shown.parent is None:
+            self.list_container.clear_widgets()
+            self.list_container.add_widget(shown)
+    
+    def _on_alarm_selected(self, alarm_id):
+        """
+        Abre la edición de la alarma tocada en la lista
+        """
+        alarm = self._alarms_by_id.get(alarm_id)
+        if alarm:
+            self._edit_alarm(alarm)
+    
+    def _on_alarm_delete(self, alarm_id):
+        """
+        Pide confirmación para eliminar la alarma de una fila
+        """
+        alarm = self._alarms_by_id.get(alarm_id)
+        if alarm:
+            self._confirm_delete_alarm(alarm)
     
     def _edit_alarm(self, alarm):
         """
@@ -1356,6 +1560,8 @@ class AlarmScreen(MDScreen):
         """
         Confirma la eliminación de una alarma
         """
+        from kivymd.uix.dialog import MDDialog
+        
         dialog = MDDialog(
             title="🗑️ Eliminar Alarma",
             text=f"¿Estás seguro de que quieres eliminar la alarma '{alarm.title}'?",
@@ -1387,7 +1593,6 @@ class AlarmScreen(MDScreen):
                     bg_color=(0.0, 0.6, 0.0, 0.9)
                 )
                 snackbar.open()
-                self._refresh_alarms()
             dialog.dismiss()
         except Exception as e:
             logger.error(f"Error eliminando alarma: {e}")
@@ -1397,7 +1602,7 @@ class AlarmScreen(MDScreen):
         Regresa a la pantalla principal
         """
         app = App.get_running_app()
-        app.screen_manager.current = 'main'
+        app.show_screen('main')
 class AlarmTimePickerDialog(BoxLayout):
     """
     Diálogo para configurar alarma con hora específica del día
@@ -1419,6 +1624,8 @@ class AlarmTimePickerDialog(BoxLayout):
         """
         Construye la interfaz del diálogo con time picker
         """
+        from kivymd.uix.textfield import MDTextField
+        
         # Campo de título
         self.title_field = MDTextField(
             hint_text="Título de la alarma (ej: Despertar, Gym, Reunión)",
@@ -0,0 +1,211 @@
+"""
+Módulo de entrega de callbacks al hilo principal
+Los hilos de fondo (planificador, vigilancia de archivos, API de control...)
+encolan callbacks que el Clock de Kivy ejecuta una vez por frame, de modo que
+ningún hilo de fondo ejecuta código de interfaz ni espera a que termine
+"""
+
+import logging
+import itertools
+from collections import deque
+from time import perf_counter
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Política al llenarse la cola: descartar lo más antiguo o rechazar lo nuevo
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+DEFAULT_MAX_PENDING = 256
+DEFAULT_MAX_PER_FRAME = 64
+LATENCY_SAMPLES = 512
+
+def _callback_name(callback: Callable[..., Any]) -> str:
+    """
+    Nombre legible de un callback para los avisos de descarte
+    """
+    return getattr(callback, '__qualname__', None) or repr(callback)
+
+class MainThreadDispatcher:
+    """
+    Cola acotada de callbacks hacia el hilo principal
+
+    submit() no toma cerrojos: solo usa operaciones atómicas bajo el GIL
+    (deque.append, asignación en dict e itertools.count). Los callbacks con la
+    misma clave se fusionan: si hay varios pendientes, solo se ejecuta el último.
+    Los contadores escritos desde varios hilos son aproximados
+
+    Los callbacks con clave van en una cola propia que nunca descarta: el
+    último envío de cada clave lleva el estado y su número está acotado por el
+    conjunto de claves. max_pending y la política de desbordamiento solo se
+    aplican a los callbacks sin clave. El orden global se conserva con el
+    número de secuencia de cada envío
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING, overflow: str = "drop_oldest",
+                 max_per_frame: int = DEFAULT_MAX_PER_FRAME):
+        """
+        Inicializa el despachador
+
+        Args:
+            max_pending: Callbacks sin clave pendientes como máximo
+            overflow: Política al llenarse la cola (OVERFLOW_POLICIES)
+            max_per_frame: Callbacks ejecutados como máximo por frame; el resto
+                espera al siguiente para no alargar el frame
+
+        Raises:
+            ValueError: Si la política no existe
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de desbordamiento desconocida: {overflow}")
+
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.max_per_frame = max_per_frame
+
+        # Con drop_oldest la propia deque descarta el elemento más antiguo al llenarse
+        self._unkeyed = deque(maxlen=max_pending if overflow == "drop_oldest" else None)
+        self._keyed = deque()  # Solo la vacía drain; los envíos obsoletos se saltan allí
+        self._latest: Dict[Hashable, int] = {}  # Clave -> secuencia del último envío
+        self._sequence = itertools.count()
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._clock_event = None
+
+        self.submitted = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.errors = 0
+        self.max_depth = 0
+
+    def submit(self, callback: Callable[..., Any], *args, key: Optional[Hashable] = None) -> bool:
+        """
+        Encola un callback para el hilo principal (seguro desde cualquier hilo)
+
+        Args:
+            callback: Función a ejecutar
+            *args: Argumentos del callback
+            key: Clave de fusión; de los pendientes con la misma clave solo se
+                ejecuta el último. Debe salir de un conjunto acotado (IDs, nombres)
+
+        Returns:
+            False si el callback no tiene clave, la cola estaba llena y la
+            política es drop_newest
+        """
+        entry = (next(self._sequence), key, callback, args, perf_counter())
+        if key is not None:
+            self._latest[key] = entry[0]
+            self._keyed.append(entry)
+        else:
+            if len(self._unkeyed) >= self.max_pending:
+                self.dropped += 1
+                if self.overflow == "drop_newest":
+                    logger.warning(f"Cola del hilo principal llena: se rechaza {_callback_name(callback)}")
+                    return False
+                try:
+                    evicted = self._unkeyed[0][2]
+                    logger.warning(f"Cola del hilo principal llena: se descarta {_callback_name(evicted)}")
+                except IndexError:
+                    pass
+            self._unkeyed.append(entry)
+
+        self.submitted += 1
+        depth = len(self._keyed) + len(self._unkeyed)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _pop_next(self):
+        """
+        Saca el envío más antiguo de las dos colas (solo desde drain)
+
+        Returns:
+            Tupla del envío o None si no hay pendientes
+        """
+        keyed = self._keyed[0] if self._keyed else None
+        unkeyed = self._unkeyed[0] if self._unkeyed else None
+        if keyed is None and unkeyed is None:
+            return None
+        if unkeyed is None or (keyed is not None and keyed[0] < unkeyed[0]):
+            return self._keyed.popleft()
+        # Con drop_oldest un envío concurrente puede haber desplazado la cabeza,
+        # pero la cola nunca queda vacía por ello
+        return self._unkeyed.popleft()
+
+    def drain(self, dt: float = 0) -> int:
+        """
+        Ejecuta los callbacks pendientes (llamar solo desde el hilo principal)
+
+        Args:
+            dt: Tiempo desde el frame anterior (firma de Clock)
+
+        Returns:
+            Número de callbacks ejecutados
+        """
+        executed = 0
+        while executed < self.max_per_frame:
+            entry = self._pop_next()
+            if entry is None:
+                break
+            sequence, key, callback, args, enqueued_at = entry
+
+            if key is not None and self._latest.get(key) != sequence:
+                # Hay un envío más reciente con la misma clave
+                self.coalesced += 1
+                continue
+
+            self._latencies.append(perf_counter() - enqueued_at)
+            executed += 1
+            try:
+                callback(*args)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error en callback del hilo principal: {e}")
+
+        self.executed += executed
+        return executed
+
+    def start(self):
+        """
+        Programa el vaciado de la cola en cada frame del Clock de Kivy
+        """
+        if self._clock_event is None:
+            from kivy.clock import Clock
+            self._clock_event = Clock.schedule_interval(self.drain, 0)
+
+    def stop(self):
+        """
+        Deja de vaciar la cola
+        """
+        if self._clock_event is not None:
+            self._clock_event.cancel()
+            self._clock_event = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene los contadores de la cola
+
+        Returns:
+            Diccionario con profundidad actual y máxima, envíos, descartes,
+            fusiones, ejecuciones, errores y latencias de entrega (ms) de las
+            últimas LATENCY_SAMPLES ejecuciones
+        """
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        return {
+            'depth': len(self._keyed) + len(self._unkeyed),
+            'max_depth': self.max_depth,
+            'submitted': self.submitted,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'executed': self.executed,
+            'errors': self.errors,
+            'latency_p50_ms': percentile(0.50),
+            'latency_p99_ms': percentile(0.99),
+            'latency_max_ms': latencies[-1] * 1000 if latencies else None
+        }
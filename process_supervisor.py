@@ -0,0 +1,206 @@
+"""
+Módulo de supervisión de procesos hijos
+Lanza procesos desacoplados sin shell y los recoge en segundo plano
+"""
+
+import time
+import logging
+import platform
+import subprocess
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+class LaunchRecord:
+    """
+    Registro de un proceso lanzado
+    """
+
+    def __init__(self, argv: List[str], tag: Union[str, List[str]] = None):
+        """
+        Inicializa el registro
+
+        Args:
+            argv: Comando lanzado
+            tag: Etiqueta asociada (por ejemplo, el ID de la alarma) o lista de
+                etiquetas si el proceso atiende a varias alarmas
+        """
+        self.argv = list(argv)
+        self.tags = list(tag) if isinstance(tag, (list, tuple)) else ([tag] if tag is not None else [])
+        self.tag = self.tags[0] if self.tags else None
+        self.pid = None
+        self.process = None
+        self.started_at = time.time()
+        self.launch_latency = None  # Segundos hasta que Popen retorna
+        self.exit_status = None
+        self.ended_at = None
+        self.error = None
+
+    @property
+    def is_running(self) -> bool:
+        """Indica si el proceso sigue en ejecución"""
+        return self.process is not None and self.exit_status is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte el registro a diccionario
+
+        Returns:
+            Diccionario con los datos del lanzamiento
+        """
+        return {
+            'argv': self.argv,
+            'tag': self.tag,
+            'tags': self.tags,
+            'pid': self.pid,
+            'started_at': self.started_at,
+            'launch_latency_ms': None if self.launch_latency is None else self.launch_latency * 1000,
+            'exit_status': self.exit_status,
+            'ended_at': self.ended_at,
+            'error': self.error
+        }
+
+class ProcessSupervisor:
+    """
+    Supervisor de procesos lanzados por la aplicación
+    """
+
+    def __init__(self, reap_interval: float = 0.5, history_size: int = 200):
+        """
+        Inicializa el supervisor
+
+        Args:
+            reap_interval: Segundos entre comprobaciones de procesos terminados
+            history_size: Número de lanzamientos terminados a conservar
+        """
+        self.reap_interval = reap_interval
+        self.running: Dict[int, LaunchRecord] = {}
+        self.history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def spawn(self, argv: List[str], tag: Union[str, List[str]] = None) -> Optional[LaunchRecord]:
+        """
+        Lanza un proceso desacoplado sin esperar a que termine
+
+        Args:
+            argv: Comando y argumentos (no se usa shell)
+            tag: Etiqueta del lanzamiento o lista de etiquetas
+
+        Returns:
+            Registro del lanzamiento o None si falló
+        """
+        record = LaunchRecord(argv, tag)
+        kwargs = {
+            'stdin': subprocess.DEVNULL,
+            'stdout': subprocess.DEVNULL,
+            'stderr': subprocess.DEVNULL,
+            'close_fds': True
+        }
+
+        if platform.system() == "Windows":
+            kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True
+
+        start = time.perf_counter()
+        try:
+            record.process = subprocess.Popen(record.argv, **kwargs)
+        except Exception as e:
+            record.launch_latency = time.perf_counter() - start
+            record.error = str(e)
+            record.ended_at = time.time()
+            with self._lock:
+                self.history.append(record)
+            logger.error(f"Error lanzando {argv[0]}: {e}")
+            return None
+
+        record.launch_latency = time.perf_counter() - start
+        record.pid = record.process.pid
+
+        with self._lock:
+            self.running[record.pid] = record
+            self._ensure_reaper()
+
+        logger.info(f"Proceso lanzado: {argv[0]} (pid {record.pid}, {record.launch_latency * 1000:.1f} ms)")
+        return record
+
+    def _ensure_reaper(self):
+        """
+        Arranca el hilo recolector si no está activo (llamar con el bloqueo tomado)
+        """
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        """
+        Recoge procesos terminados hasta que no quede ninguno en ejecución
+        """
+        while True:
+            with self._lock:
+                for pid, record in list(self.running.items()):
+                    exit_status = record.process.poll()
+                    if exit_status is not None:
+                        record.exit_status = exit_status
+                        record.ended_at = time.time()
+                        self.history.append(self.running.pop(pid))
+
+                if not self.running:
+                    self._reaper = None
+                    return
+
+            time.sleep(self.reap_interval)
+
+    def get_records(self, tag: str = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los registros de lanzamiento
+
+        Args:
+            tag: Filtrar por etiqueta (basta con que sea una de las del registro)
+
+        Returns:
+            Lista de registros, del más antiguo al más reciente
+        """
+        with self._lock:
+            records = list(self.history) + list(self.running.values())
+
+        records.sort(key=lambda record: record.started_at)
+        return [record.to_dict() for record in records if tag is None or tag in record.tags]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de lanzamiento
+
+        Returns:
+            Diccionario con contadores y latencias
+        """
+        records = self.get_records()
+        latencies = [r['launch_latency_ms'] for r in records if r['launch_latency_ms'] is not None]
+
+        return {
+            'launches': len(records),
+            'running': sum(1 for r in records if r['exit_status'] is None and r['error'] is None),
+            'failed': sum(1 for r in records if r['error'] or r['exit_status'] not in (None, 0)),
+            'avg_launch_latency_ms': sum(latencies) / len(latencies) if latencies else None,
+            'max_launch_latency_ms': max(latencies) if latencies else None
+        }
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+def get_supervisor() -> ProcessSupervisor:
+    """
+    Obtiene el supervisor de procesos compartido
+
+    Returns:
+        Instancia compartida de ProcessSupervisor
+    """
+    global _supervisor
+
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = ProcessSupervisor()
+        return _supervisor
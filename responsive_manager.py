@@ -4,44 +4,242 @@ Adapta la interfaz de usuario según el dispositivo
 """
 
 import logging
-from typing import Dict, Any, Tuple
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Tuple, Callable, List, NamedTuple
+from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.core.window import Window
 from kivy.uix.screenmanager import ScreenManager
 
 logger = logging.getLogger(__name__)
 
+# Espera tras el último evento de redimensionado antes de recalcular
+RESIZE_DEBOUNCE = 0.15
+
+BASE_LAYOUT_SIZES = {
+    'small': {
+        'toolbar_height': 56,
+        'card_height': 100,
+        'list_item_height': 56,
+        'button_height': 40,
+        'text_field_height': 44,
+        'max_content_width': 320
+    },
+    'medium': {
+        'toolbar_height': 64,
+        'card_height': 120,
+        'list_item_height': 64,
+        'button_height': 48,
+        'text_field_height': 56,
+        'max_content_width': 400
+    },
+    'large': {
+        'toolbar_height': 72,
+        'card_height': 140,
+        'list_item_height': 72,
+        'button_height': 56,
+        'text_field_height': 64,
+        'max_content_width': 480
+    },
+    'xlarge': {
+        'toolbar_height': 80,
+        'card_height': 160,
+        'list_item_height': 80,
+        'button_height': 64,
+        'text_field_height': 72,
+        'max_content_width': 600
+    }
+}
+
+FONT_SIZES = {
+    'small': {
+        'tiny': 10,
+        'small': 12,
+        'medium': 14,
+        'large': 16,
+        'title': 18,
+        'heading': 20,
+        'display': 24
+    },
+    'medium': {
+        'tiny': 11,
+        'small': 13,
+        'medium': 15,
+        'large': 17,
+        'title': 19,
+        'heading': 21,
+        'display': 26
+    },
+    'large': {
+        'tiny': 12,
+        'small': 14,
+        'medium': 16,
+        'large': 18,
+        'title': 20,
+        'heading': 22,
+        'display': 28
+    },
+    'xlarge': {
+        'tiny': 13,
+        'small': 15,
+        'medium': 17,
+        'large': 19,
+        'title': 21,
+        'heading': 23,
+        'display': 30
+    }
+}
+
+BASE_SPACING = {
+    'small': 8,
+    'medium': 12,
+    'large': 16,
+    'xlarge': 20
+}
+
+# Multiplicador de cada valor de espaciado sobre BASE_SPACING
+SPACING_STEPS = {
+    'tiny': 0.5,
+    'small': 1,
+    'medium': 1.5,
+    'large': 2,
+    'xlarge': 3
+}
+
+# Espaciado usado como padding (horizontal, vertical) por categoría
+PADDING_STEPS = {
+    'small': ('small', 'tiny'),
+    'medium': ('medium', 'small'),
+    'large': ('large', 'medium'),
+    'xlarge': ('xlarge', 'large')
+}
+
+VALUE_MULTIPLIERS = {
+    'small': 0.8,
+    'medium': 1.0,
+    'large': 1.2,
+    'xlarge': 1.4
+}
+
+class LayoutTables(NamedTuple):
+    """
+    Tablas de diseño de una combinación de pantalla; son compartidas, así que
+    no deben modificarse
+    """
+    layout_sizes: Dict[str, int]
+    font_sizes: Dict[str, float]
+    spacing_values: Dict[str, int]
+    padding: Tuple[int, int]
+
+@lru_cache(maxsize=None)
+def layout_tables(size_category: str, density: float, orientation: str) -> LayoutTables:
+    """
+    Calcula las tablas de diseño; se memorizan por combinación, así que todas
+    las pantallas comparten los mismos objetos
+
+    Args:
+        size_category: Categoría del tamaño ('small', 'medium', 'large', 'xlarge')
+        density: Densidad de pantalla (dpi / 160)
+        orientation: 'portrait' o 'landscape'
+
+    Returns:
+        Tablas de tamaños, fuentes, espaciado y padding
+    """
+    layout_sizes = {k: int(v * density) for k, v in BASE_LAYOUT_SIZES[size_category].items()}
+
+    base_spacing = BASE_SPACING[size_category]
+    spacing_values = {k: int(base_spacing * step * density) for k, step in SPACING_STEPS.items()}
+
+    h_step, v_step = PADDING_STEPS[size_category]
+
+    return LayoutTables(
+        layout_sizes=layout_sizes,
+        font_sizes=dict(FONT_SIZES[size_category]),
+        spacing_values=spacing_values,
+        padding=(spacing_values[h_step], spacing_values[v_step])
+    )
+
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+def get_responsive_manager() -> 'ResponsiveManager':
+    """
+    Obtiene el gestor responsive compartido por todas las pantallas; la primera
+    llamada lo enlaza a los redimensionados de la ventana
+
+    Returns:
+        Instancia compartida de ResponsiveManager
+    """
+    global _shared_manager
+
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = ResponsiveManager()
+            Window.bind(on_resize=_shared_manager.on_window_resize)
+        return _shared_manager
+
 class ResponsiveManager:
     """
     Gestor de diseño responsive para la aplicación
     """
     
-    def __init__(self):
-        """Inicializa el gestor responsive"""
+    def __init__(self, resize_debounce: float = RESIZE_DEBOUNCE):
+        """
+        Inicializa el gestor responsive
+        
+        Args:
+            resize_debounce: Segundos sin redimensionados antes de recalcular
+        """
+        self.listeners: List[Callable[['ResponsiveManager'], None]] = []
+        self._pending_size = None
+        self._resize_trigger = Clock.create_trigger(self._apply_pending_resize, resize_debounce)
+        
         self.screen_info = self._get_screen_info()
-        self.layout_sizes = self._calculate_layout_sizes()
-        self.font_sizes = self._calculate_font_sizes()
-        self.spacing_values = self._calculate_spacing()
+        self.layout_key = self._layout_key(self.screen_info)
+        self._load_tables()
     
-    def _get_screen_info(self) -> Dict[str, Any]:
+    def _get_screen_info(self, width: int = None, height: int = None) -> Dict[str, Any]:
         """
-        Obtiene información de la pantalla actual
+        Obtiene información de la pantalla
+        
+        Args:
+            width: Ancho de pantalla (por defecto el de la ventana)
+            height: Alto de pantalla (por defecto el de la ventana)
         
         Returns:
             Diccionario con información de pantalla
         """
-        width, height = Window.size
+        if width is None or height is None:
+            width, height = Window.size
         density = Window.dpi / 160 if hasattr(Window, 'dpi') else 1
         
         return {
             'width': width,
             'height': height,
-            'density': density,
+            'density': round(density, 2),
             'aspect_ratio': width / height if height > 0 else 1,
             'is_landscape': width > height,
             'size_category': self._categorize_screen_size(width, height)
         }
     
+    def _layout_key(self, screen_info: Dict[str, Any]) -> Tuple[str, float, str]:
+        """
+        Clave de las tablas de diseño: (categoría, densidad, orientación)
+        """
+        orientation = 'landscape' if screen_info['is_landscape'] else 'portrait'
+        return (screen_info['size_category'], screen_info['density'], orientation)
+    
+    def _load_tables(self):
+        """
+        Toma las tablas memorizadas de la clave actual
+        """
+        tables = layout_tables(*self.layout_key)
+        self.layout_sizes = tables.layout_sizes
+        self.font_sizes = tables.font_sizes
+        self.spacing_values = tables.spacing_values
+        self.padding = tables.padding
+    
     def _categorize_screen_size(self, width: int, height: int) -> str:
         """
         Categoriza el tamaño de pantalla
@@ -64,131 +262,6 @@ class ResponsiveManager:
         else:
             return 'xlarge'
     
-    def _calculate_layout_sizes(self) -> Dict[str, int]:
-        """
-        Calcula tamaños de layout según la pantalla
-        
-        Returns:
-            Diccionario con tamaños de layout
-        """
-        size_cat = self.screen_info['size_category']
-        density = self.screen_info['density']
-        
-        base_sizes = {
-            'small': {
-                'toolbar_height': 56,
-                'card_height': 100,
-                'list_item_height': 56,
-                'button_height': 40,
-                'text_field_height': 44,
-                'max_content_width': 320
-            },
-            'medium': {
-                'toolbar_height': 64,
-                'card_height': 120,
-                'list_item_height': 64,
-                'button_height': 48,
-                'text_field_height': 56,
-                'max_content_width': 400
-            },
-            'large': {
-                'toolbar_height': 72,
-                'card_height': 140,
-                'list_item_height': 72,
-                'button_height': 56,
-                'text_field_height': 64,
-                'max_content_width': 480
-            },
-            'xlarge': {
-                'toolbar_height': 80,
-                'card_height': 160,
-                'list_item_height': 80,
-                'button_height': 64,
-                'text_field_height': 72,
-                'max_content_width': 600
-            }
-        }
-        
-        # Aplicar densidad
-        base = base_sizes[size_cat]
-        return {k: int(v * density) for k, v in base.items()}
-    
-    def _calculate_font_sizes(self) -> Dict[str, float]:
-        """
-        Calcula tamaños de fuente según la pantalla
-        
-        Returns:
-            Diccionario con tamaños de fuente
-        """
-        size_cat = self.screen_info['size_category']
-        
-        font_sizes = {
-            'small': {
-                'tiny': 10,
-                'small': 12,
-                'medium': 14,
-                'large': 16,
-                'title': 18,
-                'heading': 20,
-                'display': 24
-            },
-            'medium': {
-                'tiny': 11,
-                'small': 13,
-                'medium': 15,
-                'large': 17,
-                'title': 19,
-                'heading': 21,
-                'display': 26
-            },
-            'large': {
-                'tiny': 12,
-                'small': 14,
-                'medium': 16,
-                'large': 18,
-                'title': 20,
-                'heading': 22,
-                'display': 28
-            },
-            'xlarge': {
-                'tiny': 13,
-                'small': 15,
-                'medium': 17,
-                'large': 19,
-                'title': 21,
-                'heading': 23,
-                'display': 30
-            }
-        }
-        
-        return font_sizes[size_cat]
-    
-    def _calculate_spacing(self) -> Dict[str, int]:
-        """
-        Calcula valores de espaciado según la pantalla
-        
-        Returns:
-            Diccionario con valores de espaciado
-        """
-        size_cat = self.screen_info['size_category']
-        density = self.screen_info['density']
-        
-        spacing = {
-            'small': 8,
-            'medium': 12,
-            'large': 16,
-            'xlarge': 20
-        }
-        
-        base_spacing = spacing[size_cat]
-        return {
-            'tiny': int(base_spacing * 0.5 * density),
-            'small': int(base_spacing * density),
-            'medium': int(base_spacing * 1.5 * density),
-            'large': int(base_spacing * 2 * density),
-            'xlarge': int(base_spacing * 3 * density)
-        }
-    
     def get_responsive_value(self, category: str, base_value: float) -> float:
         """
         Obtiene un valor responsive basado en la categoría y valor base
@@ -200,16 +273,7 @@ class ResponsiveManager:
         Returns:
             Valor ajustado según el tamaño de pantalla
         """
-        screen_cat = self.screen_info['size_category']
-        
-        multipliers = {
-            'small': 0.8,
-            'medium': 1.0,
-            'large': 1.2,
-            'xlarge': 1.4
-        }
-        
-        multiplier = multipliers.get(screen_cat, 1.0)
+        multiplier = VALUE_MULTIPLIERS.get(self.screen_info['size_category'], 1.0)
         return base_value * multiplier
     
     def adapt_widget_size(self, widget, widget_type: str):
@@ -265,25 +329,7 @@ class ResponsiveManager:
         Returns:
             Tuple con padding horizontal y vertical
         """
-        spacing = self.spacing_values
-        
-        # Determinar spacing apropiado
-        screen_cat = self.screen_info['size_category']
-        
-        if screen_cat == 'small':
-            h_padding = spacing['small']
-            v_padding = spacing['tiny']
-        elif screen_cat == 'medium':
-            h_padding = spacing['medium']
-            v_padding = spacing['small']
-        elif screen_cat == 'large':
-            h_padding = spacing['large']
-            v_padding = spacing['medium']
-        else:  # xlarge
-            h_padding = spacing['xlarge']
-            v_padding = spacing['large']
-        
-        return (h_padding, v_padding)
+        return self.padding
     
     def should_show_compact_view(self) -> bool:
         """
@@ -339,22 +385,73 @@ class ResponsiveManager:
         except Exception as e:
             logger.error(f"Error adaptando layout de pantallas: {e}")
     
+    def add_listener(self, listener: Callable[['ResponsiveManager'], None]):
+        """
+        Registra un oyente de cambios de diseño
+        
+        Args:
+            listener: Función que recibe el gestor cuando cambia la categoría,
+                la densidad o la orientación (no en cada redimensionado)
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[['ResponsiveManager'], None]):
+        """
+        Elimina un oyente de cambios de diseño
+        
+        Args:
+            listener: Función registrada con add_listener
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
     def on_window_resize(self, window, width, height):
         """
-        Callback para redimensionamiento de ventana
+        Callback para redimensionamiento de ventana; durante un arrastre solo
+        se recalcula tras RESIZE_DEBOUNCE segundos sin nuevos eventos
         
         Args:
             window: Ventana redimensionada
             width: Nuevo ancho
             height: Nuevo alto
         """
-        # Actualizar información de pantalla
-        self.screen_info = self._get_screen_info()
-        self.layout_sizes = self._calculate_layout_sizes()
-        self.font_sizes = self._calculate_font_sizes()
-        self.spacing_values = self._calculate_spacing()
+        self._pending_size = (width, height)
+        self._resize_trigger.cancel()
+        self._resize_trigger()
+    
+    def _apply_pending_resize(self, dt):
+        if self._pending_size:
+            width, height = self._pending_size
+            self._pending_size = None
+            self.update_screen(width, height)
+    
+    def update_screen(self, width: int, height: int) -> bool:
+        """
+        Actualiza el tamaño de pantalla y avisa a los oyentes si cambia la clave de diseño
+        
+        Args:
+            width: Nuevo ancho
+            height: Nuevo alto
         
-        logger.info(f"Pantalla redimensionada a {width}x{height}")
+        Returns:
+            True si cambiaron las tablas de diseño
+        """
+        self.screen_info = self._get_screen_info(width, height)
+        layout_key = self._layout_key(self.screen_info)
+        if layout_key == self.layout_key:
+            return False
+        
+        self.layout_key = layout_key
+        self._load_tables()
+        logger.info(f"Pantalla redimensionada a {width}x{height}: diseño {'/'.join(map(str, layout_key))}")
+        
+        for listener in list(self.listeners):
+            try:
+                listener(self)
+            except Exception as e:
+                logger.error(f"Error notificando cambio de diseño: {e}")
+        return True
     
     def create_responsive_card(self, content_widget, card_style: str = 'default'):
         """
@@ -477,7 +574,14 @@ class AdaptiveScreen:
     """
     
     def __init__(self):
-        self.responsive_manager = ResponsiveManager()
+        self.responsive_manager = get_responsive_manager()
+        self.responsive_manager.add_listener(self._on_layout_changed)
+    
+    def _on_layout_changed(self, responsive_manager):
+        """
+        Vuelve a adaptar la pantalla cuando cambia la categoría de diseño
+        """
+        self.adaptive_layout()
     
     def adaptive_layout(self):
         """
@@ -0,0 +1,269 @@
+"""
+Módulo de biblioteca de sonidos
+Mantiene un índice persistente de los archivos de sonido (nombre → ruta y
+metadatos) que se refresca por directorio solo cuando cambia su mtime
+"""
+
+import os
+import json
+import wave
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from file_store import atomic_write
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+# Orden de preferencia si un mismo nombre existe en varios formatos
+SOUND_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.m4a')
+
+# Nombres de la configuración que apuntan a archivos con otro nombre
+BUILTIN_ALIASES = {
+    "default": "default_alarm",
+    "gentle": "gentle_chime",
+    "energetic": "energetic_beep",
+    "nature": "nature_sounds"
+}
+
+def probe_sound_file(file_path: str) -> Dict[str, Any]:
+    """
+    Obtiene los metadatos de un archivo de sonido
+    La duración y la frecuencia solo se leen de los WAV (módulo wave);
+    para los formatos comprimidos quedan en None
+
+    Args:
+        file_path: Ruta del archivo
+
+    Returns:
+        Diccionario con path, format, duration, sample_rate, channels, size y mtime_ns
+    """
+    stat = os.stat(file_path)
+    extension = os.path.splitext(file_path)[1].lower()
+    info = {
+        'path': file_path,
+        'format': extension[1:],
+        'duration': None,
+        'sample_rate': None,
+        'channels': None,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+    if extension == '.wav':
+        try:
+            with wave.open(file_path, 'rb') as wav:
+                info['sample_rate'] = wav.getframerate()
+                info['channels'] = wav.getnchannels()
+                info['duration'] = wav.getnframes() / wav.getframerate() if wav.getframerate() else None
+        except Exception as e:
+            logger.warning(f"No se pudieron leer los metadatos de {file_path}: {e}")
+
+    return info
+
+def _extension_rank(info: Dict[str, Any]) -> int:
+    """Posición del formato en el orden de preferencia"""
+    return SOUND_EXTENSIONS.index('.' + info['format'])
+
+class SoundLibrary:
+    """
+    Índice de sonidos disponible en uno o varios directorios
+    """
+
+    def __init__(self, sound_dirs: List[str], index_file: str):
+        """
+        Inicializa la biblioteca y carga el índice guardado
+
+        Args:
+            sound_dirs: Directorios de sonidos, de mayor a menor prioridad
+            index_file: Archivo JSON donde se persiste el índice
+        """
+        self.sound_dirs = [os.path.abspath(d) for d in sound_dirs]
+        self.index_file = index_file
+        self.directories: Dict[str, Dict[str, Any]] = {}  # dir -> {mtime_ns, files}
+        self.rescans = 0
+        self._names: Dict[str, Dict[str, Any]] = {}
+        self._resolved: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """
+        Carga el índice desde disco (si no existe o es inválido se empieza vacío)
+        """
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.directories = {d: data['directories'][d] for d in self.sound_dirs
+                                    if d in data.get('directories', {})}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error cargando índice de sonidos: {e}")
+        self._rebuild()
+
+    def save(self):
+        """
+        Guarda el índice de forma atómica
+        """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_file)), exist_ok=True)
+            atomic_write(self.index_file, json.dumps({
+                'version': INDEX_VERSION,
+                'directories': self.directories
+            }, indent=2, ensure_ascii=False))
+        except Exception as e:
+            logger.error(f"Error guardando índice de sonidos: {e}")
+
+    def refresh(self) -> bool:
+        """
+        Vuelve a listar solo los directorios cuyo mtime cambió
+        Los archivos que conservan tamaño y mtime reutilizan sus metadatos
+
+        Returns:
+            True si el índice cambió
+        """
+        with self._lock:
+            changed = False
+
+            for sound_dir in self.sound_dirs:
+                try:
+                    mtime_ns = os.stat(sound_dir).st_mtime_ns
+                except FileNotFoundError:
+                    if self.directories.pop(sound_dir, None) is not None:
+                        changed = True
+                    continue
+
+                cached = self.directories.get(sound_dir)
+                if cached and cached['mtime_ns'] == mtime_ns:
+                    continue
+
+                self.directories[sound_dir] = {
+                    'mtime_ns': mtime_ns,
+                    'files': self._scan_directory(sound_dir, cached['files'] if cached else {})
+                }
+                self.rescans += 1
+                changed = True
+
+            if changed:
+                self._rebuild()
+                self.save()
+
+            return changed
+
+    def _scan_directory(self, sound_dir: str, previous: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Lista un directorio de sonidos
+
+        Args:
+            sound_dir: Directorio
+            previous: Entradas anteriores del directorio por nombre de archivo
+
+        Returns:
+            Entradas por nombre de archivo
+        """
+        files = {}
+
+        for entry in os.scandir(sound_dir):
+            if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in SOUND_EXTENSIONS:
+                continue
+
+            stat = entry.stat()
+            old = previous.get(entry.name)
+            if old and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                files[entry.name] = old
+            else:
+                try:
+                    files[entry.name] = probe_sound_file(entry.path)
+                except OSError as e:
+                    logger.warning(f"Error indexando {entry.path}: {e}")
+
+        return files
+
+    def _rebuild(self):
+        """
+        Reconstruye las tablas de resolución nombre → ruta, incluidos los alias
+        """
+        names = {}
+
+        # Los directorios prioritarios se aplican al final para que ganen
+        for sound_dir in reversed(self.sound_dirs):
+            files = self.directories.get(sound_dir, {}).get('files', {})
+            local = {}
+            for file_name, info in files.items():
+                name = os.path.splitext(file_name)[0]
+                if name not in local or _extension_rank(info) < _extension_rank(local[name]):
+                    local[name] = info
+            names.update(local)
+
+        resolved = {name: info['path'] for name, info in names.items()}
+        for alias, target in BUILTIN_ALIASES.items():
+            if alias not in resolved and target in resolved:
+                resolved[alias] = resolved[target]
+
+        self._names = names
+        self._resolved = resolved
+
+    def resolve(self, sound_name: str) -> Optional[str]:
+        """
+        Obtiene la ruta de un sonido por nombre o alias
+
+        Args:
+            sound_name: Nombre del sonido (sin extensión) o alias integrado
+
+        Returns:
+            Ruta del archivo o None si no está indexado
+        """
+        return self._resolved.get(sound_name)
+
+    def get_info(self, sound_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene los metadatos de un sonido
+
+        Args:
+            sound_name: Nombre del sonido o alias
+
+        Returns:
+            Metadatos o None si no está indexado
+        """
+        sound_name = sound_name if sound_name in self._names else BUILTIN_ALIASES.get(sound_name)
+        return self._names.get(sound_name)
+
+    def get_sound_files(self) -> Dict[str, str]:
+        """
+        Obtiene todos los nombres resolubles
+
+        Returns:
+            Diccionario nombre → ruta
+        """
+        return dict(self._resolved)
+
+_libraries: Dict[str, SoundLibrary] = {}
+_libraries_lock = threading.Lock()
+
+def get_sound_library(sound_dir: str = None, index_file: str = None) -> SoundLibrary:
+    """
+    Obtiene la biblioteca compartida para un directorio de sonidos, ya refrescada
+
+    Args:
+        sound_dir: Directorio de sonidos (por defecto sounds/ en el directorio actual)
+        index_file: Archivo del índice (por defecto data/sound_index.json)
+
+    Returns:
+        Instancia compartida de SoundLibrary
+    """
+    sound_dir = os.path.abspath(sound_dir or os.path.join(os.getcwd(), "sounds"))
+
+    with _libraries_lock:
+        library = _libraries.get(sound_dir)
+        if library is None:
+            library = SoundLibrary(
+                [sound_dir],
+                index_file or os.path.join(os.getcwd(), "data", "sound_index.json")
+            )
+            _libraries[sound_dir] = library
+
+    library.refresh()
+    return library
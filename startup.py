@@ -0,0 +1,163 @@
+"""
+Módulo de arranque en paralelo
+Ejecuta las tareas de inicio (configuración, alarmas, sondeo de capacidades...)
+en hilos de fondo, cada una con un futuro con nombre que la interfaz puede
+esperar por widget en lugar de bloquear el hilo principal
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+class StartupCoordinator:
+    """
+    Grafo de tareas de arranque con dependencias y futuros con nombre
+    """
+
+    def __init__(self, max_workers: int = 3, dispatch: Callable[[Callable[[], None]], None] = None):
+        """
+        Inicializa el coordinador
+
+        Args:
+            max_workers: Hilos de fondo para las tareas
+            dispatch: Función que ejecuta un callable en el hilo de la interfaz
+                (por defecto se ejecuta directamente en el hilo que termina la tarea)
+        """
+        self.dispatch = dispatch or (lambda fn: fn())
+        self.futures: Dict[str, Future] = {}
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable[..., Any], depends: Iterable[str] = ()) -> Future:
+        """
+        Lanza una tarea en segundo plano
+
+        La tarea espera a sus dependencias y recibe sus resultados como argumentos,
+        en el mismo orden; si alguna falla, la tarea falla con la misma excepción
+
+        Args:
+            name: Nombre único de la tarea
+            fn: Función a ejecutar
+            depends: Nombres de tareas ya registradas de las que depende
+
+        Returns:
+            Futuro con el resultado de la tarea
+
+        Raises:
+            ValueError: Si el nombre ya existe o una dependencia no está registrada
+        """
+        depends = tuple(depends)
+        with self._lock:
+            if name in self.futures:
+                raise ValueError(f"Tarea de arranque duplicada: {name}")
+            missing = [d for d in depends if d not in self.futures]
+            if missing:
+                raise ValueError(f"Dependencias desconocidas para {name}: {', '.join(missing)}")
+
+            upstream = [self.futures[d] for d in depends]
+            future = self._executor.submit(self._run, name, fn, upstream)
+            self.futures[name] = future
+
+        future.add_done_callback(lambda f: self._log_result(name, f))
+        return future
+
+    def _run(self, name: str, fn: Callable[..., Any], upstream: list) -> Any:
+        """
+        Ejecuta una tarea tras sus dependencias, registrando su duración
+        """
+        args = [f.result() for f in upstream]
+
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[name] = {
+                'seconds': time.perf_counter() - started,
+                'thread': threading.current_thread().name
+            }
+
+    def _log_result(self, name: str, future: Future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Error en tarea de arranque {name}: {error}")
+        elif name in self.timings:
+            logger.info(f"Tarea de arranque {name} lista en {self.timings[name]['seconds'] * 1000:.1f} ms")
+
+    def future(self, name: str) -> Future:
+        """
+        Obtiene el futuro de una tarea
+
+        Args:
+            name: Nombre de la tarea
+
+        Returns:
+            Futuro de la tarea
+
+        Raises:
+            KeyError: Si la tarea no está registrada
+        """
+        return self.futures[name]
+
+    def result(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Espera el resultado de una tarea (bloquea; para código fuera del arranque)
+
+        Args:
+            name: Nombre de la tarea
+            timeout: Segundos máximos de espera
+
+        Returns:
+            Resultado de la tarea
+        """
+        return self.futures[name].result(timeout)
+
+    def ready(self, name: str) -> bool:
+        """
+        Indica si una tarea terminó correctamente
+
+        Args:
+            name: Nombre de la tarea
+
+        Returns:
+            True si hay resultado disponible sin esperar
+        """
+        future = self.futures.get(name)
+        return bool(future and future.done() and not future.cancelled() and future.exception() is None)
+
+    def when_ready(self, name: str, callback: Callable[[Any], None],
+                   on_error: Callable[[BaseException], None] = None):
+        """
+        Ejecuta un callback con el resultado de una tarea cuando esté lista,
+        a través de dispatch (si ya terminó, se programa de inmediato)
+
+        Args:
+            name: Nombre de la tarea
+            callback: Recibe el resultado
+            on_error: Recibe la excepción si la tarea falla
+        """
+        def done(future: Future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                self.dispatch(lambda: callback(future.result()))
+            elif on_error:
+                self.dispatch(lambda: on_error(error))
+
+        self.futures[name].add_done_callback(done)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Detiene el pool; las tareas pendientes que no hayan empezado se cancelan
+
+        Args:
+            wait: Esperar a las tareas en curso
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -25,6 +25,7 @@ try:
     from alarm_manager import AlarmManager, Alarm
     from browser_integration import BrowserIntegration, AudioManager
     from responsive_manager import ResponsiveManager
+    from sound_library import SoundLibrary, probe_sound_file
 except ImportError as e:
     print(f"Error importando módulos: {e}")
     print("Asegúrate de que todos los archivos estén en el directorio correcto")
@@ -556,7 +557,7 @@ class TestAudioManager(unittest.TestCase):
         # Solo verificamos que el método funciona sin errores
         
         try:
-            sound_files = self.audio_manager._scan_sound_files()
+            sound_files = self.audio_manager.sound_files
             self.assertIsInstance(sound_files, dict)
         except Exception as e:
             self.fail(f"Error escaneando archivos de sonido: {e}")
@@ -657,6 +658,75 @@ class TestResponsiveManager(unittest.TestCase):
             
         except Exception as e:
             self.fail(f"Error detectando layout: {e}")
+    
+    def test_layout_tables_are_shared(self):
+        """Prueba que las tablas se memorizan y se comparten entre gestores"""
+        from responsive_manager import layout_tables
+        other = ResponsiveManager()
+        self.assertIs(other.layout_sizes, self.responsive_manager.layout_sizes)
+        self.assertIs(other.font_sizes, self.responsive_manager.font_sizes)
+        
+        tables = layout_tables('small', 1.0, 'portrait')
+        self.assertIs(layout_tables('small', 1.0, 'portrait'), tables)
+        self.assertEqual(tables.layout_sizes['toolbar_height'], 56)
+        self.assertEqual(tables.padding, (8, 4))
+        self.assertEqual(layout_tables('small', 2.0, 'portrait').layout_sizes['toolbar_height'], 112)
+    
+    def test_listeners_only_on_layout_change(self):
+        """Prueba que solo se avisa cuando cambia categoría, densidad u orientación"""
+        self.responsive_manager.update_screen(320, 568)
+        changes = []
+        self.responsive_manager.add_listener(lambda manager: changes.append(manager.layout_key))
+        
+        self.assertFalse(self.responsive_manager.update_screen(330, 570))
+        self.assertEqual(self.responsive_manager.screen_info['width'], 330)
+        self.assertTrue(self.responsive_manager.update_screen(768, 1024))
+        self.assertTrue(self.responsive_manager.update_screen(1024, 768))
+        
+        self.assertEqual([(key[0], key[2]) for key in changes],
+                         [('large', 'portrait'), ('large', 'landscape')])
+        self.assertEqual(self.responsive_manager.get_max_content_width(),
+                         self.responsive_manager.layout_sizes['max_content_width'])
+    
+    def test_resize_is_debounced(self):
+        """Prueba que una ráfaga de redimensionados se aplica una sola vez"""
+        from kivy.clock import Clock
+        manager = ResponsiveManager(resize_debounce=0)
+        manager.update_screen(320, 568)
+        changes = []
+        manager.add_listener(changes.append)
+        
+        for step in range(20):
+            manager.on_window_resize(None, 320 + step * 24, 568 + step * 24)
+        self.assertEqual(changes, [])
+        
+        Clock.tick()
+        self.assertEqual(changes, [manager])
+        self.assertEqual(manager.screen_info['width'], 320 + 19 * 24)
+    
+    def test_adaptive_screens_share_manager(self):
+        """Prueba que las pantallas adaptativas comparten gestor y se readaptan al cambiar"""
+        from responsive_manager import AdaptiveScreen, get_responsive_manager
+        
+        class CountingScreen(AdaptiveScreen):
+            def __init__(self):
+                super().__init__()
+                self.layouts = 0
+            
+            def adaptive_layout(self):
+                self.layouts += 1
+        
+        first, second = CountingScreen(), CountingScreen()
+        manager = get_responsive_manager()
+        self.addCleanup(manager.remove_listener, first._on_layout_changed)
+        self.addCleanup(manager.remove_listener, second._on_layout_changed)
+        self.assertIs(first.responsive_manager, second.responsive_manager)
+        
+        manager.update_screen(320, 568)
+        first.layouts = second.layouts = 0
+        manager.update_screen(1024, 768)
+        manager.update_screen(1030, 770)
+        self.assertEqual((first.layouts, second.layouts), (1, 1))
 
 class TestIntegration(unittest.TestCase):
     """Pruebas de integración entre componentes"""
@@ -978,6 +1048,2423 @@ class TestEdgeCases(unittest.TestCase):
             # Es aceptable que falle con valores extremos
             self.assertIn('memory', str(e).lower() or 'size', str(e).lower())
 
+class TestHotReload(unittest.TestCase):
+    """Pruebas para la vigilancia de archivos y recarga en caliente"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.config_manager = MagicMock()
+        self.config_manager.get.return_value = True
+        
+        self.alarm_manager = AlarmManager(self.config_manager)
+        self.alarm_manager.storage_dir = self.test_dir
+        self.alarm_manager.alarms_file = os.path.join(self.test_dir, "test_alarms.json")
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _write_external(self, alarms_data):
+        """Simula la escritura de otro proceso"""
+        with open(self.alarm_manager.alarms_file, 'w', encoding='utf-8') as f:
+            json.dump(alarms_data, f)
+    
+    def test_merge_last_writer_wins(self):
+        """Prueba que gana la versión más alta al fusionar por ID"""
+        alarm_id = self.alarm_manager.add_alarm({'title': 'Original', 'time': '12:00', 'recurrence': 'daily'})
+        other_id = self.alarm_manager.add_alarm({'title': 'Otra', 'time': '13:00', 'recurrence': 'daily'})
+        
+        with open(self.alarm_manager.alarms_file, 'r', encoding='utf-8') as f:
+            disk_data = json.load(f)
+        
+        disk_data[0]['title'] = 'Editada fuera'
+        disk_data[0]['version'] += 1
+        disk_data[1]['title'] = 'Edición obsoleta'
+        disk_data[1]['version'] -= 1
+        self._write_external(disk_data)
+        
+        affected = self.alarm_manager.reload_alarms()
+        
+        self.assertEqual(affected, [alarm_id])
+        self.assertEqual(self.alarm_manager.get_alarm_by_id(alarm_id).title, 'Editada fuera')
+        self.assertEqual(self.alarm_manager.get_alarm_by_id(other_id).title, 'Otra')
+    
+    def test_external_delete_and_add(self):
+        """Prueba eliminaciones y altas hechas por otro proceso"""
+        alarm_id = self.alarm_manager.add_alarm({'title': 'Borrar', 'time': '12:00', 'recurrence': 'daily'})
+        
+        external = Alarm()
+        external.title = 'Externa'
+        external.time = '07:30'
+        external.recurrence = 'daily'
+        external.version = 1
+        self._write_external([external.to_dict()])
+        
+        affected = self.alarm_manager.reload_alarms()
+        
+        self.assertCountEqual(affected, [alarm_id, external.id])
+        self.assertIsNone(self.alarm_manager.get_alarm_by_id(alarm_id))
+        reloaded = self.alarm_manager.get_alarm_by_id(external.id)
+        self.assertIsNotNone(reloaded.next_trigger)
+    
+    def test_concurrent_adds_survive_merges(self):
+        """Prueba que las altas concurrentes con fusiones desde disco no se pierden"""
+        import threading
+        added_ids = []
+        done = threading.Event()
+        
+        def adder(offset):
+            for index in range(25):
+                minute = offset * 25 + index
+                added_ids.append(self.alarm_manager.add_alarm(
+                    {'title': f'Hilo {minute}', 'time': f'{minute // 60:02d}:{minute % 60:02d}', 'recurrence': 'daily'}))
+        
+        store = self.alarm_manager._get_store()
+        
+        def merger():
+            # Como el vigilante ante un cambio ajeno: releer y fusionar sin parar
+            while not done.is_set():
+                store._seen = None
+                self.alarm_manager.reload_alarms()
+        
+        merge_thread = threading.Thread(target=merger)
+        merge_thread.start()
+        adders = [threading.Thread(target=adder, args=(i,)) for i in range(4)]
+        for thread in adders:
+            thread.start()
+        for thread in adders:
+            thread.join()
+        done.set()
+        merge_thread.join()
+        
+        self.assertEqual(len(added_ids), 100)
+        self.assertNotIn(None, added_ids)
+        self.assertCountEqual([alarm.id for alarm in self.alarm_manager.alarms], added_ids)
+        with open(self.alarm_manager.alarms_file, 'r', encoding='utf-8') as f:
+            self.assertCountEqual([data['id'] for data in json.load(f)], added_ids)
+    
+    def test_save_merges_unseen_external_changes(self):
+        """Prueba que guardar no pisa cambios de otro proceso aún no fusionados"""
+        kept_id = self.alarm_manager.add_alarm({'title': 'Propia', 'time': '06:00', 'recurrence': 'daily'})
+        deleted_id = self.alarm_manager.add_alarm({'title': 'Borrar', 'time': '06:30', 'recurrence': 'daily'})
+        
+        other = AlarmManager(self.config_manager)
+        other.alarms_file = self.alarm_manager.alarms_file
+        other.load_alarms()
+        external_id = other.add_alarm({'title': 'Ajena', 'time': '07:00', 'recurrence': 'daily'})
+        other.update_alarm(kept_id, {'title': 'Editada fuera'})
+        
+        # Sin recargar: la baja y la edición locales se fusionan con lo ajeno
+        added = []
+        self.alarm_manager.add_change_listener(lambda change: added.extend(change['ids']) if change['type'] == 'added' else None)
+        self.alarm_manager.delete_alarm(deleted_id)
+        
+        with open(self.alarm_manager.alarms_file, 'r', encoding='utf-8') as f:
+            disk = {data['id']: data for data in json.load(f)}
+        self.assertCountEqual(disk, [kept_id, external_id])
+        self.assertEqual(disk[kept_id]['title'], 'Editada fuera')
+        self.assertEqual(self.alarm_manager.get_alarm_by_id(kept_id).title, 'Editada fuera')
+        self.assertEqual(added, [external_id])
+    
+    def test_import_survives_merge_with_newer_disk_copy(self):
+        """Prueba que una importación no se revierte al fusionar con disco"""
+        alarm_id = self.alarm_manager.add_alarm({'title': 'Local', 'time': '12:00', 'recurrence': 'daily'})
+        alarm = self.alarm_manager.get_alarm_by_id(alarm_id)
+        
+        exported = alarm.to_dict()
+        exported['title'] = 'Importada'
+        exported['version'] = 0
+        import_file = os.path.join(self.test_dir, "import.json")
+        with open(import_file, 'w', encoding='utf-8') as f:
+            json.dump({'alarms': [exported]}, f)
+        
+        self.assertTrue(self.alarm_manager.import_alarms(import_file, merge=False))
+        self.alarm_manager._get_store()._seen = None
+        self.alarm_manager.reload_alarms()
+        
+        self.assertEqual(self.alarm_manager.get_alarm_by_id(alarm_id).title, 'Importada')
+        self.assertGreater(self.alarm_manager.get_alarm_by_id(alarm_id).version, alarm.version)
+    
+    def test_clear_is_not_undone_by_concurrent_merges(self):
+        """Prueba que vaciar la lista mientras se fusiona desde disco no resucita alarmas"""
+        import threading
+        for minute in range(20):
+            self.alarm_manager.add_alarm({'title': f'Alarma {minute}', 'time': f'06:{minute:02d}', 'recurrence': 'daily'})
+        
+        store = self.alarm_manager._get_store()
+        done = threading.Event()
+        
+        def merger():
+            while not done.is_set():
+                store._seen = None
+                self.alarm_manager.reload_alarms()
+        
+        merge_thread = threading.Thread(target=merger)
+        merge_thread.start()
+        try:
+            self.assertTrue(self.alarm_manager.clear_all_alarms())
+        finally:
+            done.set()
+            merge_thread.join()
+        
+        store._seen = None
+        self.alarm_manager.reload_alarms()
+        self.assertEqual(self.alarm_manager.alarms, [])
+        with open(self.alarm_manager.alarms_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [])
+    
+    def test_watcher_ignores_own_writes(self):
+        """Prueba que el vigilante solo notifica cambios ajenos"""
+        from file_watcher import FileWatcher
+        
+        changes = []
+        path = self.alarm_manager.alarms_file
+        self._write_external([])
+        
+        watcher = FileWatcher(poll_interval=0.05, use_inotify=False)
+        watcher.watch(path, changes.append)
+        
+        # Escritura propia reconocida
+        self._write_external([{'id': 'a'}])
+        watcher.acknowledge(path)
+        watcher._check(os.path.abspath(path))
+        self.assertEqual(changes, [])
+        
+        # Escritura ajena
+        self._write_external([{'id': 'a'}, {'id': 'b'}])
+        watcher._check(os.path.abspath(path))
+        self.assertEqual(changes, [os.path.abspath(path)])
+
+class TestConfigBackups(unittest.TestCase):
+    """Pruebas para los backups direccionados por contenido"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.config_manager = ConfigManager()
+        self.config_manager.config_dir = self.test_dir
+        self.config_manager.config_path = os.path.join(self.test_dir, "test_config.json")
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_identical_backup_is_skipped(self):
+        """Prueba que una configuración sin cambios no genera otro backup"""
+        first = self.config_manager.backup_config()
+        second = self.config_manager.backup_config()
+        
+        self.assertTrue(first)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.config_manager.list_backups()), 1)
+        
+        self.config_manager.set('audio', 'alarm_volume', 'backup-test')
+        third = self.config_manager.backup_config()
+        
+        self.assertNotEqual(first, third)
+        self.assertEqual(len(self.config_manager.list_backups()), 2)
+    
+    def test_restore_backup(self):
+        """Prueba restaurar un backup comprimido y cifrado"""
+        self.config_manager.set('audio', 'alarm_volume', 80)
+        self.config_manager.backup_config()
+        digest = self.config_manager.list_backups()[0]['hash']
+        
+        self.config_manager.set('audio', 'alarm_volume', 10)
+        self.assertTrue(self.config_manager.restore_backup(digest))
+        self.assertEqual(self.config_manager.get('audio', 'alarm_volume'), 80)
+    
+    def test_cleanup_uses_manifest(self):
+        """Prueba que la limpieza conserva los backups más recientes"""
+        for volume in range(5):
+            self.config_manager.set('audio', 'alarm_volume', volume)
+            self.config_manager.backup_config()
+        
+        newest = [entry['hash'] for entry in self.config_manager.list_backups()[:2]]
+        self.config_manager.cleanup_old_backups(keep_count=2)
+        
+        remaining = self.config_manager.list_backups()
+        self.assertEqual([entry['hash'] for entry in remaining], newest)
+        backup_files = [f for f in os.listdir(os.path.join(self.test_dir, "backups")) if f.endswith(".bak")]
+        self.assertEqual(len(backup_files), 2)
+
+class TestFileStore(unittest.TestCase):
+    """Pruebas para el almacenamiento con bloqueo y escritura atómica"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        from file_store import FileStore
+        
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "store.json")
+        self.writer = FileStore(self.path)
+        self.reader = FileStore(self.path)
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_write_merges_changes_from_other_writers(self):
+        """Prueba que la escritura recibe el contenido ajeno si la generación avanzó"""
+        merge = MagicMock(return_value='[1, 2, 3]')
+        self.writer.write('[1]', merge=merge)  # Sin lectura previa no hay nada que comparar
+        merge.assert_not_called()
+        
+        self.reader.read()
+        self.reader.write('[1, 2]', merge=merge)  # Nadie escribió entre medias
+        merge.assert_not_called()
+        
+        self.writer.write('[1, 4]', merge=merge)
+        merge.assert_called_once_with('[1, 2]')
+        self.assertEqual(self.reader.read()[0], '[1, 2, 3]')
+    
+    def test_generation_skips_unchanged_reads(self):
+        """Prueba que un archivo sin cambios no se vuelve a leer"""
+        self.assertEqual(self.writer.write('[1]'), 1)
+        
+        content, changed = self.reader.read()
+        self.assertEqual(content, '[1]')
+        self.assertTrue(changed)
+        
+        content, changed = self.reader.read()
+        self.assertIsNone(content)
+        self.assertFalse(changed)
+        
+        self.assertEqual(self.writer.write('[1, 2]'), 2)
+        content, changed = self.reader.read()
+        self.assertEqual(content, '[1, 2]')
+        self.assertEqual(self.reader.generation, 2)
+    
+    def test_detects_writes_without_lock(self):
+        """Prueba que se detectan ediciones que no usan el bloqueo"""
+        self.writer.write('[]')
+        self.reader.read()
+        
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('["editado a mano"]')
+        
+        content, changed = self.reader.read()
+        self.assertTrue(changed)
+        self.assertEqual(content, '["editado a mano"]')
+    
+    def test_atomic_write_leaves_no_temp_files(self):
+        """Prueba que la escritura atómica no deja archivos temporales"""
+        for i in range(5):
+            self.writer.write(json.dumps(list(range(i))))
+        
+        files = sorted(os.listdir(self.test_dir))
+        self.assertEqual(files, ["store.json", "store.json.lock"])
+        self.assertEqual(self.writer.read_generation(), 5)
+    
+    @unittest.skipIf(sys.platform == 'win32', "Permisos POSIX")
+    def test_atomic_write_preserves_permissions(self):
+        """Prueba que reemplazar un archivo conserva sus permisos"""
+        import stat
+        from file_store import atomic_write
+        
+        atomic_write(self.path, '[]')
+        os.chmod(self.path, 0o644)
+        atomic_write(self.path, '[1]')
+        
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+class TestVideoCatalog(unittest.TestCase):
+    """Pruebas para el catálogo de videos en memoria"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        from video_catalog import VideoCatalog
+        
+        self.test_dir = tempfile.mkdtemp()
+        self.videos_file = os.path.join(self.test_dir, "motivational_videos.json")
+        with open(self.videos_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "default_videos": [{"title": "Uno", "url": "https://www.youtube.com/watch?v=aaa"}],
+                "custom_videos": [],
+                "settings": {"autoplay": False}
+            }, f)
+        
+        self.catalog = VideoCatalog(self.videos_file, flush_delay=60)
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_cached_until_file_changes(self):
+        """Prueba que el archivo solo se relee cuando cambia"""
+        self.assertTrue(self.catalog.refresh())
+        self.assertFalse(self.catalog.refresh())
+        self.assertEqual(len(self.catalog.get_videos()), 1)
+        self.assertFalse(self.catalog.get_settings()['autoplay'])
+        
+        with open(self.videos_file, 'w', encoding='utf-8') as f:
+            json.dump({"default_videos": [], "custom_videos": [
+                {"title": "Dos", "url": "https://youtu.be/bbb"},
+                {"title": "Tres", "url": "https://youtu.be/ccc"}
+            ]}, f)
+        
+        self.assertTrue(self.catalog.refresh())
+        self.assertEqual(len(self.catalog.get_videos()), 2)
+    
+    def test_selection_without_disk_io(self):
+        """Prueba que seleccionar un video no abre archivos"""
+        self.catalog.refresh()
+        
+        with patch('builtins.open', side_effect=AssertionError("acceso a disco")):
+            videos = self.catalog.get_videos()
+            self.assertEqual(videos[0]['title'], 'Uno')
+    
+    def test_add_and_remove_coalesce_writes(self):
+        """Prueba que altas y bajas se agrupan en una sola escritura"""
+        self.assertTrue(self.catalog.add_video({"title": "Nuevo", "url": "https://youtu.be/new"}))
+        self.assertFalse(self.catalog.add_video({"title": "Repetido", "url": "https://youtu.be/new"}))
+        self.assertTrue(self.catalog.add_video({"title": "Otro", "url": "https://youtu.be/other"}))
+        self.assertTrue(self.catalog.remove_video("https://youtu.be/other"))
+        self.assertFalse(self.catalog.remove_video("https://youtu.be/missing"))
+        
+        with open(self.videos_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['custom_videos'], [])
+        
+        self.assertTrue(self.catalog.flush())
+        
+        with open(self.videos_file, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        self.assertEqual([v['url'] for v in saved['custom_videos']], ["https://youtu.be/new"])
+        self.assertFalse(self.catalog.refresh())
+
+class TestCapabilityProbe(unittest.TestCase):
+    """Pruebas para el sondeo de navegadores y reproductores"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.test_dir, "capabilities.json")
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    @patch('browser_integration.platform.system', return_value='Linux')
+    @patch('browser_integration.shutil.which')
+    def test_probe_only_reports_existing_commands(self, mock_which, mock_system):
+        """Prueba que solo se devuelven ejecutables que existen"""
+        from browser_integration import probe_capabilities
+        
+        installed = {'chromium': '/usr/bin/chromium', 'aplay': '/usr/bin/aplay'}
+        mock_which.side_effect = installed.get
+        
+        capabilities = probe_capabilities()
+        
+        self.assertEqual(capabilities['browsers'], {'chrome': ['/usr/bin/chromium']})
+        self.assertEqual(capabilities['players'], {'aplay': '/usr/bin/aplay'})
+    
+    def test_persisted_probe_respects_ttl(self):
+        """Prueba que el sondeo persistido se reutiliza hasta que caduca"""
+        import browser_integration
+        
+        with patch.object(browser_integration, '_capabilities', None), \
+             patch.object(browser_integration, 'probe_capabilities', wraps=browser_integration.probe_capabilities) as probe:
+            browser_integration.load_capabilities(cache_file=self.cache_file)
+            self.assertTrue(os.path.exists(self.cache_file))
+            
+            browser_integration._capabilities = None
+            browser_integration.load_capabilities(cache_file=self.cache_file)
+            self.assertEqual(probe.call_count, 1)
+            
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            cached['probed_at'] -= browser_integration.CAPABILITY_TTL + 1
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(cached, f)
+            
+            browser_integration._capabilities = None
+            browser_integration.load_capabilities(cache_file=self.cache_file)
+            self.assertEqual(probe.call_count, 2)
+    
+    def test_shared_integration_instance(self):
+        """Prueba que el proceso comparte una sola integración"""
+        from browser_integration import get_browser_integration
+        
+        config_manager = MagicMock()
+        self.assertIs(get_browser_integration(config_manager), get_browser_integration(config_manager))
+        self.assertIn('default', get_browser_integration(config_manager).browser_commands)
+
+class TestProcessSupervisor(unittest.TestCase):
+    """Pruebas para el supervisor de procesos lanzados"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        from process_supervisor import ProcessSupervisor
+        self.supervisor = ProcessSupervisor(reap_interval=0.05)
+    
+    def _wait_for_exit(self, tag, timeout=5.0):
+        """Espera a que el proceso con la etiqueta termine"""
+        import time
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            records = self.supervisor.get_records(tag)
+            if records and records[-1]['exit_status'] is not None:
+                return records[-1]
+            time.sleep(0.05)
+        self.fail(f"El proceso {tag} no terminó a tiempo")
+    
+    def test_spawn_returns_without_waiting(self):
+        """Prueba que el lanzamiento no espera a que el proceso termine"""
+        import time
+        start = time.perf_counter()
+        record = self.supervisor.spawn([sys.executable, '-c', 'import time; time.sleep(1)'], tag='slow')
+        elapsed = time.perf_counter() - start
+        
+        self.assertIsNotNone(record)
+        self.assertLess(elapsed, 0.5)
+        self.assertTrue(record.is_running)
+        self.assertIsNotNone(self.supervisor.get_records('slow')[0]['launch_latency_ms'])
+    
+    def test_reaper_records_exit_status(self):
+        """Prueba que el recolector registra el código de salida por etiqueta"""
+        self.supervisor.spawn([sys.executable, '-c', 'import sys; sys.exit(3)'], tag='alarm-1')
+        self.supervisor.spawn([sys.executable, '-c', 'pass'], tag='alarm-2')
+        
+        self.assertEqual(self._wait_for_exit('alarm-1')['exit_status'], 3)
+        self.assertEqual(self._wait_for_exit('alarm-2')['exit_status'], 0)
+        self.assertEqual(self.supervisor.get_stats()['failed'], 1)
+    
+    def test_grouped_launch_is_found_by_every_alarm(self):
+        """Prueba que un lanzamiento agrupado queda registrado para todas sus alarmas"""
+        self.supervisor.spawn([sys.executable, '-c', 'pass'], tag=['alarm-1', 'alarm-2'])
+        
+        record = self._wait_for_exit('alarm-2')
+        self.assertEqual(record['tag'], 'alarm-1')
+        self.assertEqual(record['tags'], ['alarm-1', 'alarm-2'])
+        self.assertEqual(len(self.supervisor.get_records('alarm-1')), 1)
+    
+    def test_missing_command_is_recorded(self):
+        """Prueba que un ejecutable inexistente se registra como fallo"""
+        record = self.supervisor.spawn(['/nonexistent/browser', 'https://example.com'], tag='alarm-3')
+        
+        self.assertIsNone(record)
+        self.assertIsNotNone(self.supervisor.get_records('alarm-3')[0]['error'])
+    
+    @patch('browser_integration.platform.system', return_value='Linux')
+    def test_browser_launch_is_tagged_with_alarm(self, mock_system):
+        """Prueba que la apertura de URL usa el supervisor sin shell"""
+        browser_integration = BrowserIntegration(MagicMock())
+        browser_integration.browser_commands['brave'] = ['brave-browser']
+        browser_integration.supervisor = MagicMock()
+        
+        result = browser_integration.open_url('https://example.com', 'brave', alarm_id='alarm-4')
+        
+        self.assertTrue(result)
+        browser_integration.supervisor.spawn.assert_called_once_with(
+            ['brave-browser', 'https://example.com'], tag='alarm-4')
+
+class TestPrearm(unittest.TestCase):
+    """Pruebas para el pre-armado de alarmas próximas"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        settings = {
+            ('scheduler', 'prearm_seconds'): 30,
+            ('audio', 'alarm_sound'): 'default',
+            ('notifications', 'enabled'): False,
+            ('notifications', 'vibrate'): False
+        }
+        self.config_manager = MagicMock()
+        self.config_manager.get.side_effect = lambda section, key, default=None: settings.get((section, key), default)
+        
+        self.alarm_manager = AlarmManager(self.config_manager)
+        self.alarm_manager.storage_dir = self.test_dir
+        self.alarm_manager.alarms_file = os.path.join(self.test_dir, "test_alarms.json")
+        
+        self.audio_manager = MagicMock()
+        self.audio_manager.prepare_sound.return_value = '/tmp/alarm.wav'
+        self.alarm_manager.set_audio_manager(self.audio_manager)
+        
+        self.browser = MagicMock()
+        self.browser.prepare_launch.return_value = {
+            'url': 'https://www.youtube.com/watch?v=abc&autoplay=1', 'browser': 'default', 'fullscreen': False
+        }
+        patcher = patch('browser_integration.get_browser_integration', return_value=self.browser)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        alarm_time = (datetime.now() + timedelta(minutes=2)).strftime('%H:%M')
+        alarm_id = self.alarm_manager.add_alarm({'title': 'Prearm', 'time': alarm_time, 'recurrence': 'daily'})
+        self.alarm = self.alarm_manager.get_alarm_by_id(alarm_id)
+        self.alarm.is_active = True
+        self.fire_at = self.alarm.get_next_trigger_time()
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _wait_for_sound(self):
+        """Espera a que el hilo de sonido registre la latencia"""
+        import time
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            if self.alarm_manager.get_trigger_stats()['recent'][-1]['sound_latency_ms'] is not None:
+                return
+            time.sleep(0.01)
+    
+    def test_prearm_only_inside_window(self):
+        """Prueba que solo se preparan las alarmas dentro de la ventana"""
+        self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=120))
+        self.assertNotIn(self.alarm.id, self.alarm_manager._prepared)
+        
+        self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=10))
+        prepared = self.alarm_manager._prepared[self.alarm.id]
+        self.assertTrue(prepared['prearmed'])
+        self.assertEqual(prepared['sound_file'], '/tmp/alarm.wav')
+        self.audio_manager.prepare_sound.assert_called_once_with(None, warm=True)
+        
+        # Una segunda vuelta no vuelve a resolver nada
+        self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=9))
+        self.assertEqual(self.browser.prepare_launch.call_count, 1)
+    
+    def test_prearm_prepares_outside_lock_and_caches_fire_time(self):
+        """Prueba que la preparación no bloquea a otros hilos y que la próxima activación no se recalcula cada vuelta"""
+        import threading
+        lock_free = []
+        
+        def prepare_launch(*args):
+            def try_lock():
+                if self.alarm_manager._lock.acquire(timeout=1):
+                    lock_free.append(True)
+                    self.alarm_manager._lock.release()
+            other = threading.Thread(target=try_lock)
+            other.start()
+            other.join()
+            return {'url': 'https://example.com', 'browser': 'default', 'fullscreen': False}
+        
+        self.browser.prepare_launch.side_effect = prepare_launch
+        with patch.object(self.alarm, 'get_next_trigger_time', wraps=self.alarm.get_next_trigger_time) as next_time:
+            for seconds in (120, 90, 60):
+                self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=seconds))
+            self.assertEqual(next_time.call_count, 1)
+            
+            self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=10))
+            self.assertEqual(next_time.call_count, 1)
+            self.assertEqual(lock_free, [True])
+            
+            # Un cambio en la alarma invalida la activación guardada
+            self.alarm.version += 1
+            self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=9))
+            self.assertEqual(next_time.call_count, 2)
+    
+    def test_trigger_uses_prearmed_resources(self):
+        """Prueba que el disparo usa lo preparado y registra la latencia"""
+        self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=10))
+        self.alarm_manager._trigger_alarm(self.alarm)
+        self._wait_for_sound()
+        
+        self.assertEqual(self.browser.prepare_launch.call_count, 1)
+        self.browser.submit_launch.assert_called_once_with(
+            self.browser.prepare_launch.return_value, alarm_id=self.alarm.id, specific=False)
+        self.audio_manager.play_prepared.assert_called_once_with('/tmp/alarm.wav', self.alarm.volume,
+                                                             tag=self.alarm.id, snooze_count=0)
+        self.assertNotIn(self.alarm.id, self.alarm_manager._prepared)
+        
+        stats = self.alarm_manager.get_trigger_stats()
+        self.assertEqual(stats['prearmed']['count'], 1)
+        self.assertEqual(stats['cold']['count'], 0)
+        self.assertIsNotNone(stats['prearmed']['avg_sound_latency_ms'])
+    
+    def test_state_changes_before_side_effects_and_outside_them(self):
+        """Prueba que el estado cambia bajo el bloqueo antes del sonido y que este no lo retiene"""
+        import threading
+        observed = []
+        version = self.alarm.version
+        
+        def play_prepared(*args, **kwargs):
+            def try_lock():
+                if self.alarm_manager._lock.acquire(timeout=1):
+                    observed.append((self.alarm.version, self.alarm.next_trigger))
+                    self.alarm_manager._lock.release()
+            other = threading.Thread(target=try_lock)
+            other.start()
+            other.join()
+        
+        self.audio_manager.play_prepared.side_effect = play_prepared
+        self.alarm_manager._trigger_alarm(self.alarm)
+        
+        expected_next = self.alarm.get_next_trigger_time().isoformat()
+        self.assertEqual(observed, [(version + 1, expected_next)])
+    
+    def test_deleted_alarm_does_not_fire(self):
+        """Prueba que una alarma eliminada antes del disparo no suena"""
+        alarm = self.alarm
+        self.alarm_manager.delete_alarm(alarm.id)
+        self.alarm_manager._trigger_alarm(alarm)
+        self.audio_manager.play_prepared.assert_not_called()
+    
+    def test_stale_preparation_is_discarded(self):
+        """Prueba que una alarma modificada tras el pre-armado se resuelve de nuevo"""
+        self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=10))
+        self.alarm.version += 1
+        self.alarm_manager._trigger_alarm(self.alarm)
+        
+        self.assertEqual(self.browser.prepare_launch.call_count, 2)
+        self.audio_manager.prepare_sound.assert_called_with(None, warm=False)
+        self.assertEqual(self.alarm_manager.get_trigger_stats()['cold']['count'], 1)
+    
+    @patch('browser_integration.platform.system', return_value='Linux')
+    def test_stale_preparation_does_not_consume_random_video(self, mock_system):
+        """Prueba que pre-armar y editar la alarma antes del disparo sortea un solo video"""
+        settings = {('browser', 'coalesce_window'): 0}
+        config_manager = MagicMock()
+        config_manager.get.side_effect = lambda section, key, default=None: settings.get((section, key), default)
+        browser = BrowserIntegration(config_manager)
+        browser.browser_commands['brave'] = ['brave-browser']
+        browser.supervisor = MagicMock()
+        browser.video_catalog = MagicMock()
+        browser.video_catalog.get_videos.return_value = [{'url': 'https://www.youtube.com/watch?v=v1'}]
+        browser.video_catalog.get_settings.return_value = {'autoplay': True, 'fullscreen': False}
+        browser.video_catalog.draw_video.return_value = {'url': 'https://www.youtube.com/watch?v=v1'}
+        self.alarm_manager.set_browser(browser)
+        
+        self.alarm_manager._prearm_upcoming(self.fire_at - timedelta(seconds=10))
+        self.assertIn(self.alarm.id, self.alarm_manager._prepared)
+        self.alarm_manager.update_alarm(self.alarm.id, {'title': 'Editada'})
+        self.alarm_manager._trigger_alarm(self.alarm)
+        
+        browser.video_catalog.draw_video.assert_called_once()
+        browser.supervisor.spawn.assert_called_once_with(
+            ['brave-browser', 'https://www.youtube.com/watch?v=v1&autoplay=1'], tag=self.alarm.id)
+    
+    def test_trigger_callbacks_go_through_dispatcher(self):
+        """Prueba que con dispatcher el disparo solo encola el callback de notificación"""
+        from main_thread import MainThreadDispatcher
+        dispatcher = MainThreadDispatcher()
+        received = []
+        self.alarm_manager.set_callback_dispatcher(dispatcher.submit)
+        self.alarm_manager.set_notification_callback(received.append)
+        
+        self.alarm_manager._trigger_alarm(self.alarm)
+        self.alarm_manager._trigger_alarm(self.alarm)
+        self.assertEqual(received, [])
+        
+        # Dos disparos pendientes de la misma alarma se entregan una vez
+        self.assertEqual(dispatcher.drain(), 1)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['id'], self.alarm.id)
+        self.assertEqual(dispatcher.get_stats()['coalesced'], 1)
+    
+    def test_prepare_sound_warms_page_cache(self):
+        """Prueba que el sonido se resuelve y se precarga en segundo plano"""
+        sound_file = os.path.join(self.test_dir, "beep.wav")
+        with open(sound_file, 'wb') as f:
+            f.write(b'\0' * 4096)
+        
+        audio_manager = AudioManager(self.config_manager)
+        audio_manager.sound_library = SoundLibrary([self.test_dir], os.path.join(self.test_dir, "index.json"))
+        
+        with patch.object(audio_manager, '_has_audio_support', return_value=True), \
+             patch('browser_integration.threading.Thread') as mock_thread:
+            self.assertEqual(audio_manager.prepare_sound('beep'), sound_file)
+            mock_thread.assert_called_once_with(
+                target=audio_manager._warm_page_cache, args=(sound_file,), daemon=True)
+            self.assertIsNone(audio_manager.prepare_sound('missing'))
+
+class TestShuffleBag(unittest.TestCase):
+    """Pruebas para la selección de videos con bolsa barajada"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.urls = [f"https://www.youtube.com/watch?v=v{i}" for i in range(5)]
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _make_bag(self, horizon=0, weights=None):
+        """Crea una bolsa con semilla fija"""
+        import random
+        from video_catalog import ShuffleBag
+        bag = ShuffleBag(horizon=horizon, rng=random.Random(42))
+        bag.sync(weights or {url: 1 for url in self.urls})
+        return bag
+    
+    def test_no_repeat_within_horizon(self):
+        """Prueba que no se repiten videos dentro del horizonte"""
+        bag = self._make_bag(horizon=3)
+        draws = [bag.draw() for _ in range(300)]
+        
+        for i in range(len(draws) - 3):
+            self.assertEqual(len(set(draws[i:i + 4])), 4)
+    
+    def test_weights_are_respected_per_cycle(self):
+        """Prueba que cada ciclo contiene cada video tantas veces como su peso"""
+        bag = self._make_bag(weights={self.urls[0]: 3, self.urls[1]: 1, self.urls[2]: 0})
+        draws = [bag.draw() for _ in range(400)]
+        
+        self.assertEqual(draws.count(self.urls[0]), 300)
+        self.assertEqual(draws.count(self.urls[1]), 100)
+        self.assertNotIn(self.urls[2], draws)
+    
+    def test_incremental_add_and_remove(self):
+        """Prueba que altas y bajas se aplican sin rebarajar la bolsa"""
+        bag = self._make_bag()
+        bag.draw()
+        
+        bag.remove(self.urls[0])
+        bag.add("https://www.youtube.com/watch?v=new", 2)
+        draws = [bag.draw() for _ in range(6)]
+        
+        self.assertNotIn(self.urls[0], draws)
+        self.assertEqual(draws.count("https://www.youtube.com/watch?v=new"), 2)
+    
+    def test_remove_is_lazy_and_compacts(self):
+        """Prueba que las bajas no recorren la bolsa y sus copias nunca se extraen"""
+        urls = [f"https://www.youtube.com/watch?v=w{i}" for i in range(100)]
+        bag = self._make_bag(weights={url: 1 for url in urls})
+        bag.draw()
+        size = len(bag.bag)
+        
+        bag.remove(urls[0])
+        self.assertEqual(len(bag.bag), size)  # Marcada, no borrada
+        for url in urls[1:60]:
+            bag.remove(url)
+        self.assertLess(len(bag.bag), size)  # Compactada al superar la mitad
+        
+        draws = {bag.draw() for _ in range(200)}
+        self.assertEqual(draws, set(urls[60:]))
+    
+    def test_state_resumes_cycle_with_weights(self):
+        """Prueba que el estado guardado reanuda un ciclo con pesos"""
+        from video_catalog import ShuffleBag
+        weights = {self.urls[0]: 3, self.urls[1]: 2, self.urls[2]: 1}
+        state_file = os.path.join(self.test_dir, "bag.json")
+        
+        bag = ShuffleBag(state_file)
+        bag.sync(weights)
+        first = [bag.draw() for _ in range(8)]  # Un ciclo de 6 y 2 del siguiente
+        bag.save()
+        
+        restarted = ShuffleBag(state_file)
+        self.assertTrue(restarted.load())
+        restarted.sync(weights)
+        rest = [restarted.draw() for _ in range(4)]
+        
+        second_cycle = first[6:] + rest
+        self.assertEqual({url: second_cycle.count(url) for url in weights}, weights)
+    
+    def test_restart_after_forced_refill_resumes_exactly(self):
+        """Prueba que un reinicio tras añadir un ciclo por adelantado no pierde ni repite copias"""
+        import random
+        from video_catalog import ShuffleBag
+        weights = {self.urls[0]: 2, self.urls[1]: 1}
+        state_file = os.path.join(self.test_dir, "bag.json")
+        
+        bag = ShuffleBag(state_file, horizon=1, rng=random.Random(42))
+        bag.sync(weights)
+        for _ in range(100):
+            pending, cycle = len(bag.bag), bag.cycle
+            bag.draw()
+            if pending and bag.cycle > cycle:
+                break  # Se añadió un ciclo con copias del anterior aún en la bolsa
+        else:
+            self.fail("No se forzó ningún ciclo adicional")
+        bag.add(self.urls[2])  # Alta a mitad de ciclo
+        weights[self.urls[2]] = 1
+        bag.save()
+        
+        restarted = ShuffleBag(state_file, horizon=1, rng=random.Random())
+        restarted.rng.setstate(bag.rng.getstate())
+        self.assertTrue(restarted.load())
+        restarted.sync(weights)
+        
+        self.assertEqual([restarted.draw() for _ in range(20)], [bag.draw() for _ in range(20)])
+    
+    def test_catalog_bag_survives_restart(self):
+        """Prueba que el estado de la bolsa se conserva entre instancias"""
+        from video_catalog import VideoCatalog
+        
+        videos_file = os.path.join(self.test_dir, "motivational_videos.json")
+        with open(videos_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "default_videos": [{"title": str(i), "url": url} for i, url in enumerate(self.urls)],
+                "custom_videos": [],
+                "settings": {"no_repeat_horizon": 2}
+            }, f)
+        
+        catalog = VideoCatalog(videos_file)
+        first = [catalog.draw_video()['url'] for _ in range(3)]
+        self.assertFalse(os.path.exists(catalog.bag_file))  # Sin escrituras al extraer
+        catalog.flush()
+        with open(catalog.bag_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(set(json.load(f)), {"seed", "cycle", "remaining", "recent"})
+        
+        restarted = VideoCatalog(videos_file)
+        rest = [restarted.draw_video()['url'] for _ in range(2)]
+        
+        # El ciclo continúa: los 5 videos salen una vez cada uno
+        self.assertEqual(sorted(first + rest), sorted(self.urls))
+
+class TestVideoIndex(unittest.TestCase):
+    """Pruebas para el índice y la búsqueda del catálogo de videos"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        from video_catalog import VideoCatalog
+        
+        self.test_dir = tempfile.mkdtemp()
+        self.videos_file = os.path.join(self.test_dir, "motivational_videos.json")
+        with open(self.videos_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "default_videos": [
+                    {"title": "Despierta tu Grandeza - Motivación Diaria", "url": "https://www.youtube.com/watch?v=aaa"},
+                    {"title": "Nunca Te Rindas", "url": "https://www.youtube.com/watch?v=bbb"}
+                ],
+                "custom_videos": [
+                    {"title": "Motivación Matutina", "url": "https://youtu.be/ccc"},
+                    {"title": "Duplicado", "url": "https://youtu.be/aaa"}
+                ],
+                "settings": {}
+            }, f)
+        
+        self.catalog = VideoCatalog(self.videos_file, flush_delay=60)
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_deduplicates_youtube_url_variants(self):
+        """Prueba que watch?v= y youtu.be del mismo video son uno solo"""
+        self.assertEqual(self.catalog.list_videos()['total'], 3)
+        self.assertFalse(self.catalog.add_video({"title": "Otra", "url": "https://www.youtube.com/embed/bbb"}))
+        self.assertEqual(self.catalog.get_video("https://youtu.be/bbb")['title'], "Nunca Te Rindas")
+        self.assertTrue(self.catalog.remove_video("https://www.youtube.com/watch?v=ccc"))
+        self.assertIsNone(self.catalog.get_video("https://youtu.be/ccc"))
+    
+    def test_prefix_search_ignores_case_and_accents(self):
+        """Prueba la búsqueda por prefijos de palabras"""
+        result = self.catalog.search_videos("motiv")
+        self.assertEqual([v['url'] for v in result['items']],
+                         ["https://www.youtube.com/watch?v=aaa", "https://youtu.be/ccc"])
+        self.assertEqual(result['items'][1]['type'], 'custom')
+        
+        self.assertEqual(self.catalog.search_videos("MOTIVACION desp")['total'], 1)
+        self.assertEqual(self.catalog.search_videos("xyz")['total'], 0)
+    
+    def test_index_follows_incremental_changes(self):
+        """Prueba que altas y bajas actualizan el índice de palabras"""
+        self.catalog.add_video({"title": "Zumba al Amanecer", "url": "https://youtu.be/ddd"})
+        self.assertEqual(self.catalog.search_videos("zum")['total'], 1)
+        
+        self.catalog.remove_video("https://youtu.be/ddd")
+        self.assertEqual(self.catalog.search_videos("zum")['total'], 0)
+        self.assertNotIn("zumba", self.catalog._sorted_tokens)
+    
+    def test_pagination_returns_copies(self):
+        """Prueba el listado paginado sin modificar los datos del catálogo"""
+        page = self.catalog.list_videos(offset=1, limit=1)
+        self.assertEqual(page['total'], 3)
+        self.assertEqual(page['items'][0]['title'], "Nunca Te Rindas")
+        
+        page['items'][0]['title'] = "Cambiado"
+        self.assertNotIn('type', self.catalog.get_video("https://youtu.be/bbb"))
+        self.assertEqual(self.catalog.get_video("https://youtu.be/bbb")['title'], "Nunca Te Rindas")
+    
+    def test_search_scales_to_thousands(self):
+        """Prueba la búsqueda sobre un catálogo grande"""
+        import time
+        for i in range(5000):
+            self.catalog.add_video({"title": f"Video {i} energia", "url": f"https://youtu.be/id{i}"})
+        
+        start = time.perf_counter()
+        result = self.catalog.search_videos("energ video", limit=10)
+        elapsed = time.perf_counter() - start
+        
+        self.assertEqual(result['total'], 5000)
+        self.assertEqual(len(result['items']), 10)
+        self.assertLess(elapsed, 0.5)
+
+class TestBulkImport(unittest.TestCase):
+    """Pruebas para la importación masiva de videos"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        from video_catalog import VideoCatalog
+        
+        self.test_dir = tempfile.mkdtemp()
+        self.videos_file = os.path.join(self.test_dir, "motivational_videos.json")
+        with open(self.videos_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "default_videos": [{"title": "Existente", "url": "https://www.youtube.com/watch?v=aaa"}],
+                "custom_videos": [],
+                "settings": {}
+            }, f)
+        
+        self.catalog = VideoCatalog(self.videos_file, flush_delay=60)
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _write(self, name, content):
+        """Escribe un archivo de importación"""
+        path = os.path.join(self.test_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+    
+    def test_json_import_dedupes_and_writes_once(self):
+        """Prueba la importación JSON con deduplicación y una sola escritura"""
+        from file_store import atomic_write
+        
+        path = self._write("videos.json", json.dumps([
+            {"title": "Nuevo", "url": "youtu.be/bbb", "duration": "3:15"},
+            {"title": "Repetido", "url": "https://youtu.be/aaa"},
+            {"title": "Mismo que Nuevo", "url": "https://m.youtube.com/watch?v=bbb&t=3"},
+            {"title": "Sin URL", "url": "no es una url"},
+            ["no", "es", "objeto"]
+        ]))
+        
+        with patch('video_catalog.atomic_write', wraps=atomic_write) as mock_write:
+            report = self.catalog.bulk_import(path)
+        
+        self.assertEqual(mock_write.call_count, 1)
+        self.assertEqual(report['imported'], 1)
+        self.assertEqual(report['duplicates'], 2)
+        self.assertEqual([r['record'] for r in report['rejected']], [4, 5])
+        self.assertEqual(self.catalog.get_video("https://youtu.be/bbb")['url'],
+                         "https://www.youtube.com/watch?v=bbb")
+        
+        with open(self.videos_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['custom_videos']), 1)
+    
+    def test_ndjson_reports_bad_lines(self):
+        """Prueba que las líneas NDJSON inválidas se reportan sin abortar"""
+        path = self._write("videos.ndjson", "\n".join([
+            json.dumps({"title": "Uno", "url": "https://youtu.be/n1"}),
+            "{roto",
+            json.dumps({"title": "Dos", "url": "https://example.com/video", "duration": "1:00:00"}),
+            json.dumps({"title": "Tres", "url": "https://youtu.be/n3", "duration": "mucho"})
+        ]))
+        
+        report = self.catalog.bulk_import(path)
+        
+        self.assertEqual(report['imported'], 2)
+        self.assertEqual([r['record'] for r in report['rejected']], [2, 4])
+        self.assertEqual(self.catalog.search_videos("dos")['total'], 1)
+    
+    def test_csv_import_with_weights(self):
+        """Prueba la importación CSV con pesos"""
+        path = self._write("videos.csv", "title,url,duration,weight\n"
+                                         "Pesado,https://youtu.be/c1,2:00,3\n"
+                                         "Normal,https://youtu.be/c2,,\n")
+        
+        report = self.catalog.bulk_import(path, list_name="default_videos")
+        
+        self.assertEqual(report['imported'], 2)
+        self.assertEqual(self.catalog.get_video("https://youtu.be/c1")['weight'], 3)
+        self.assertNotIn('weight', self.catalog.get_video("https://youtu.be/c2"))
+        self.assertEqual(self.catalog.list_videos(list_name="default_videos")['total'], 3)
+    
+    def test_truncated_json_applies_nothing(self):
+        """Prueba que un archivo JSON truncado no modifica el catálogo"""
+        path = self._write("videos.json", '[{"title": "A", "url": "https://youtu.be/t1"}, {"title": "B", "u')
+        
+        report = self.catalog.bulk_import(path)
+        
+        self.assertIsNotNone(report['error'])
+        self.assertEqual(report['imported'], 0)
+        self.assertIsNone(self.catalog.get_video("https://youtu.be/t1"))
+
+class TestLaunchCoalescer(unittest.TestCase):
+    """Pruebas para el agrupador de aperturas de navegador"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.settings = {('browser', 'coalesce_window'): 60, ('browser', 'max_tabs'): 1}
+        config_manager = MagicMock()
+        config_manager.get.side_effect = lambda section, key, default=None: self.settings.get((section, key), default)
+        
+        with patch('browser_integration.platform.system', return_value='Linux'):
+            self.browser_integration = BrowserIntegration(config_manager)
+        self.browser_integration.browser_commands['brave'] = ['brave-browser']
+        self.browser_integration.supervisor = MagicMock()
+        self.coalescer = self.browser_integration.coalescer
+    
+    def _launch(self, video_id):
+        """Crea una apertura preparada"""
+        return {'url': f'https://www.youtube.com/watch?v={video_id}', 'browser': 'brave', 'fullscreen': False}
+    
+    def _submit_burst(self):
+        """Simula tres alarmas disparadas a la vez"""
+        self.browser_integration.submit_launch(self._launch('random1'), 'a1', specific=False)
+        self.browser_integration.submit_launch(self._launch('mine'), 'a2', specific=True)
+        self.browser_integration.submit_launch(self._launch('random2'), 'a3', specific=False)
+    
+    def test_burst_opens_single_tab_with_specific_video(self):
+        """Prueba que una ráfaga abre una pestaña, priorizando el video de la alarma"""
+        self._submit_burst()
+        self.browser_integration.supervisor.spawn.assert_not_called()
+        
+        self.assertTrue(self.coalescer.flush())
+        
+        self.browser_integration.supervisor.spawn.assert_called_once_with(
+            ['brave-browser', 'https://www.youtube.com/watch?v=mine'], tag=['a2', 'a1', 'a3'])
+        stats = self.coalescer.get_stats()
+        self.assertEqual(stats['totals'], {'requests': 3, 'launches': 1, 'saved': 2})
+        self.assertEqual(stats['windows'][-1]['alarm_ids'], ['a1', 'a2', 'a3'])
+    
+    def test_max_tabs_in_one_invocation(self):
+        """Prueba que varias pestañas se abren con una sola invocación"""
+        self.settings[('browser', 'max_tabs')] = 2
+        self._submit_burst()
+        self.coalescer.flush()
+        
+        self.browser_integration.supervisor.spawn.assert_called_once_with(
+            ['brave-browser', 'https://www.youtube.com/watch?v=mine', 'https://www.youtube.com/watch?v=random1'],
+            tag=['a2', 'a1', 'a3'])
+        self.assertEqual(self.coalescer.get_stats()['totals']['saved'], 2)
+    
+    def test_random_videos_drawn_only_for_opened_tabs(self):
+        """Prueba que los videos aleatorios se sortean solo si consiguen pestaña"""
+        self.settings[('browser', 'max_tabs')] = 2
+        catalog = MagicMock()
+        catalog.get_videos.return_value = [{'url': 'https://www.youtube.com/watch?v=r'}]
+        catalog.get_settings.return_value = {'autoplay': False, 'fullscreen': False}
+        catalog.draw_video.side_effect = [{'url': f'https://www.youtube.com/watch?v=r{i}'} for i in range(3)]
+        self.browser_integration.video_catalog = catalog
+        
+        for alarm_id in ('a1', 'a2', 'a3'):
+            launch = self.browser_integration.prepare_launch('brave', '')
+            self.assertTrue(launch['random'])
+            self.browser_integration.submit_launch(launch, alarm_id, specific=False)
+        self.browser_integration.submit_launch(self._launch('mine'), 'a4', specific=True)
+        catalog.draw_video.assert_not_called()
+        
+        self.coalescer.flush()
+        
+        self.assertEqual(catalog.draw_video.call_count, 1)
+        self.browser_integration.supervisor.spawn.assert_called_once_with(
+            ['brave-browser', 'https://www.youtube.com/watch?v=mine', 'https://www.youtube.com/watch?v=r0'],
+            tag=['a4', 'a1', 'a2', 'a3'])
+    
+    def test_window_closes_automatically(self):
+        """Prueba que la ventana se cierra sola tras el tiempo configurado"""
+        import time
+        self.settings[('browser', 'coalesce_window')] = 0.05
+        self._submit_burst()
+        
+        deadline = time.time() + 2
+        while not self.browser_integration.supervisor.spawn.called and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.browser_integration.supervisor.spawn.call_count, 1)
+    
+    def test_zero_window_opens_immediately(self):
+        """Prueba que sin ventana de agrupación cada apertura es inmediata"""
+        self.settings[('browser', 'coalesce_window')] = 0
+        self._submit_burst()
+        
+        self.assertEqual(self.browser_integration.supervisor.spawn.call_count, 3)
+        self.assertEqual(self.coalescer.get_stats()['totals']['saved'], 0)
+
+class TestPlaybackHandles(unittest.TestCase):
+    """Pruebas para las sesiones de reproducción no bloqueantes"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.sound_file = os.path.join(self.test_dir, "alarm.wav")
+        with open(self.sound_file, 'wb') as f:
+            f.write(b'RIFF')
+        
+        self.audio_manager = AudioManager(MagicMock())
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        self.audio_manager.stop_audio()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _fake_player(self, seconds):
+        """Reproductor simulado que dura los segundos indicados"""
+        return patch.object(self.audio_manager, '_player_command', return_value=(
+            'fake', [sys.executable, '-c', f'import time; time.sleep({seconds})']))
+    
+    @patch('browser_integration.platform.system', return_value='Linux')
+    def test_sessions_stop_independently(self, mock_system):
+        """Prueba que cada alarma se detiene sin afectar a las demás"""
+        import time
+        with self._fake_player(30):
+            start = time.perf_counter()
+            first = self.audio_manager.play_prepared(self.sound_file, 80, tag='alarm-1')
+            second = self.audio_manager.play_prepared(self.sound_file, 80, tag='alarm-2')
+            self.assertLess(time.perf_counter() - start, 1.0)
+        
+        self.assertEqual(len(self.audio_manager.get_sessions()), 2)
+        self.assertTrue(self.audio_manager.stop_session('alarm-1'))
+        
+        self.assertEqual(first.status, 'stopped')
+        self.assertEqual(second.status, 'playing')
+        self.assertTrue(self.audio_manager.is_playing)
+        
+        self.audio_manager.stop_audio()
+        self.assertFalse(self.audio_manager.is_playing)
+        self.assertFalse(self.audio_manager.stop_session('alarm-2'))
+    
+    @patch('browser_integration.platform.system', return_value='Linux')
+    def test_wait_reports_finished(self, mock_system):
+        """Prueba que wait devuelve el código de salida del reproductor"""
+        with self._fake_player(0):
+            handle = self.audio_manager.play_prepared(self.sound_file, 150)
+        
+        self.assertEqual(handle.wait(timeout=5), 0)
+        self.assertEqual(handle.status, 'finished')
+        self.assertEqual(handle.volume, 100)
+        self.assertEqual(self.audio_manager.get_sessions(), [])
+    
+    def test_volume_applies_to_active_sessions(self):
+        """Prueba que el volumen se limita y se propaga a las sesiones"""
+        from browser_integration import PlaybackHandle
+        handle = PlaybackHandle(self.sound_file, 80, 'fake', 'alarm-1')
+        self.audio_manager.sessions[handle.id] = handle
+        
+        self.assertEqual(self.audio_manager.set_volume(120), 100)
+        self.assertEqual(handle.volume, 100)
+    
+    def test_processless_sessions_finish(self):
+        """Prueba que las sesiones sin proceso (winsound, plyer) terminan o no bloquean is_playing"""
+        import time
+        from browser_integration import PlaybackHandle
+        wav_file = os.path.join(self.test_dir, "short.wav")
+        _write_test_wav(wav_file, nframes=4410)
+        self.assertAlmostEqual(self.audio_manager._sound_duration(wav_file), 0.1)
+        
+        timed = PlaybackHandle(wav_file, 80, 'winsound', 'alarm-1',
+                               duration=self.audio_manager._sound_duration(wav_file))
+        stopper = MagicMock()
+        unknown = PlaybackHandle(self.sound_file, 80, 'plyer', 'alarm-2', stopper=stopper)
+        self.audio_manager.sessions[timed.id] = timed
+        self.audio_manager.sessions[unknown.id] = unknown
+        
+        self.assertEqual(timed.status, 'playing')
+        self.assertEqual(unknown.status, 'unknown')
+        self.assertTrue(self.audio_manager.is_playing)
+        
+        time.sleep(0.15)
+        self.assertEqual(timed.status, 'finished')
+        self.assertFalse(self.audio_manager.is_playing)
+        self.assertEqual(self.audio_manager.get_sessions(), [unknown])
+        
+        self.assertTrue(self.audio_manager.stop_session('alarm-2'))
+        stopper.assert_called_once()
+        self.assertEqual(self.audio_manager.get_sessions(), [])
+    
+    def test_player_selection_by_format(self):
+        """Prueba la elección del reproductor según formato y disponibilidad"""
+        self.audio_manager.capabilities = {'players': {'aplay': '/usr/bin/aplay'}}
+        self.assertEqual(self.audio_manager._player_command('a.wav', 50)[0], 'aplay')
+        self.assertIsNone(self.audio_manager._player_command('a.mp3', 50))
+        
+        self.audio_manager.capabilities = {'players': {'aplay': '/usr/bin/aplay', 'ffplay': '/usr/bin/ffplay'}}
+        player, argv = self.audio_manager._player_command('a.mp3', 50)
+        self.assertEqual(player, 'ffplay')
+        self.assertIn('-autoexit', argv)
+        self.assertEqual(argv[argv.index('-volume') + 1], '50')
+
+def _write_test_wav(path, nframes=4410, channels=1, framerate=44100, sample_width=2, value=1000):
+    """Crea un WAV de prueba con una señal constante"""
+    import wave
+    import struct
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(framerate)
+        if sample_width == 2:
+            wav.writeframes(struct.pack(f'<{nframes * channels}h', *([value] * nframes * channels)))
+        else:
+            wav.writeframes(bytes([128]) * nframes * channels * sample_width)
+
+class TestAudioEngine(unittest.TestCase):
+    """Pruebas para el motor de audio en proceso"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.sound_file = os.path.join(self.test_dir, "beep.wav")
+        _write_test_wav(self.sound_file)
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_cache_decodes_once_and_slices_without_copy(self):
+        """Prueba que el WAV se decodifica una vez y los tramos no copian"""
+        from audio_engine import PcmCache
+        cache = PcmCache()
+        
+        buffer = cache.get(self.sound_file)
+        self.assertIs(cache.get(self.sound_file), buffer)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(buffer.nframes, 4410)
+        
+        chunk = buffer.chunk(100, 10)
+        self.assertEqual(chunk.nbytes, 20)
+        self.assertIs(chunk.obj, buffer.data.obj)
+    
+    def test_cache_is_bounded_and_invalidated(self):
+        """Prueba la expulsión LRU por tamaño y la invalidación por cambio de archivo"""
+        from audio_engine import PcmCache
+        other_file = os.path.join(self.test_dir, "other.wav")
+        _write_test_wav(other_file)
+        
+        cache = PcmCache(max_bytes=10000)
+        cache.get(self.sound_file)
+        cache.get(other_file)
+        self.assertNotIn(self.sound_file, cache)
+        self.assertLessEqual(cache.get_stats()['bytes'], 10000)
+        
+        _write_test_wav(other_file, nframes=100)
+        os.utime(other_file, ns=(0, 10 ** 9))
+        self.assertEqual(cache.get(other_file).nframes, 100)
+    
+    def test_wave_sink_receives_scaled_pcm(self):
+        """Prueba la reproducción a un archivo con el volumen aplicado"""
+        import wave
+        import struct
+        from audio_engine import AudioEngine, WaveFileSink
+        
+        output = os.path.join(self.test_dir, "out.wav")
+        engine = AudioEngine(lambda: WaveFileSink(output), block_frames=512)
+        
+        playback = engine.play(self.sound_file, volume=50, tag='alarm-1')
+        self.assertEqual(playback.wait(timeout=5), 0)
+        self.assertEqual(playback.status, 'finished')
+        
+        with wave.open(output, 'rb') as wav:
+            self.assertEqual(wav.getnframes(), 4410)
+            samples = struct.unpack('<4410h', wav.readframes(4410))
+        self.assertEqual(set(samples), {500})
+    
+    def test_audio_manager_uses_engine_for_cached_wav(self):
+        """Prueba que AudioManager usa el motor en proceso cuando está habilitado"""
+        import time
+        from audio_engine import AudioEngine, NullSink
+        
+        config_manager = MagicMock()
+        config_manager.get.side_effect = lambda section, key, default=None: (
+            'internal' if (section, key) == ('audio', 'engine') else default)
+        audio_manager = AudioManager(config_manager)
+        audio_manager.engine = AudioEngine(lambda: NullSink(realtime=True))
+        audio_manager._warm_page_cache(self.sound_file)
+        
+        start = time.perf_counter()
+        handle = audio_manager.play_prepared(self.sound_file, 80, tag='alarm-1')
+        elapsed = time.perf_counter() - start
+        
+        self.assertEqual(handle.player, 'engine')
+        self.assertLess(elapsed, 0.05)
+        self.assertEqual(audio_manager.engine.cache.misses, 1)
+        self.assertTrue(handle.set_volume(30))
+        self.assertTrue(audio_manager.stop_session('alarm-1'))
+        self.assertEqual(handle.wait(timeout=5), 0)
+    
+    def test_unsupported_wav_is_rejected(self):
+        """Prueba que los WAV que no son de 16 bits se rechazan"""
+        from audio_engine import decode_wav
+        eight_bit = os.path.join(self.test_dir, "8bit.wav")
+        _write_test_wav(eight_bit, sample_width=1)
+        
+        with self.assertRaises(ValueError):
+            decode_wav(eight_bit)
+
+class TestGainEnvelope(unittest.TestCase):
+    """Pruebas para la rampa de volumen progresivo"""
+    
+    def _ramp_output(self, envelope, nframes, block_frames=256, channels=1):
+        """Procesa un tono constante por bloques y devuelve las muestras"""
+        import array
+        output = []
+        for start in range(0, nframes, block_frames):
+            frames = min(block_frames, nframes - start)
+            block = array.array('h', [10000] * frames * channels).tobytes()
+            output.extend(int(sample) for sample in envelope.process(memoryview(block), channels))
+        return output
+    
+    def test_linear_ramp_across_blocks(self):
+        """Prueba que la rampa lineal es continua entre bloques y se mantiene al final"""
+        from audio_engine import GainEnvelope
+        envelope = GainEnvelope(0.1, 0.8, ramp_frames=1000)
+        
+        samples = self._ramp_output(envelope, 1500)
+        
+        self.assertEqual(len(samples), 1500)
+        self.assertAlmostEqual(samples[0], 1000, delta=1)
+        self.assertAlmostEqual(samples[500], 4500, delta=2)
+        self.assertEqual(set(samples[1000:]), {8000})
+        self.assertTrue(all(a <= b for a, b in zip(samples, samples[1:])))
+        self.assertTrue(envelope.finished)
+    
+    def test_exponential_ramp_and_channels(self):
+        """Prueba la rampa exponencial con audio estéreo"""
+        from audio_engine import GainEnvelope
+        envelope = GainEnvelope(0.01, 1.0, ramp_frames=1000, curve='exponential')
+        
+        samples = self._ramp_output(envelope, 1000, channels=2)
+        
+        self.assertEqual(samples[0], samples[1])
+        self.assertAlmostEqual(samples[1000], 1000, delta=2)  # Mitad de la rampa: media geométrica
+        self.assertAlmostEqual(envelope.gain_at(500), 0.1, places=3)
+        
+        with self.assertRaises(ValueError):
+            GainEnvelope(0, 1, 10, curve='cubic')
+    
+    def test_snoozes_shorten_the_ramp(self):
+        """Prueba que cada posposición acorta la rampa y que se puede desactivar"""
+        settings = {('audio', 'ramp_seconds'): 30, ('snooze', 'progressive_volume'): True}
+        config_manager = MagicMock()
+        config_manager.get.side_effect = lambda section, key, default=None: settings.get((section, key), default)
+        audio_manager = AudioManager(config_manager)
+        
+        self.assertEqual(audio_manager._get_ramp(0)['seconds'], 30)
+        self.assertEqual(audio_manager._get_ramp(2)['seconds'], 10)
+        
+        self.assertEqual(audio_manager._get_ramp(0)['start_volume'], 10)
+        settings[('audio', 'snooze_volume')] = 60
+        self.assertEqual(audio_manager._get_ramp(1)['start_volume'], 60)
+        
+        settings[('snooze', 'progressive_volume')] = False
+        self.assertIsNone(audio_manager._get_ramp(0))
+    
+    @patch('browser_integration.platform.system', return_value='Linux')
+    def test_aplay_volume_goes_through_engine(self, mock_system):
+        """Prueba que aplay, sin control de volumen, solo se usa a volumen máximo"""
+        import tempfile as tmp
+        settings = {('audio', 'engine'): 'external'}
+        config_manager = MagicMock()
+        config_manager.get.side_effect = lambda section, key, default=None: settings.get((section, key), default)
+        audio_manager = AudioManager(config_manager)
+        audio_manager.capabilities = {'players': {'aplay': '/usr/bin/aplay'}}
+        audio_manager.engine = MagicMock()
+        
+        with tmp.TemporaryDirectory() as test_dir:
+            wav_file = os.path.join(test_dir, "alarm.wav")
+            _write_test_wav(wav_file)
+            with patch.object(audio_manager, '_play_process_audio') as play_process:
+                audio_manager._play_sound_file(wav_file, 50)
+                audio_manager.engine.play.assert_called_once_with(wav_file, 50, None, None)
+                play_process.assert_not_called()
+                
+                audio_manager._play_sound_file(wav_file, 100)
+                play_process.assert_called_once_with(wav_file, 100, None)
+                
+                audio_manager.capabilities['players']['paplay'] = '/usr/bin/paplay'
+                self.assertEqual(audio_manager._player_command(wav_file, 50)[0], 'paplay')
+                audio_manager._play_sound_file(wav_file, 50)
+                self.assertEqual(audio_manager.engine.play.call_count, 1)
+    
+    def test_engine_playback_ramps_to_volume(self):
+        """Prueba que el motor aplica la rampa y que set_volume mueve su final"""
+        import wave
+        import struct
+        import tempfile as tmp
+        from audio_engine import AudioEngine, WaveFileSink
+        
+        test_dir = tmp.mkdtemp()
+        try:
+            sound_file = os.path.join(test_dir, "beep.wav")
+            output = os.path.join(test_dir, "out.wav")
+            _write_test_wav(sound_file, nframes=44100)
+            engine = AudioEngine(lambda: WaveFileSink(output))
+            
+            playback = engine.play(sound_file, volume=100,
+                                   ramp={'start_volume': 0, 'seconds': 0.5, 'curve': 'linear'})
+            self.assertEqual(playback.wait(timeout=5), 0)
+            
+            with wave.open(output, 'rb') as wav:
+                samples = struct.unpack('<44100h', wav.readframes(44100))
+            self.assertEqual(samples[0], 0)
+            self.assertAlmostEqual(samples[11025], 500, delta=1)
+            self.assertEqual(set(samples[22050:]), {1000})
+            
+            playback.envelope.position = 0
+            playback.set_volume(50)
+            self.assertEqual(playback.envelope.end_gain, 0.5)
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+class TestMixer(unittest.TestCase):
+    """Pruebas para el mezclador de voces simultáneas"""
+    
+    def _voice(self, value, nframes, channels=1, volume=100):
+        """Crea una voz con un valor constante"""
+        import array
+        from audio_engine import EnginePlayback, PcmBuffer
+        frames = array.array('h', [value] * nframes * channels).tobytes()
+        return EnginePlayback(None, PcmBuffer(frames, channels, 44100), 'voice.wav', volume)
+    
+    def test_mix_sums_with_gain_and_clipping(self):
+        """Prueba la suma por bloques con ganancia por voz y saturación"""
+        from audio_engine import Mixer, NullSink
+        mixer = Mixer(NullSink, block_frames=100)
+        mixer.framerate, mixer.channels = 44100, 1
+        
+        quiet = self._voice(1000, 150, volume=50)
+        normal = self._voice(2000, 50)
+        block, ended = mixer._mix([quiet, normal])
+        self.assertEqual([int(v) for v in block[:50]], [2500] * 50)
+        self.assertEqual([int(v) for v in block[50:]], [500] * 50)
+        
+        block, ended = mixer._mix([quiet, normal])
+        self.assertEqual(len(block), 50)
+        self.assertEqual(ended, [normal])
+        
+        loud = [self._voice(30000, 100), self._voice(30000, 100)]
+        block, _ = mixer._mix(loud)
+        self.assertEqual(set(int(v) for v in block), {32767})
+        self.assertEqual(mixer.clipped_blocks, 1)
+    
+    def test_mono_voice_in_stereo_mix(self):
+        """Prueba que una voz mono se duplica en una mezcla estéreo"""
+        from audio_engine import Mixer, NullSink
+        mixer = Mixer(NullSink, block_frames=10)
+        mixer.framerate, mixer.channels = 44100, 2
+        
+        block, _ = mixer._mix([self._voice(100, 10, channels=2), self._voice(50, 10)])
+        self.assertEqual(len(block), 20)
+        self.assertEqual(set(int(v) for v in block), {150})
+    
+    def test_natural_end_drains_sink(self):
+        """Prueba que al terminar solas las voces la salida se vacía y luego se dan por terminadas"""
+        from audio_engine import Mixer, NullSink, EnginePlayback, PcmBuffer
+        import array
+        sinks = []
+        mixer = Mixer(lambda: sinks.append(NullSink()) or sinks[-1], block_frames=64)
+        voice = EnginePlayback(None, PcmBuffer(array.array('h', [100] * 256).tobytes(), 1, 44100),
+                               'voice.wav', 100)
+        voice.engine = type('Engine', (), {'mixer': mixer})()
+        mixer.add(voice)
+        
+        self.assertEqual(voice.wait(timeout=2), 0)
+        self.assertTrue(sinks[0].closed)
+        self.assertTrue(sinks[0].drained)
+    
+    def test_pipe_sink_drains_on_natural_end(self):
+        """Prueba que el reproductor recibe todo el audio antes de cerrarse y se corta al detener"""
+        from audio_engine import PipeSink
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir, True)
+        
+        def player(output):
+            # Reproductor lento: tarda en consumir lo que queda en la tubería
+            script = (f"import sys, time; data = sys.stdin.buffer.read(); time.sleep(0.3); "
+                      f"open({output!r}, 'wb').write(data)")
+            return lambda framerate, channels: [sys.executable, "-c", script]
+        
+        drained = os.path.join(test_dir, "drained.raw")
+        sink = PipeSink(player(drained))
+        sink.open(44100, 1)
+        sink.write(b"\x01\x00" * 1000)
+        sink.close()
+        with open(drained, 'rb') as f:
+            self.assertEqual(len(f.read()), 2000)
+        
+        cut = os.path.join(test_dir, "cut.raw")
+        sink = PipeSink(player(cut))
+        sink.open(44100, 1)
+        sink.write(b"\x01\x00" * 1000)
+        sink.close(drain=False)
+        self.assertFalse(os.path.exists(cut))
+    
+    def test_voices_share_one_sink_and_stop_independently(self):
+        """Prueba que varias alarmas comparten la salida y se detienen por separado"""
+        import time
+        from audio_engine import AudioEngine, NullSink
+        test_dir = tempfile.mkdtemp()
+        sinks = []
+        
+        def sink_factory():
+            sinks.append(NullSink(realtime=True))
+            return sinks[-1]
+        
+        try:
+            sound_file = os.path.join(test_dir, "long.wav")
+            _write_test_wav(sound_file, nframes=441000)
+            other_rate = os.path.join(test_dir, "other.wav")
+            _write_test_wav(other_rate, framerate=22050)
+            
+            engine = AudioEngine(sink_factory)
+            first = engine.play(sound_file, tag='alarm-1')
+            second = engine.play(sound_file, tag='alarm-2')
+            mixer_thread = engine.mixer._thread
+            self.assertEqual(engine.mixer.get_stats()['streams'], 2)
+            while second.position == 0:
+                time.sleep(0.005)
+            
+            with self.assertRaises(ValueError):
+                engine.play(other_rate)
+            
+            self.assertTrue(first.stop())
+            self.assertEqual(first.wait(timeout=1), 0)
+            self.assertTrue(second.is_active)
+            
+            self.assertTrue(second.stop())
+            self.assertEqual(second.wait(timeout=1), 0)
+            mixer_thread.join(timeout=1)
+            self.assertEqual(len(sinks), 1)
+            self.assertTrue(sinks[0].closed)
+            self.assertFalse(sinks[0].drained)  # Detenida: se corta sin vaciar
+            self.assertEqual(engine.mixer.get_stats()['max_streams'], 2)
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+class TestSoundLibrary(unittest.TestCase):
+    """Pruebas para el índice persistente de sonidos"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.sound_dir = os.path.join(self.test_dir, "sounds")
+        os.makedirs(self.sound_dir)
+        self.index_file = os.path.join(self.test_dir, "sound_index.json")
+        _write_test_wav(os.path.join(self.sound_dir, "default_alarm.wav"), nframes=22050)
+        for name in ("birds.m4a", "rain.ogg", "notes.txt"):
+            with open(os.path.join(self.sound_dir, name), 'wb') as f:
+                f.write(b'\0' * 64)
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_names_aliases_and_metadata(self):
+        """Prueba los nombres sin extensión, los alias y los metadatos WAV"""
+        library = SoundLibrary([self.sound_dir], self.index_file)
+        self.assertTrue(library.refresh())
+        
+        self.assertEqual(library.resolve('birds'), os.path.join(self.sound_dir, "birds.m4a"))
+        self.assertEqual(library.resolve('rain'), os.path.join(self.sound_dir, "rain.ogg"))
+        self.assertEqual(library.resolve('default'), os.path.join(self.sound_dir, "default_alarm.wav"))
+        self.assertIsNone(library.resolve('gentle'))
+        self.assertIsNone(library.resolve('notes'))
+        
+        info = library.get_info('default')
+        self.assertEqual((info['format'], info['sample_rate'], info['channels']), ('wav', 44100, 1))
+        self.assertAlmostEqual(info['duration'], 0.5)
+        self.assertIsNone(library.get_info('birds')['duration'])
+    
+    def test_index_is_persisted_and_refreshed_incrementally(self):
+        """Prueba que el índice se reutiliza y solo se relista al cambiar el directorio"""
+        SoundLibrary([self.sound_dir], self.index_file).refresh()
+        
+        with patch('sound_library.probe_sound_file', wraps=probe_sound_file) as probe:
+            library = SoundLibrary([self.sound_dir], self.index_file)
+            self.assertEqual(library.resolve('rain'), os.path.join(self.sound_dir, "rain.ogg"))
+            self.assertFalse(library.refresh())
+            self.assertEqual(library.rescans, 0)
+            
+            _write_test_wav(os.path.join(self.sound_dir, "gentle_chime.wav"))
+            os.utime(self.sound_dir, ns=(0, 10 ** 9))
+            self.assertTrue(library.refresh())
+            self.assertEqual(probe.call_count, 1)  # Solo el archivo nuevo
+        
+        self.assertEqual(library.resolve('gentle'), os.path.join(self.sound_dir, "gentle_chime.wav"))
+        
+        os.remove(os.path.join(self.sound_dir, "rain.ogg"))
+        os.utime(self.sound_dir, ns=(0, 2 * 10 ** 9))
+        library.refresh()
+        self.assertIsNone(library.resolve('rain'))
+
+class TestAudioBenchmark(unittest.TestCase):
+    """Pruebas del benchmark de estrategias de reproducción"""
+    
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), "El reproductor falso necesita FIFOs POSIX")
+    def test_benchmark_reports_every_strategy(self):
+        """Prueba que el benchmark mide todas las estrategias con el reproductor falso"""
+        from benchmarks.audio_benchmark import STRATEGIES, run_benchmark, percentile
+        
+        results = run_benchmark(iterations=3, ring_seconds=0.2)
+        
+        self.assertEqual([r['strategy'] for r in results], list(STRATEGIES))
+        for result in results:
+            self.assertGreater(result['start_p50_ms'], 0)
+            self.assertGreaterEqual(result['start_p99_ms'], result['start_p50_ms'])
+            self.assertGreaterEqual(result['stop_p50_ms'], 0)
+            self.assertGreaterEqual(result['cpu_seconds_per_minute'], 0)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 0.5), 3)
+
+class TestAlarmDaemon(unittest.TestCase):
+    """Pruebas para el demonio de alarmas sin interfaz"""
+    
+    def test_daemon_does_not_load_gui_stack(self):
+        """Prueba que el demonio y AlarmManager no importan Kivy"""
+        import subprocess
+        code = "import sys, alarm_daemon; print(sorted(m for m in ('kivy', 'kivymd', 'plyer') if m in sys.modules))"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60)
+        self.assertEqual(output.stdout.strip(), "[]")
+    
+    def test_backends_are_pluggable(self):
+        """Prueba los backends integrados y los cargados por módulo:fábrica"""
+        from alarm_daemon import AlarmDaemon, NullBrowser, load_backend, NOTIFIERS
+        
+        config_manager = MagicMock()
+        config_manager.get.side_effect = lambda section, key, default=None: default
+        daemon = AlarmDaemon(config_manager, notifier="none", audio="none", browser="none")
+        self.assertIsInstance(daemon.alarm_manager.browser, NullBrowser)
+        self.assertIsNone(daemon.alarm_manager.audio_manager)
+        
+        notifier = MagicMock()
+        daemon.alarm_manager.set_notifier(notifier)
+        daemon.alarm_manager._send_notification({'title': 'Despertar', 'description': 'Hora'})
+        notifier.assert_called_once_with('Despertar', 'Hora')
+        
+        from collections import OrderedDict
+        self.assertIsInstance(load_backend("collections:OrderedDict", NOTIFIERS, {}), OrderedDict)
+        with self.assertRaises(ValueError):
+            load_backend("desconocido", NOTIFIERS, config_manager)
+    
+    def test_null_browser_accepts_launches(self):
+        """Prueba que el navegador nulo completa la secuencia de la alarma"""
+        from alarm_daemon import NullBrowser
+        browser = NullBrowser()
+        launch = browser.prepare_launch("brave", "https://www.youtube.com/watch?v=abc")
+        self.assertTrue(browser.submit_launch(launch, alarm_id="a1"))
+
+class TestControlApi(unittest.TestCase):
+    """Pruebas para la API de control local"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        from control_api import ControlServer
+        self.test_dir = tempfile.mkdtemp()
+        self.config_manager = MagicMock()
+        self.config_manager.get.side_effect = lambda section, key, default=None: default
+        
+        self.alarm_manager = AlarmManager(self.config_manager)
+        self.alarm_manager.storage_dir = self.test_dir
+        self.alarm_manager.alarms_file = os.path.join(self.test_dir, "alarms.json")
+        
+        self.server = ControlServer(self.alarm_manager, "127.0.0.1:0")
+        self.server.start()
+        self.host, self.port = self.server.server_address[:2]
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        self.server.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _request(self, connection, method, path, body=None):
+        """Hace una petición JSON por una conexión persistente"""
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if method in ("POST", "PUT", "PATCH") else {}
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    
+    def test_crud_over_one_keepalive_connection(self):
+        """Prueba alta, consulta, modificación y baja reutilizando la conexión"""
+        import http.client
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        
+        status, alarm = self._request(connection, "POST", "/alarms",
+                                      {"title": "Trabajo", "time": "07:30", "recurrence": "daily"})
+        self.assertEqual(status, 201)
+        sock = connection.sock
+        
+        status, fetched = self._request(connection, "GET", f"/alarms/{alarm['id']}")
+        self.assertEqual((status, fetched['title']), (200, "Trabajo"))
+        
+        status, updated = self._request(connection, "PATCH", f"/alarms/{alarm['id']}", {"time": "08:15"})
+        self.assertEqual((status, updated['time']), (200, "08:15"))
+        
+        status, error = self._request(connection, "POST", "/alarms", {"title": "Mal", "volume": 500})
+        self.assertEqual((status, error['error']), (400, "volume fuera de rango (0-100)"))
+        
+        status, _ = self._request(connection, "DELETE", f"/alarms/{alarm['id']}")
+        self.assertEqual(status, 200)
+        status, _ = self._request(connection, "GET", f"/alarms/{alarm['id']}")
+        self.assertEqual(status, 404)
+        
+        self.assertIs(connection.sock, sock)  # Misma conexión TCP en todas las peticiones
+        connection.close()
+    
+    def test_rejects_browser_and_unauthenticated_requests(self):
+        """Prueba que se rechazan peticiones de navegador, sin JSON o sin token"""
+        import http.client
+        body = json.dumps({"title": "Intrusa", "time": "07:30", "recurrence": "daily",
+                           "video_url": "https://example.com"})
+        
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        connection.request("POST", "/alarms", body=body, headers={"Content-Type": "text/plain"})
+        self.assertEqual(connection.getresponse().status, 415)
+        connection.close()
+        
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        connection.request("POST", "/alarms/batch", body=body, headers={
+            "Content-Type": "application/json", "Origin": "https://example.com"})
+        self.assertEqual(connection.getresponse().status, 403)
+        connection.close()
+        self.assertEqual(self.alarm_manager.alarms, [])
+        
+        self.server.token = "secreto"
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        self.assertEqual(self._request(connection, "GET", "/alarms")[0], 401)
+        connection.close()
+        
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        connection.request("POST", "/alarms", body=body, headers={
+            "Content-Type": "application/json; charset=utf-8", "Authorization": "Bearer secreto"})
+        self.assertEqual(connection.getresponse().status, 201)
+        connection.close()
+    
+    @unittest.skipIf(sys.platform == 'win32', "requiere sockets Unix")
+    def test_unix_socket_is_private(self):
+        """Prueba que el socket Unix se crea accesible solo para el propietario"""
+        import stat
+        from control_api import ControlServer
+        path = os.path.join(self.test_dir, "control.sock")
+        server = ControlServer(self.alarm_manager, f"unix:{path}")
+        server.start()
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        finally:
+            server.stop()
+    
+    def test_batch_saves_once(self):
+        """Prueba que un lote grande se aplica con un solo guardado"""
+        import http.client
+        operations = [{"op": "add", "data": {"title": f"Alarma {i}", "time": f"{i % 24:02d}:{i % 60:02d}",
+                                             "recurrence": "daily"}} for i in range(2000)]
+        operations.append({"op": "delete", "id": "no-existe"})
+        
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        with patch.object(self.alarm_manager, 'save_alarms', wraps=self.alarm_manager.save_alarms) as save:
+            status, result = self._request(connection, "POST", "/alarms/batch", {"operations": operations})
+        
+        self.assertEqual(status, 200)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(result['results'][-1], {'ok': False, 'id': 'no-existe', 'error': 'alarma no encontrada'})
+        # 2000 combinaciones título/hora distintas, menos ninguna duplicada
+        self.assertEqual(result['applied'], 2000)
+        
+        status, page = self._request(connection, "GET", "/alarms?offset=1990&limit=50")
+        self.assertEqual((page['total'], len(page['items'])), (2000, 10))
+        connection.close()
+    
+    def test_occurrences_stream_in_order(self):
+        """Prueba el flujo NDJSON de activaciones ordenadas"""
+        import http.client
+        self.alarm_manager.apply_batch([
+            {"op": "add", "data": {"title": "Diaria", "time": "09:00", "recurrence": "daily", "is_active": True}},
+            {"op": "add", "data": {"title": "Lunes", "time": "07:00", "recurrence": "weekly",
+                                   "days_of_week": [0], "is_active": True}},
+            {"op": "add", "data": {"title": "Cron", "time": "10:00", "recurrence": "custom",
+                                   "custom_schedule": "30 12 * * *", "is_active": True}},
+            {"op": "add", "data": {"title": "Inactiva", "time": "11:00", "recurrence": "daily"}}
+        ])
+        
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        connection.request("GET", "/occurrences?from=2030-01-07T00:00:00&to=2030-01-09T00:00:00")
+        response = connection.getresponse()
+        self.assertEqual(response.getheader("Transfer-Encoding"), "chunked")
+        lines = [json.loads(line) for line in response.read().splitlines()]
+        
+        self.assertEqual([(line['title'], line['at']) for line in lines], [
+            ("Lunes", "2030-01-07T07:00:00"),
+            ("Diaria", "2030-01-07T09:00:00"),
+            ("Cron", "2030-01-07T12:30:00"),
+            ("Diaria", "2030-01-08T09:00:00"),
+            ("Cron", "2030-01-08T12:30:00")
+        ])
+        
+        # La conexión sigue viva tras un flujo por bloques
+        connection.request("GET", "/occurrences?limit=2")
+        self.assertEqual(len(connection.getresponse().read().splitlines()), 2)
+        connection.close()
+    
+    def test_patch_validates_every_field(self):
+        """Prueba que las modificaciones validan tipo y valor de cada campo"""
+        import http.client
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        status, alarm = self._request(connection, "POST", "/alarms",
+                                      {"title": "Semanal", "time": "07:30", "recurrence": "weekly",
+                                       "days_of_week": [0, 2]})
+        self.assertEqual(status, 201)
+        
+        for body in ({"days_of_week": ["x"]}, {"days_of_week": [7]}, {"recurrence": "mensual"},
+                     {"title": 5}, {"volume": True}, {"enabled": "sí"}, {"time": "7h"},
+                     {"recurrence": "custom", "custom_schedule": "cada lunes"}):
+            status, error = self._request(connection, "PATCH", f"/alarms/{alarm['id']}", body)
+            self.assertEqual(status, 400, body)
+        
+        # Una alarma única activada con la hora ya pasada no tendría próxima activación
+        past = (datetime.now() - timedelta(minutes=1)).strftime('%H:%M')
+        status, error = self._request(connection, "PATCH", f"/alarms/{alarm['id']}",
+                                      {"recurrence": "none", "time": past})
+        self.assertEqual((status, error['error']), (400, "no se puede calcular próxima activación"))
+        
+        status, fetched = self._request(connection, "GET", f"/alarms/{alarm['id']}")
+        self.assertEqual((fetched['recurrence'], fetched['days_of_week']), ("weekly", [0, 2]))
+        connection.close()
+    
+    def test_corrupt_alarm_does_not_break_stream(self):
+        """Prueba que una alarma corrupta no corta el flujo de activaciones ni el planificador"""
+        import http.client
+        self.alarm_manager.apply_batch([
+            {"op": "add", "data": {"title": "Diaria", "time": "08:00", "recurrence": "daily", "is_active": True}},
+            {"op": "add", "data": {"title": "Rota", "time": "08:00", "recurrence": "weekly",
+                                   "days_of_week": [0], "is_active": True}}
+        ])
+        broken = next(alarm for alarm in self.alarm_manager.alarms if alarm.title == "Rota")
+        broken.days_of_week = ["x"]  # Editada a mano en alarms.json
+        
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        connection.request("GET", "/occurrences?from=2030-01-07T00:00:00&to=2030-01-09T00:00:00")
+        response = connection.getresponse()
+        lines = [json.loads(line) for line in response.read().splitlines()]
+        self.assertEqual([line['title'] for line in lines], ["Diaria", "Diaria"])
+        
+        status, page = self._request(connection, "GET", "/alarms")
+        self.assertEqual((status, page['total']), (200, 2))
+        connection.close()
+        
+        with patch('alarm_manager.datetime') as mock_datetime, \
+             patch.object(self.alarm_manager, '_trigger_alarm') as trigger:
+            mock_datetime.now.return_value = datetime(2030, 1, 7, 8, 0, 1)
+            mock_datetime.fromisoformat = datetime.fromisoformat
+            self.alarm_manager._check_pending_alarms()
+        self.assertEqual([call.args[0].title for call in trigger.call_args_list], ["Diaria"])
+    
+    def test_change_events_are_streamed(self):
+        """Prueba que los cambios y disparos llegan por el flujo SSE"""
+        import socket
+        import time
+        sock = socket.create_connection((self.host, self.port), timeout=5)
+        sock.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        
+        received = b""
+        while b"conectado" not in received:
+            received += sock.recv(4096)
+        
+        alarm_id = self.alarm_manager.add_alarm({"title": "Despertar", "time": "07:00", "recurrence": "daily"})
+        alarm = self.alarm_manager.get_alarm_by_id(alarm_id)
+        self.alarm_manager._emit_change("fired", [alarm], trigger=alarm.trigger())
+        
+        deadline = time.time() + 5
+        while b"event: fired" not in received and time.time() < deadline:
+            received += sock.recv(4096)
+        sock.close()
+        
+        self.assertIn(b"text/event-stream", received)
+        self.assertIn(b"event: added", received)
+        self.assertIn(f'"ids": ["{alarm_id}"]'.encode(), received)
+        self.assertIn(b'"title": "Despertar"', received)
+    
+    def test_snooze_route(self):
+        """Prueba la posposición por la API"""
+        import http.client
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        
+        status, alarm = self._request(connection, "POST", "/alarms",
+                                      {"title": "Siesta", "time": "15:00", "recurrence": "daily",
+                                       "max_snoozes": 1})
+        status, snoozed = self._request(connection, "POST", f"/alarms/{alarm['id']}/snooze")
+        self.assertEqual((status, snoozed['snooze_count']), (200, 1))
+        
+        status, _ = self._request(connection, "POST", f"/alarms/{alarm['id']}/snooze")
+        self.assertEqual(status, 409)
+        status, _ = self._request(connection, "POST", "/alarms/desconocida/snooze")
+        self.assertEqual(status, 404)
+        connection.close()
+
+class TestAlarmChangeEvents(unittest.TestCase):
+    """Pruebas de los eventos de cambio de AlarmManager"""
+    
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.test_dir = tempfile.mkdtemp()
+        self.config_manager = MagicMock()
+        self.config_manager.get.side_effect = lambda section, key, default=None: default
+        
+        self.alarm_manager = AlarmManager(self.config_manager)
+        self.alarm_manager.storage_dir = self.test_dir
+        self.alarm_manager.alarms_file = os.path.join(self.test_dir, "alarms.json")
+        self.events = []
+        self.alarm_manager.add_change_listener(self.events.append)
+    
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _add(self, title, time="07:00"):
+        return self.alarm_manager.add_alarm({"title": title, "time": time, "recurrence": "daily"})
+    
+    def _types(self):
+        return [(event['type'], event['ids']) for event in self.events]
+    
+    def test_crud_events(self):
+        """Prueba los eventos de alta, modificación, baja y borrado total"""
+        first = self._add("Uno")
+        second = self._add("Dos", "08:00")
+        self.alarm_manager.update_alarm(first, {"title": "Uno bis", "time": "07:05", "recurrence": "daily"})
+        self.alarm_manager.delete_alarm(second)
+        self.alarm_manager.clear_all_alarms()
+        
+        self.assertEqual(self._types(), [
+            ("added", [first]), ("added", [second]), ("updated", [first]),
+            ("removed", [second]), ("removed", [first])
+        ])
+        self.assertEqual(self.events[2]['alarms'][first].title, "Uno bis")
+        self.assertEqual(self.events[3]['alarms'], {})
+    
+    def test_batch_emits_one_event_per_type(self):
+        """Prueba que un lote emite un único evento por tipo de cambio"""
+        existing = self._add("Existente")
+        doomed = self._add("Se borra", "08:00")
+        self.events.clear()
+        
+        results = self.alarm_manager.apply_batch([
+            {"op": "add", "data": {"title": "Nueva", "time": "09:00", "recurrence": "daily"}},
+            {"op": "add", "data": {"title": "Otra", "time": "10:00", "recurrence": "daily"}},
+            {"op": "update", "id": existing, "data": {"volume": 30}},
+            {"op": "update", "id": doomed, "data": {"volume": 20}},
+            {"op": "delete", "id": doomed},
+            {"op": "delete", "id": "desconocida"}
+        ])
+        
+        self.assertEqual(self._types(), [
+            ("added", [results[0]['id'], results[1]['id']]),
+            ("updated", [existing]),
+            ("removed", [doomed])
+        ])
+        self.assertEqual(self.events[1]['alarms'][existing].volume, 30)
+        
+        self.events.clear()
+        self.alarm_manager.apply_batch([{"op": "delete", "id": "desconocida"}])
+        self.assertEqual(self.events, [])
+    
+    def test_snooze_emits_and_refires(self):
+        """Prueba que posponer emite un evento y la alarma vuelve a sonar al vencer"""
+        alarm_id = self._add("Despertar")
+        alarm = self.alarm_manager.get_alarm_by_id(alarm_id)
+        alarm.enabled = False  # Alarma única ya disparada
+        alarm.is_active = True
+        
+        self.assertTrue(self.alarm_manager.snooze_alarm(alarm_id))
+        self.assertEqual(self.events[-1]['type'], "snoozed")
+        self.assertTrue(alarm.enabled)
+        self.assertEqual(alarm.snooze_count, 1)
+        
+        due = datetime.fromisoformat(alarm.next_trigger)
+        self.assertFalse(alarm.snooze_due(due - timedelta(seconds=1)))
+        self.assertTrue(alarm.snooze_due(due))
+        
+        with patch('alarm_manager.datetime') as mock_datetime, \
+             patch.object(self.alarm_manager, '_trigger_alarm') as trigger:
+            mock_datetime.now.return_value = due + timedelta(seconds=1)
+            mock_datetime.fromisoformat = datetime.fromisoformat
+            self.alarm_manager._check_pending_alarms()
+        trigger.assert_called_once_with(alarm, True)
+        
+        alarm.snooze_count = alarm.max_snoozes
+        self.assertFalse(self.alarm_manager.snooze_alarm(alarm_id))
+        self.assertFalse(self.alarm_manager.snooze_alarm("desconocida"))
+    
+    def test_max_snoozes_enforced_across_refires(self):
+        """Prueba que las re-activaciones por posposición no reinician el contador"""
+        alarm_id = self._add("Despertar")
+        alarm = self.alarm_manager.get_alarm_by_id(alarm_id)
+        alarm.vibrate = False
+        self.alarm_manager.set_browser(MagicMock())
+        self.alarm_manager.set_notifier(MagicMock())
+        
+        for cycle in range(alarm.max_snoozes):
+            self.assertTrue(self.alarm_manager.snooze_alarm(alarm_id))
+            self.alarm_manager._trigger_alarm(alarm, snoozed=True)
+            self.assertEqual(alarm.snooze_count, cycle + 1)
+        self.assertFalse(self.alarm_manager.snooze_alarm(alarm_id))
+        
+        # Descartar cierra el ciclo; la siguiente activación normal también
+        self.alarm_manager.dismiss_alarm(alarm_id)
+        self.assertEqual(alarm.snooze_count, 0)
+        self.assertTrue(self.alarm_manager.snooze_alarm(alarm_id))
+        alarm.trigger()
+        self.assertEqual(alarm.snooze_count, 0)
+    
+    def test_reload_classifies_changes(self):
+        """Prueba que una recarga desde disco emite altas, modificaciones y bajas"""
+        from alarm_manager import Alarm
+        kept = self._add("Se modifica")
+        gone = self._add("Se borra", "08:00")
+        self.alarm_manager.reload_alarms()
+        self.events.clear()
+        
+        with open(self.alarm_manager.alarms_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data = [entry for entry in data if entry['id'] != gone]
+        data[0]['title'] = "Modificada fuera"
+        data[0]['version'] += 1
+        new_alarm = Alarm()
+        new_alarm.title = "Añadida fuera"
+        data.append(new_alarm.to_dict())
+        with open(self.alarm_manager.alarms_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        
+        self.alarm_manager.reload_alarms()
+        
+        self.assertEqual(sorted(self._types()), sorted([
+            ("added", [new_alarm.id]), ("updated", [kept]), ("removed", [gone])
+        ]))
+    
+    def test_coalesce_changes(self):
+        """Prueba la reducción de eventos al estado final por alarma"""
+        from alarm_manager import coalesce_changes, Alarm
+        first, second = Alarm(), Alarm()
+        events = [
+            {'type': 'added', 'ids': [first.id], 'alarms': {first.id: first}},
+            {'type': 'added', 'ids': [second.id], 'alarms': {second.id: second}},
+            {'type': 'removed', 'ids': [first.id], 'alarms': {}},
+            {'type': 'updated', 'ids': [second.id], 'alarms': {second.id: second}},
+            {'type': 'removed', 'ids': ['viejo'], 'alarms': {}},
+        ]
+        upserted, removed = coalesce_changes(events)
+        
+        self.assertEqual(upserted, {second.id: second})
+        self.assertEqual(removed, [first.id, 'viejo'])
+        self.assertEqual(coalesce_changes([]), ({}, []))
+
+class TestStartupBenchmark(unittest.TestCase):
+    """Pruebas del benchmark de arranque y de las importaciones diferidas"""
+    
+    def test_parse_importtime(self):
+        """Prueba la interpretación de la salida de -X importtime"""
+        from benchmarks.startup_benchmark import parse_importtime, direct_imports
+        
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:        50 |         50 |     _leaf",
+            "import time:       100 |        150 |   child_a",
+            "import time:        30 |         30 |   child_b",
+            "import time:       200 |        380 | main",
+            "ruido que no es de importtime"
+        ])
+        modules = parse_importtime(output)
+        
+        self.assertEqual([m['name'] for m in modules], ['_leaf', 'child_a', 'child_b', 'main'])
+        self.assertEqual(modules[0]['depth'], 2)
+        self.assertEqual(modules[3]['cumulative_us'], 380)
+        self.assertEqual(sorted(m['name'] for m in direct_imports(modules, 'main')), ['child_a', 'child_b'])
+        self.assertEqual(direct_imports(modules, 'missing'), [])
+    
+    def test_main_defers_secondary_widgets(self):
+        """Prueba que importar main no carga los widgets diferidos ni NumPy"""
+        from benchmarks.startup_benchmark import run_benchmark
+        
+        report = run_benchmark(runs=1, top=5)
+        
+        self.assertGreater(report['import_ms'], 0)
+        self.assertEqual(len(report['top_imports']), 5)
+        self.assertEqual(report['deferred_loaded'], [])
+
+class TestStartupCoordinator(unittest.TestCase):
+    """Pruebas del arranque en paralelo con futuros con nombre"""
+    
+    def setUp(self):
+        from startup import StartupCoordinator
+        self.startup = StartupCoordinator()
+    
+    def tearDown(self):
+        self.startup.shutdown()
+    
+    def test_dependencies_receive_results_in_order(self):
+        """Prueba que una tarea espera a sus dependencias y recibe sus resultados"""
+        import threading
+        release = threading.Event()
+        order = []
+        
+        def slow_config():
+            release.wait(5)
+            order.append('config')
+            return {'theme': 'Dark'}
+        
+        self.startup.submit('config', slow_config)
+        self.startup.submit('probe', lambda: order.append('probe') or 'audio')
+        scheduler = self.startup.submit(
+            'scheduler', lambda config, audio: (config['theme'], audio), depends=('config', 'probe'))
+        
+        self.assertEqual(self.startup.result('probe', timeout=5), 'audio')
+        self.assertFalse(scheduler.done())
+        self.assertFalse(self.startup.ready('scheduler'))
+        
+        release.set()
+        self.assertEqual(scheduler.result(timeout=5), ('Dark', 'audio'))
+        self.assertEqual(order, ['probe', 'config'])
+        self.assertTrue(self.startup.ready('scheduler'))
+        self.assertIn('seconds', self.startup.timings['config'])
+    
+    def test_failures_propagate_to_dependents(self):
+        """Prueba que el fallo de una tarea llega a sus dependientes y a on_error"""
+        import threading
+        errors = []
+        reported = threading.Event()
+        
+        def broken():
+            raise ValueError("clave inválida")
+        
+        self.startup.submit('config', broken)
+        self.startup.submit('alarms', lambda config: config, depends=('config',))
+        self.startup.when_ready('alarms', lambda result: None,
+                                on_error=lambda e: (errors.append(e), reported.set()))
+        
+        with self.assertRaises(ValueError):
+            self.startup.result('alarms', timeout=5)
+        self.assertTrue(reported.wait(5))
+        self.assertIsInstance(errors[0], ValueError)
+        self.assertFalse(self.startup.ready('alarms'))
+    
+    def test_when_ready_uses_dispatch(self):
+        """Prueba que los callbacks pasan por dispatch, también si la tarea ya terminó"""
+        from startup import StartupCoordinator
+        dispatched = []
+        startup = StartupCoordinator(dispatch=dispatched.append)
+        try:
+            startup.submit('alarms', lambda: 3).result(timeout=5)
+            received = []
+            startup.when_ready('alarms', received.append)
+            
+            self.assertEqual(received, [])
+            self.assertEqual(len(dispatched), 1)
+            dispatched[0]()
+            self.assertEqual(received, [3])
+        finally:
+            startup.shutdown()
+    
+    def test_rejects_unknown_and_duplicate_tasks(self):
+        """Prueba la validación de nombres y dependencias"""
+        self.startup.submit('config', lambda: None)
+        with self.assertRaises(ValueError):
+            self.startup.submit('config', lambda: None)
+        with self.assertRaises(ValueError):
+            self.startup.submit('alarms', lambda config: None, depends=('missing',))
+
+class TestAlarmList(unittest.TestCase):
+    """Pruebas de la lista de alarmas virtualizada"""
+    
+    def _make_alarms(self, count):
+        alarms = []
+        for i in range(count):
+            alarm = Alarm()
+            alarm.title = f"Alarma {i}"
+            alarm.time = f"07:{i % 60:02d}"
+            alarm.recurrence = "daily" if i % 2 else "none"
+            alarms.append(alarm)
+        return alarms
+    
+    def test_row_data(self):
+        """Prueba los textos de cada fila"""
+        from alarm_list import alarm_row_data
+        
+        alarm = self._make_alarms(2)[1]
+        alarm.enabled = False
+        row = alarm_row_data(alarm)
+        
+        self.assertEqual(row['alarm_id'], alarm.id)
+        self.assertEqual(row['alarm_icon'], "alarm-off")
+        self.assertEqual(row['text'], "⏰ Alarma 1")
+        self.assertEqual(row['secondary_text'], "🕐 Hora: 07:01")
+        self.assertEqual(row['tertiary_text'], "🔁 Diaria | Volumen: 80%")
+        
+        alarm.title = ""
+        alarm.recurrence = "custom"
+        self.assertEqual(alarm_row_data(alarm)['text'], "⏰ Sin título")
+        self.assertTrue(alarm_row_data(alarm)['tertiary_text'].startswith("⏰ Una vez"))
+    
+    def test_only_visible_rows_are_built(self):
+        """Prueba que el número de filas instanciadas no depende del de alarmas"""
+        from kivy.app import App
+        from kivy.clock import Clock
+        from kivy.core.window import Window
+        from kivymd.app import MDApp
+        from alarm_list import AlarmRecycleView
+        
+        if App.get_running_app() is None:
+            MDApp()
+        
+        edited = []
+        deleted = []
+        rv = AlarmRecycleView(edit_callback=edited.append, delete_callback=deleted.append,
+                              size=(360, 640), size_hint=(None, None))
+        Window.add_widget(rv)
+        try:
+            alarms = self._make_alarms(500)
+            built = []
+            for count in (20, 500):
+                rv.set_alarms(alarms[:count])
+                for _ in range(3):
+                    Clock.tick()
+                built.append(len(rv.layout_manager.children))
+            
+            self.assertEqual(len(rv.data), 500)
+            self.assertGreater(built[0], 0)
+            self.assertEqual(built[0], built[1])
+            
+            top_row = max(rv.layout_manager.children, key=lambda row: row.y)
+            top_row.dispatch('on_release')
+            self.assertEqual(edited, [alarms[0].id])
+            top_row._notify('delete_callback')
+            self.assertEqual(deleted, [alarms[0].id])
+        finally:
+            Window.remove_widget(rv)
+    
+    def test_apply_changes_touches_only_changed_rows(self):
+        """Prueba que los cambios se aplican fila a fila sobre el modelo de datos"""
+        from kivy.app import App
+        from kivymd.app import MDApp
+        from alarm_list import AlarmRecycleView
+        
+        if App.get_running_app() is None:
+            MDApp()
+        
+        rv = AlarmRecycleView()
+        alarms = self._make_alarms(5)
+        rv.set_alarms(alarms)
+        
+        modified = []
+        rv.data_model.bind(on_data_changed=lambda *args, **kwargs: modified.append(kwargs.get('modified')))
+        
+        alarms[3].title = "Cambiada"
+        extra = self._make_alarms(6)[5]
+        changed = rv.apply_changes([alarms[3], alarms[4], extra], [alarms[1].id, "desconocida"])
+        
+        self.assertEqual(changed, 3)  # Una baja, una modificación y un alta; alarms[4] no cambió
+        self.assertEqual([row['text'] for row in rv.data],
+                         ["⏰ Alarma 0", "⏰ Alarma 2", "⏰ Cambiada", "⏰ Alarma 4", "⏰ Alarma 5"])
+        self.assertEqual(len(modified), 3)
+        
+        self.assertEqual(rv.apply_changes([alarms[0]], []), 0)
+
+class TestMainThreadDispatcher(unittest.TestCase):
+    """Pruebas de la entrega de callbacks al hilo principal"""
+    
+    def test_runs_in_order_on_drain(self):
+        """Prueba que los callbacks esperan al vaciado y se ejecutan en orden"""
+        from main_thread import MainThreadDispatcher
+        dispatcher = MainThreadDispatcher()
+        calls = []
+        
+        dispatcher.submit(calls.append, 1)
+        dispatcher.submit(calls.append, 2)
+        self.assertEqual(calls, [])
+        self.assertEqual(dispatcher.get_stats()['depth'], 2)
+        
+        self.assertEqual(dispatcher.drain(), 2)
+        self.assertEqual(calls, [1, 2])
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['max_depth'], 2)
+        self.assertEqual(stats['executed'], 2)
+        self.assertIsNotNone(stats['latency_p50_ms'])
+        self.assertGreaterEqual(stats['latency_max_ms'], stats['latency_p50_ms'])
+    
+    def test_same_key_runs_latest_only(self):
+        """Prueba que de los pendientes con la misma clave solo se ejecuta el último"""
+        from main_thread import MainThreadDispatcher
+        dispatcher = MainThreadDispatcher()
+        calls = []
+        
+        dispatcher.submit(calls.append, 'a1', key='a')
+        dispatcher.submit(calls.append, 'b', key='b')
+        dispatcher.submit(calls.append, 'a2', key='a')
+        dispatcher.submit(calls.append, 'libre')
+        dispatcher.drain()
+        
+        self.assertEqual(calls, ['b', 'a2', 'libre'])
+        self.assertEqual(dispatcher.get_stats()['coalesced'], 1)
+        
+        # Tras ejecutarse, la clave vuelve a admitir envíos
+        dispatcher.submit(calls.append, 'a3', key='a')
+        dispatcher.drain()
+        self.assertEqual(calls[-1], 'a3')
+    
+    def test_overflow_policies(self):
+        """Prueba los descartes al llenarse la cola"""
+        from main_thread import MainThreadDispatcher
+        
+        oldest = MainThreadDispatcher(max_pending=2, overflow="drop_oldest")
+        calls = []
+        for value in range(4):
+            self.assertTrue(oldest.submit(calls.append, value))
+        oldest.drain()
+        self.assertEqual(calls, [2, 3])
+        self.assertEqual(oldest.get_stats()['dropped'], 2)
+        self.assertEqual(oldest.get_stats()['max_depth'], 2)
+        
+        newest = MainThreadDispatcher(max_pending=2, overflow="drop_newest")
+        calls = []
+        results = [newest.submit(calls.append, value) for value in range(4)]
+        newest.drain()
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual(newest.get_stats()['dropped'], 2)
+        
+        with self.assertRaises(ValueError):
+            MainThreadDispatcher(overflow="block")
+    
+    def test_overflow_keeps_keyed_callbacks(self):
+        """Prueba que el desbordamiento nunca descarta el último envío de una clave"""
+        from main_thread import MainThreadDispatcher
+        dispatcher = MainThreadDispatcher(max_pending=2, overflow="drop_oldest")
+        calls = []
+        
+        dispatcher.submit(calls.append, 'flush', key='alarm-changes')
+        with self.assertLogs('main_thread', level='WARNING'):
+            for value in range(3):
+                dispatcher.submit(calls.append, value)
+        for _ in range(10):
+            dispatcher.submit(calls.append, 'evento', key='event:1')
+        dispatcher.drain()
+        
+        self.assertEqual(calls, ['flush', 1, 2, 'evento'])
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['dropped'], 1)
+        self.assertEqual(stats['coalesced'], 9)
+        self.assertEqual(stats['depth'], 0)
+    
+    def test_frame_budget_and_errors(self):
+        """Prueba el límite por frame y que un error no detiene el vaciado"""
+        from main_thread import MainThreadDispatcher
+        dispatcher = MainThreadDispatcher(max_per_frame=2)
+        calls = []
+        
+        dispatcher.submit(lambda: 1 / 0)
+        for value in range(3):
+            dispatcher.submit(calls.append, value)
+        
+        self.assertEqual(dispatcher.drain(), 2)
+        self.assertEqual(calls, [0])
+        self.assertEqual(dispatcher.drain(), 2)
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual(dispatcher.get_stats()['errors'], 1)
+    
+    def test_submit_from_threads(self):
+        """Prueba envíos concurrentes desde varios hilos"""
+        import threading
+        from main_thread import MainThreadDispatcher
+        dispatcher = MainThreadDispatcher(max_pending=1000, max_per_frame=1000)
+        main_thread = threading.current_thread()
+        calls = []
+        
+        def producer(offset):
+            for value in range(100):
+                dispatcher.submit(lambda v=offset + value: calls.append((v, threading.current_thread())))
+        
+        threads = [threading.Thread(target=producer, args=(i * 100,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        dispatcher.drain()
+        
+        self.assertEqual(sorted(v for v, _ in calls), list(range(400)))
+        self.assertTrue(all(thread is main_thread for _, thread in calls))
+
 def run_all_tests():
     """Ejecuta todas las pruebas y genera un reporte"""
     # Configurar test suite
@@ -990,7 +3477,31 @@ def run_all_tests():
         TestResponsiveManager,
         TestIntegration,
         TestPerformance,
-        TestEdgeCases
+        TestEdgeCases,
+        TestHotReload,
+        TestConfigBackups,
+        TestFileStore,
+        TestVideoCatalog,
+        TestCapabilityProbe,
+        TestProcessSupervisor,
+        TestPrearm,
+        TestShuffleBag,
+        TestVideoIndex,
+        TestBulkImport,
+        TestLaunchCoalescer,
+        TestPlaybackHandles,
+        TestAudioEngine,
+        TestGainEnvelope,
+        TestMixer,
+        TestSoundLibrary,
+        TestAudioBenchmark,
+        TestAlarmDaemon,
+        TestControlApi,
+        TestStartupBenchmark,
+        TestStartupCoordinator,
+        TestAlarmList,
+        TestAlarmChangeEvents,
+        TestMainThreadDispatcher
     ]
     
     loader = unittest.TestLoader()
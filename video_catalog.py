@@ -0,0 +1,1076 @@
+"""
+Módulo de catálogo de videos motivacionales
+Mantiene motivational_videos.json en memoria, invalidado por mtime y tamaño,
+indexado por ID de YouTube y por palabras del título, con escrituras agrupadas
+"""
+
+import os
+import re
+import csv
+import json
+import atexit
+import bisect
+import random
+import logging
+import threading
+import unicodedata
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple, Union
+from urllib.parse import urlparse, parse_qs
+
+from file_store import atomic_write
+
+logger = logging.getLogger(__name__)
+
+VIDEO_LISTS = ("default_videos", "custom_videos")
+
+DEFAULT_SETTINGS = {
+    "random_selection": True,
+    "autoplay": True,
+    "fullscreen": False,
+    "no_repeat_horizon": 3
+}
+
+# Intentos de intercambio antes de rellenar la bolsa para respetar el horizonte
+MAX_DRAW_ATTEMPTS = 16
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Patrones precompilados para validar importaciones masivas
+YOUTUBE_URL_PATTERN = re.compile(
+    r"^(?:https?://)?(?:www\.|m\.)?"
+    r"(?:youtube\.com/(?:watch\?(?:\S*&)?v=|embed/|shorts/|live/)|youtu\.be/)"
+    r"([\w-]+)",
+    re.IGNORECASE
+)
+HTTP_URL_PATTERN = re.compile(r"^https?://[^\s/?#]+\.[^\s/?#]+(?:[/?#]\S*)?$", re.IGNORECASE)
+DURATION_PATTERN = re.compile(r"^\d{1,3}(?::[0-5]\d){1,2}$")
+
+IMPORT_FORMATS = ("json", "ndjson", "csv")
+IMPORT_CHUNK_SIZE = 64 * 1024
+
+def extract_youtube_video_id(youtube_url: str) -> Optional[str]:
+    """
+    Extrae el ID de video de una URL de YouTube
+
+    Args:
+        youtube_url: URL en formato watch?v=, youtu.be, embed o shorts
+
+    Returns:
+        ID del video o None si no es una URL de YouTube
+    """
+    try:
+        parsed_url = urlparse(youtube_url)
+
+        if "youtube.com" in parsed_url.netloc:
+            query_params = parse_qs(parsed_url.query)
+            if "v" in query_params:
+                return query_params["v"][0]
+
+            parts = parsed_url.path.strip("/").split("/")
+            if len(parts) == 2 and parts[0] in ("embed", "shorts", "live"):
+                return parts[1]
+
+        if "youtu.be" in parsed_url.netloc:
+            video_id = parsed_url.path.lstrip("/")
+            if video_id:
+                return video_id
+
+        return None
+
+    except Exception as e:
+        logger.error(f"Error extrayendo video ID de {youtube_url}: {e}")
+        return None
+
+def video_key(url: str) -> str:
+    """
+    Clave de deduplicación de un video: el ID de YouTube si existe, si no la URL
+
+    Args:
+        url: URL del video
+
+    Returns:
+        Clave del índice
+    """
+    video_id = extract_youtube_video_id(url)
+    return f"yt:{video_id}" if video_id else url.strip()
+
+def tokenize(text: str) -> List[str]:
+    """
+    Divide un texto en palabras normalizadas (minúsculas, sin acentos)
+
+    Args:
+        text: Texto a dividir
+
+    Returns:
+        Lista de palabras
+    """
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return TOKEN_PATTERN.findall(normalized)
+
+class ShuffleBag:
+    """
+    Bolsa barajada con pesos: cada URL aparece 'peso' veces por ciclo y se
+    extrae del final en O(1). Las URLs sacadas en las últimas 'horizon'
+    extracciones no se repiten mientras haya alternativas
+
+    Cada ciclo se baraja con una semilla derivada de (seed, número de ciclo).
+    Para reanudar tras un reinicio se persisten las URLs que quedan en la
+    bolsa en su orden (los intercambios para evitar repeticiones, las altas a
+    mitad de ciclo y los ciclos añadidos por adelantado hacen que la posición
+    dentro del ciclo no baste) y el historial reciente. Las bajas se marcan
+    por generación y sus copias se descartan al llegar al final
+    """
+
+    def __init__(self, state_file: str = None, horizon: int = 0, rng: random.Random = None):
+        """
+        Inicializa la bolsa
+
+        Args:
+            state_file: Archivo donde persistir el estado entre reinicios
+            horizon: Número de extracciones recientes que no se repiten
+            rng: Generador aleatorio (para pruebas)
+        """
+        self.state_file = state_file
+        self.horizon = horizon
+        self.rng = rng or random.Random()
+        self.seed = self.rng.getrandbits(64)
+        self.cycle = 0  # Número del último ciclo barajado
+        self.weights: Dict[str, int] = {}
+        self.bag: List[Tuple[str, int]] = []  # Copias (URL, generación)
+        self.recent = deque(maxlen=max(horizon, 1))
+        self._generations: Dict[str, int] = {}  # URL -> generación vigente
+        self._next_generation = 0
+        self._stale = 0  # Copias de URLs eliminadas que siguen en la bolsa (cota superior)
+        self._resume: Optional[List[str]] = None  # URLs pendientes del estado cargado
+
+    def add(self, url: str, weight: int = 1):
+        """
+        Agrega una URL; si hay un ciclo en curso inserta sus copias en
+        posiciones aleatorias, si no, entrará en el próximo ciclo
+
+        Args:
+            url: URL del video
+            weight: Número de copias por ciclo
+        """
+        if weight <= 0:
+            return
+
+        self.remove(url)
+        self._next_generation += 1
+        generation = self._next_generation
+        self.weights[url] = weight
+        self._generations[url] = generation
+
+        if not self.bag:
+            return
+        for _ in range(weight):
+            self.bag.append((url, generation))
+            index = self.rng.randrange(len(self.bag))
+            self.bag[index], self.bag[-1] = self.bag[-1], self.bag[index]
+
+    def remove(self, url: str):
+        """
+        Elimina todas las copias de una URL en O(1); se descartan al extraerlas
+
+        Args:
+            url: URL del video
+        """
+        weight = self.weights.pop(url, None)
+        if weight is None:
+            return
+
+        del self._generations[url]
+        self._stale += weight
+        if self._stale > len(self.bag) // 2:
+            self._compact()
+
+    def _is_stale(self, entry: Tuple[str, int]) -> bool:
+        return self._generations.get(entry[0]) != entry[1]
+
+    def _compact(self):
+        """
+        Quita de una vez las copias de URLs eliminadas (amortizado por las bajas)
+        """
+        self.bag = [entry for entry in self.bag if not self._is_stale(entry)]
+        self._stale = 0
+
+    def _discard_stale(self):
+        """
+        Descarta las copias eliminadas que hayan quedado al final de la bolsa
+        """
+        while self.bag and self._is_stale(self.bag[-1]):
+            self.bag.pop()
+            self._stale = max(0, self._stale - 1)
+
+    def sync(self, weights: Dict[str, int]) -> bool:
+        """
+        Ajusta la bolsa a los pesos actuales del catálogo sin rebarajarla
+
+        Args:
+            weights: Diccionario URL -> peso
+
+        Returns:
+            True si hubo cambios
+        """
+        changed = False
+
+        for url in list(self.weights):
+            if weights.get(url) != self.weights[url]:
+                self.remove(url)
+                changed = True
+
+        for url, weight in weights.items():
+            if url not in self.weights and weight > 0:
+                self.add(url, weight)
+                changed = True
+
+        return changed
+
+    def set_horizon(self, horizon: int):
+        """
+        Cambia el horizonte de no repetición
+
+        Args:
+            horizon: Número de extracciones recientes que no se repiten
+        """
+        if horizon != self.horizon:
+            self.horizon = horizon
+            self.recent = deque(self.recent, maxlen=max(horizon, 1))
+
+    def _cycle_order(self, cycle: int) -> List[str]:
+        """
+        Orden de extracción de un ciclo, reproducible a partir de la semilla
+        """
+        order = sorted(url for url, weight in self.weights.items() for _ in range(weight))
+        random.Random(f"{self.seed}:{cycle}").shuffle(order)
+        return order
+
+    def _refill(self):
+        """
+        Añade un ciclo completo barajado al principio de la bolsa; tras cargar
+        un estado guardado repone antes las URLs pendientes que aún existan
+        """
+        generations = self._generations
+        if self._resume is not None:
+            resume, self._resume = self._resume, None
+            entries = [(url, generations[url]) for url in resume if url in generations]
+            if entries:
+                self.bag[:0] = entries
+                return
+
+        self.cycle += 1
+        order = self._cycle_order(self.cycle)
+        self.bag[:0] = [(url, generations[url]) for url in reversed(order)]
+
+    def _is_recent(self, url: str) -> bool:
+        """
+        Indica si la URL salió dentro del horizonte efectivo
+        """
+        horizon = min(self.horizon, len(self.weights) - 1)
+        return horizon > 0 and url in islice(reversed(self.recent), horizon)
+
+    def _next_entry(self):
+        """
+        Deja al final de la bolsa una copia vigente, barajando un ciclo si hace falta
+        """
+        self._discard_stale()
+        if not self.bag:
+            self._refill()
+
+    def draw(self) -> Optional[str]:
+        """
+        Extrae la siguiente URL de la bolsa
+
+        Returns:
+            URL seleccionada o None si la bolsa no tiene videos
+        """
+        if not self.weights:
+            return None
+
+        self._next_entry()
+        for attempt in range(2 * MAX_DRAW_ATTEMPTS):
+            if attempt == MAX_DRAW_ATTEMPTS:
+                # Solo quedan copias recientes: añadir el siguiente ciclo
+                self._refill()
+
+            if not self._is_recent(self.bag[-1][0]):
+                break
+
+            index = self.rng.randrange(len(self.bag))
+            self.bag[index], self.bag[-1] = self.bag[-1], self.bag[index]
+            self._next_entry()
+
+        url = self.bag.pop()[0]
+        self.recent.append(url)
+        return url
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado necesario para reconstruir la bolsa exactamente
+
+        Returns:
+            Diccionario con seed, cycle, remaining (URLs pendientes, la
+            siguiente al final) y recent
+        """
+        if self._resume is not None and not self.bag:
+            remaining = list(self._resume)
+        else:
+            remaining = [entry[0] for entry in self.bag if not self._is_stale(entry)]
+        return {"seed": self.seed, "cycle": self.cycle, "remaining": remaining, "recent": list(self.recent)}
+
+    def load(self) -> bool:
+        """
+        Carga el estado persistido; las URLs pendientes se reponen en la
+        próxima extracción (después de sincronizar los pesos)
+
+        Returns:
+            True si se cargó un estado válido
+        """
+        if not self.state_file or not os.path.exists(self.state_file):
+            return False
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            self.recent = deque(state.get("recent", []), maxlen=max(self.horizon, 1))
+            if "remaining" not in state:
+                return False  # Formato antiguo: se empieza un ciclo nuevo
+
+            self.seed = int(state["seed"])
+            self.cycle = int(state.get("cycle", 0))
+            self._resume = [str(url) for url in state["remaining"]]
+            self.bag = []
+            return True
+        except Exception as e:
+            logger.error(f"Error cargando estado de selección de videos: {e}")
+            return False
+
+    def save(self):
+        """
+        Guarda el estado de la bolsa en el archivo auxiliar
+        """
+        if not self.state_file:
+            return
+
+        try:
+            atomic_write(self.state_file, json.dumps(self.get_state()))
+        except Exception as e:
+            logger.error(f"Error guardando estado de selección de videos: {e}")
+
+def video_weight(video: Dict[str, Any]) -> int:
+    """
+    Obtiene el peso de selección de un video (campo opcional 'weight')
+
+    Args:
+        video: Datos del video
+
+    Returns:
+        Peso entero; 0 excluye el video de la selección aleatoria
+    """
+    try:
+        return max(0, int(round(float(video.get("weight", 1)))))
+    except (TypeError, ValueError):
+        return 1
+
+def normalize_video_url(url: str) -> Optional[str]:
+    """
+    Normaliza una URL de video: las de YouTube pasan a la forma watch?v=<id>
+
+    Args:
+        url: URL a normalizar
+
+    Returns:
+        URL normalizada o None si no es válida
+    """
+    url = url.strip()
+    match = YOUTUBE_URL_PATTERN.match(url)
+    if match:
+        return f"https://www.youtube.com/watch?v={match.group(1)}"
+    if HTTP_URL_PATTERN.match(url):
+        return url
+    return None
+
+def _iter_json_array(stream: TextIO) -> Iterator[Any]:
+    """
+    Recorre un arreglo JSON elemento a elemento sin cargarlo completo
+
+    Si el documento no es un arreglo se carga entero y se toman sus listas
+    'videos', 'default_videos' y 'custom_videos'
+
+    Args:
+        stream: Archivo de texto abierto
+
+    Yields:
+        Cada elemento del arreglo
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(IMPORT_CHUNK_SIZE)
+    pos = len(buffer) - len(buffer.lstrip())
+
+    if buffer[pos:pos + 1] != "[":
+        data = json.loads(buffer + stream.read())
+        if isinstance(data, dict):
+            for name in ("videos",) + VIDEO_LISTS:
+                yield from data.get(name, [])
+        else:
+            yield data
+        return
+
+    pos += 1
+    while True:
+        # Saltar espacios y comas, leyendo más si el búfer se agota
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            chunk = stream.read(IMPORT_CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("Arreglo JSON sin cerrar")
+            buffer, pos = chunk, 0
+            continue
+
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Elemento incompleto: leer el siguiente bloque
+            chunk = stream.read(IMPORT_CHUNK_SIZE)
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        yield item
+        pos = end
+
+def iter_import_records(source: Union[str, TextIO], fmt: str = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Lee registros de video de un archivo JSON, NDJSON o CSV en streaming
+
+    Args:
+        source: Ruta del archivo u objeto de texto abierto
+        fmt: Formato ('json', 'ndjson' o 'csv'); por defecto según la extensión
+
+    Yields:
+        Tuplas (número de registro, registro). Las líneas NDJSON inválidas se
+        entregan como la excepción de parseo para poder reportarlas
+    """
+    if fmt is None:
+        extension = os.path.splitext(source if isinstance(source, str) else getattr(source, "name", ""))[1]
+        fmt = {".jsonl": "ndjson", ".ndjson": "ndjson", ".csv": "csv"}.get(extension.lower(), "json")
+
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Formato de importación no soportado: {fmt}")
+
+    stream = open(source, "r", encoding="utf-8", newline="") if isinstance(source, str) else source
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(stream), start=1):
+                yield number, row
+        elif fmt == "ndjson":
+            for number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, e
+        else:
+            for number, item in enumerate(_iter_json_array(stream), start=1):
+                yield number, item
+    finally:
+        if isinstance(source, str):
+            stream.close()
+
+class VideoCatalog:
+    """
+    Catálogo en memoria de videos motivacionales
+    """
+
+    def __init__(self, videos_file: str, flush_delay: float = 0.5):
+        """
+        Inicializa el catálogo
+
+        Args:
+            videos_file: Ruta de motivational_videos.json
+            flush_delay: Segundos para agrupar escrituras antes de guardar
+        """
+        self.videos_file = videos_file
+        self.bag_file = f"{os.path.splitext(videos_file)[0]}.bag.json"
+        self.flush_delay = flush_delay
+        self.settings: Dict[str, Any] = dict(DEFAULT_SETTINGS)
+        self.extra: Dict[str, Any] = {}
+        self.lists: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in VIDEO_LISTS}
+        self._tokens: Dict[str, Set[str]] = {}  # palabra -> claves de video
+        self._sorted_tokens: List[str] = []  # palabras ordenadas para búsqueda por prefijo
+        self._order: Dict[str, int] = {}  # clave -> posición de inserción
+        self._next_order = 0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._dirty = False
+        self._bag_dirty = False  # Estado de la bolsa pendiente de guardar
+        self._all_videos: Optional[List[Dict[str, Any]]] = None
+        self._flush_timer = None
+        self._bag: Optional[ShuffleBag] = None
+        self._lock = threading.RLock()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """
+        Obtiene la firma (mtime, tamaño) del archivo
+
+        Returns:
+            Tupla (mtime_ns, tamaño) o None si no existe
+        """
+        try:
+            stat = os.stat(self.videos_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def refresh(self) -> bool:
+        """
+        Recarga el archivo si cambió en disco
+
+        Returns:
+            True si se recargó
+        """
+        with self._lock:
+            if self._dirty:
+                # Cambios locales pendientes de guardar tienen prioridad
+                return False
+
+            signature = self._file_signature()
+            if self._loaded and signature == self._signature:
+                return False
+
+            self._load(signature)
+            return True
+
+    def _ensure_loaded(self):
+        """
+        Carga el catálogo la primera vez que se usa
+        """
+        if not self._loaded:
+            self.refresh()
+
+    def _load(self, signature: Optional[Tuple[int, int]]):
+        """
+        Lee y parsea el archivo de videos
+
+        Args:
+            signature: Firma del archivo leída antes de abrirlo
+        """
+        data = {}
+        if signature is not None:
+            try:
+                with open(self.videos_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"Error cargando videos motivacionales: {e}")
+
+        self._set_data(data)
+        self._signature = signature
+        self._loaded = True
+
+    def _set_data(self, data: Dict[str, Any]):
+        """
+        Reconstruye el índice en memoria a partir de los datos del archivo
+
+        Args:
+            data: Contenido de motivational_videos.json
+        """
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(data.get("settings", {}))
+        self.extra = {k: v for k, v in data.items() if k not in VIDEO_LISTS and k != "settings"}
+        self.lists = {name: {} for name in VIDEO_LISTS}
+        self._tokens = {}
+        self._sorted_tokens = []
+        self._order = {}
+
+        for name in VIDEO_LISTS:
+            for video in data.get(name, []):
+                url = video.get("url")
+                if url and self._find(video_key(url)) is None:
+                    self._insert(name, video_key(url), dict(video), keep_sorted=False)
+
+        self._sorted_tokens = sorted(self._tokens)
+        self._all_videos = None
+
+        if self._bag is not None:
+            self._bag.sync(self._weights())
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Devuelve el catálogo en el formato de motivational_videos.json
+
+        Returns:
+            Copia de los datos del catálogo
+        """
+        with self._lock:
+            self._ensure_loaded()
+            data = dict(self.extra)
+            for name in VIDEO_LISTS:
+                data[name] = [dict(video) for video in self.lists[name].values()]
+            data["settings"] = dict(self.settings)
+            return data
+
+    def get_settings(self) -> Dict[str, Any]:
+        """
+        Obtiene la configuración de reproducción de videos
+
+        Returns:
+            Diccionario de configuración
+        """
+        self._ensure_loaded()
+        return self.settings
+
+    def get_videos(self) -> List[Dict[str, Any]]:
+        """
+        Obtiene todos los videos (predeterminados y personalizados) sin acceder a disco
+
+        Returns:
+            Lista en caché de videos; no debe modificarse
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._all_videos is None:
+                self._all_videos = [
+                    video for name in VIDEO_LISTS for video in self.lists[name].values()
+                ]
+            return self._all_videos
+
+    def get_video(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca un video por URL
+
+        Args:
+            url: URL del video
+
+        Returns:
+            Datos del video o None
+        """
+        self._ensure_loaded()
+        found = self._find(video_key(url))
+        return found[1] if found else None
+
+    def _find(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Busca un video por clave en todas las listas
+
+        Args:
+            key: Clave del video (ver video_key)
+
+        Returns:
+            Tupla (nombre de lista, video) o None
+        """
+        for name in VIDEO_LISTS:
+            video = self.lists[name].get(key)
+            if video is not None:
+                return name, video
+        return None
+
+    def _insert(self, list_name: str, key: str, video: Dict[str, Any], keep_sorted: bool = True):
+        """
+        Inserta un video en su lista y en el índice de palabras
+
+        Args:
+            list_name: Lista destino
+            key: Clave del video
+            video: Datos del video
+            keep_sorted: Mantener ordenada la lista de palabras (False en cargas masivas)
+        """
+        self.lists[list_name][key] = video
+        self._order[key] = self._next_order
+        self._next_order += 1
+
+        for token in set(tokenize(video.get("title", ""))):
+            keys = self._tokens.get(token)
+            if keys is None:
+                keys = self._tokens[token] = set()
+                if keep_sorted:
+                    bisect.insort(self._sorted_tokens, token)
+            keys.add(key)
+
+    def _delete(self, list_name: str, key: str) -> Dict[str, Any]:
+        """
+        Elimina un video de su lista y del índice de palabras
+
+        Args:
+            list_name: Lista de origen
+            key: Clave del video
+
+        Returns:
+            Datos del video eliminado
+        """
+        video = self.lists[list_name].pop(key)
+        self._order.pop(key, None)
+
+        for token in set(tokenize(video.get("title", ""))):
+            keys = self._tokens.get(token)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tokens[token]
+                index = bisect.bisect_left(self._sorted_tokens, token)
+                if index < len(self._sorted_tokens) and self._sorted_tokens[index] == token:
+                    del self._sorted_tokens[index]
+
+        return video
+
+    def _with_type(self, list_name: str, video: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copia de un video con el campo 'type' (default o custom)
+        """
+        entry = dict(video)
+        entry["type"] = list_name.split("_")[0]
+        return entry
+
+    def list_videos(self, offset: int = 0, limit: int = None, list_name: str = None) -> Dict[str, Any]:
+        """
+        Lista los videos paginados
+
+        Args:
+            offset: Número de videos a saltar
+            limit: Máximo de videos a devolver (None para todos)
+            list_name: Limitar a una lista ('default_videos' o 'custom_videos')
+
+        Returns:
+            Diccionario con 'total' e 'items' (copias con el campo 'type')
+        """
+        with self._lock:
+            self._ensure_loaded()
+            names = [list_name] if list_name else list(VIDEO_LISTS)
+            total = sum(len(self.lists[name]) for name in names)
+
+            entries = ((name, video) for name in names for video in self.lists[name].values())
+            stop = None if limit is None else offset + limit
+            items = [self._with_type(name, video) for name, video in islice(entries, offset, stop)]
+
+            return {"total": total, "items": items}
+
+    def search_videos(self, query: str, offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """
+        Busca videos cuyo título contenga palabras que empiecen por cada término
+
+        Args:
+            query: Términos de búsqueda ("desp mot" encuentra "Despierta ... Motivación")
+            offset: Número de resultados a saltar
+            limit: Máximo de resultados a devolver
+
+        Returns:
+            Diccionario con 'total' e 'items' (copias con el campo 'type')
+        """
+        with self._lock:
+            self._ensure_loaded()
+            terms = tokenize(query)
+            if not terms:
+                return self.list_videos(offset, limit)
+
+            matches: Optional[Set[str]] = None
+            # Empezar por el término más largo: suele ser el más selectivo
+            for term in sorted(set(terms), key=len, reverse=True):
+                keys = set()
+                index = bisect.bisect_left(self._sorted_tokens, term)
+                while index < len(self._sorted_tokens) and self._sorted_tokens[index].startswith(term):
+                    keys |= self._tokens[self._sorted_tokens[index]]
+                    index += 1
+
+                matches = keys if matches is None else matches & keys
+                if not matches:
+                    return {"total": 0, "items": []}
+
+            ordered = sorted(matches, key=self._order.__getitem__)
+            items = []
+            for key in ordered[offset:offset + limit]:
+                name, video = self._find(key)
+                items.append(self._with_type(name, video))
+
+            return {"total": len(ordered), "items": items}
+
+    def _weights(self) -> Dict[str, int]:
+        """
+        Obtiene los pesos de selección de todos los videos
+
+        Returns:
+            Diccionario URL -> peso
+        """
+        return {
+            video["url"]: video_weight(video)
+            for name in VIDEO_LISTS for video in self.lists[name].values()
+        }
+
+    def _get_bag(self) -> ShuffleBag:
+        """
+        Obtiene la bolsa de selección, cargando su estado la primera vez
+        """
+        if self._bag is None:
+            self._bag = ShuffleBag(self.bag_file, self.settings.get("no_repeat_horizon", 0))
+            self._bag.load()
+            self._bag.sync(self._weights())
+
+        self._bag.set_horizon(self.settings.get("no_repeat_horizon", 0))
+        return self._bag
+
+    def draw_video(self) -> Optional[Dict[str, Any]]:
+        """
+        Selecciona el siguiente video de la bolsa barajada con pesos
+
+        Returns:
+            Datos del video o None si no hay videos seleccionables
+        """
+        with self._lock:
+            self._ensure_loaded()
+            bag = self._get_bag()
+            url = bag.draw()
+            if url is None:
+                return None
+
+            # Sin E/S en el momento de la alarma: el estado se guarda agrupado
+            self._bag_dirty = True
+            self._schedule_flush()
+            return self.get_video(url)
+
+    def add_video(self, video: Dict[str, Any], list_name: str = "custom_videos") -> bool:
+        """
+        Agrega un video al catálogo
+
+        Args:
+            video: Datos del video (debe incluir 'url')
+            list_name: Lista destino
+
+        Returns:
+            True si se agregó; False si la URL ya existía
+        """
+        with self._lock:
+            self._ensure_loaded()
+            url = video.get("url")
+            if not url or self.get_video(url) is not None:
+                return False
+
+            self._insert(list_name, video_key(url), dict(video))
+            if self._bag is not None:
+                self._bag.add(url, video_weight(video))
+            self._mark_dirty()
+            return True
+
+    def remove_video(self, url: str, list_name: str = "custom_videos") -> bool:
+        """
+        Elimina un video del catálogo
+
+        Args:
+            url: URL del video
+            list_name: Lista de la que eliminarlo
+
+        Returns:
+            True si se eliminó
+        """
+        with self._lock:
+            self._ensure_loaded()
+            key = video_key(url)
+            if key not in self.lists[list_name]:
+                return False
+
+            video = self._delete(list_name, key)
+            if self._bag is not None:
+                self._bag.remove(video["url"])
+            self._mark_dirty()
+            return True
+
+    def bulk_import(self, source: Union[str, TextIO], fmt: str = None,
+                    list_name: str = "custom_videos", batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Importa videos en bloque desde JSON, NDJSON o CSV con una sola escritura
+
+        La entrada se lee en streaming y se valida por lotes; los duplicados
+        (contra el catálogo y dentro del propio archivo) se descartan por ID de
+        YouTube. Si el archivo no se puede leer no se aplica ningún cambio
+
+        Args:
+            source: Ruta del archivo u objeto de texto abierto
+            fmt: Formato ('json', 'ndjson' o 'csv'); por defecto según la extensión
+            list_name: Lista destino
+            batch_size: Registros por lote de validación
+
+        Returns:
+            Diccionario con 'imported', 'duplicates', 'rejected' (lista de
+            {'record', 'reason'}) y 'error'
+        """
+        report = {"imported": 0, "duplicates": 0, "rejected": [], "error": None}
+
+        with self._lock:
+            self._ensure_loaded()
+            accepted: Dict[str, Dict[str, Any]] = {}
+            batch = []
+
+            try:
+                for number, record in iter_import_records(source, fmt):
+                    batch.append((number, record))
+                    if len(batch) >= batch_size:
+                        self._validate_batch(batch, accepted, report)
+                        batch = []
+                self._validate_batch(batch, accepted, report)
+            except Exception as e:
+                logger.error(f"Error importando videos: {e}")
+                report["error"] = str(e)
+                return report
+
+            if not accepted:
+                return report
+
+            for key, video in accepted.items():
+                self._insert(list_name, key, video, keep_sorted=False)
+                if self._bag is not None:
+                    self._bag.add(video["url"], video_weight(video))
+
+            self._sorted_tokens = sorted(self._tokens)
+            self._all_videos = None
+            self._dirty = True
+            report["imported"] = len(accepted)
+
+            if not self.flush():
+                report["error"] = "Error guardando el catálogo"
+
+            logger.info(f"Importación de videos: {report['imported']} nuevos, "
+                        f"{report['duplicates']} duplicados, {len(report['rejected'])} rechazados")
+            return report
+
+    def _validate_batch(self, batch: List[Tuple[int, Any]], accepted: Dict[str, Dict[str, Any]],
+                        report: Dict[str, Any]):
+        """
+        Valida y normaliza un lote de registros importados
+
+        Args:
+            batch: Lista de (número de registro, registro)
+            accepted: Videos aceptados hasta ahora, por clave (se actualiza)
+            report: Reporte de importación (se actualiza)
+        """
+        rejected = report["rejected"]
+
+        for number, record in batch:
+            if isinstance(record, Exception):
+                rejected.append({"record": number, "reason": f"JSON inválido: {record}"})
+                continue
+            if not isinstance(record, dict):
+                rejected.append({"record": number, "reason": "El registro no es un objeto"})
+                continue
+
+            url = normalize_video_url(str(record.get("url") or ""))
+            if url is None:
+                rejected.append({"record": number, "reason": f"URL inválida: {record.get('url')!r}"})
+                continue
+
+            duration = str(record.get("duration") or "0:00").strip()
+            if not DURATION_PATTERN.match(duration):
+                rejected.append({"record": number, "reason": f"Duración inválida: {duration!r}"})
+                continue
+
+            key = video_key(url)
+            if key in accepted or self._find(key) is not None:
+                report["duplicates"] += 1
+                continue
+
+            video = {
+                "title": str(record.get("title") or "").strip() or url,
+                "url": url,
+                "duration": duration
+            }
+            if record.get("weight") not in (None, ""):
+                video["weight"] = video_weight(record)
+            accepted[key] = video
+
+    def replace(self, data: Dict[str, Any]) -> bool:
+        """
+        Reemplaza todo el catálogo y lo guarda inmediatamente
+
+        Args:
+            data: Contenido completo de motivational_videos.json
+
+        Returns:
+            True si se guardó correctamente
+        """
+        with self._lock:
+            self._set_data(data)
+            self._loaded = True
+            self._dirty = True
+            return self.flush()
+
+    def _mark_dirty(self):
+        """
+        Marca el catálogo como modificado y programa una escritura agrupada
+        """
+        self._all_videos = None
+        self._dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """
+        Programa una escritura agrupada si no hay una pendiente
+        """
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> bool:
+        """
+        Guarda los cambios pendientes en disco (catálogo y estado de la bolsa)
+
+        Returns:
+            True si no había cambios o se guardaron correctamente
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            if self._bag_dirty and self._bag is not None:
+                self._bag.save()
+                self._bag_dirty = False
+
+            if not self._dirty:
+                return True
+
+            try:
+                data = self.as_dict()
+                atomic_write(self.videos_file, json.dumps(data, indent=2, ensure_ascii=False))
+                self._signature = self._file_signature()
+                self._dirty = False
+                logger.info("Videos motivacionales guardados correctamente")
+                return True
+            except Exception as e:
+                logger.error(f"Error guardando videos motivacionales: {e}")
+                return False
+
+_catalogs: Dict[str, VideoCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+def get_catalog(videos_file: str = None) -> VideoCatalog:
+    """
+    Obtiene el catálogo compartido para un archivo de videos
+
+    Args:
+        videos_file: Ruta del archivo (por defecto motivational_videos.json en el directorio actual)
+
+    Returns:
+        Instancia compartida de VideoCatalog
+    """
+    videos_file = os.path.abspath(videos_file or os.path.join(os.getcwd(), "motivational_videos.json"))
+
+    with _catalogs_lock:
+        catalog = _catalogs.get(videos_file)
+        if catalog is None:
+            catalog = VideoCatalog(videos_file)
+            _catalogs[videos_file] = catalog
+        return catalog
+
+@atexit.register
+def _flush_catalogs():
+    """Guarda los cambios pendientes al salir"""
+    for catalog in list(_catalogs.values()):
+        catalog.flush()